@@ -0,0 +1,40 @@
+####################################
+##### Arquivo: retrain_model.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Script de retreino incremental do modelo com as leituras do Oracle.
+
+Uso:
+    python retrain_model.py            # ciclo periódico (ml.retraining.interval_seconds)
+    python retrain_model.py --once     # um único ciclo (ex.: agendado via cron)
+"""
+
+import argparse
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.model.retrain import OnlineRetrainer
+from src.utils.logging import setup_logging
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retreino incremental do modelo de qualidade da água")
+    parser.add_argument('--once', action='store_true', help="Executa um único ciclo e termina")
+    parser.add_argument('--interval', type=float, default=None, help="Intervalo entre ciclos, em segundos")
+    args = parser.parse_args()
+
+    setup_logging()
+    retrainer = OnlineRetrainer()
+
+    if args.once:
+        result = retrainer.run_once()
+        print(f"Retreino concluído: {result}")
+    else:
+        retrainer.run_forever(args.interval)
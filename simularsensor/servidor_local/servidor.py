@@ -1,7 +1,14 @@
+import sys
+from pathlib import Path
+
 from flask import Flask, request, jsonify
 import oracledb
 from datetime import datetime
 
+# Permite importar a tabela de faixas da aplicação (src/utils/thresholds.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.utils.thresholds import get_thresholds
+
 app = Flask(__name__)
 
 # *** Configurações do Banco de Dados Oracle ***
@@ -102,43 +109,19 @@ def simular_predicao_ml(chlorine, turbidity, conductivity, ph):
     # Cloro residual livre ideal: 0.2 - 2.0 ppm (varia conforme regulamentação)
     # Condutividade: varia muito, mas valores extremos podem ser problemáticos.
     
-    score = 0
-    
-    # pH
-    if 6.5 <= ph <= 8.5:
-        score += 2
-    elif 6.0 <= ph < 6.5 or 8.5 < ph <= 9.0:
-        score += 1
-    else: # < 6.0 or > 9.0
-        score -= 1
-
-    # Turbidez (assumindo menor é melhor)
-    if turbidity < 5: # Ideal
-        score += 2
-    elif turbidity < 25: # Aceitável/Suspeito
-        score += 1
-    elif turbidity < 100: # Suspeito Alto
-        score += 0
-    else: # > 100 NTU, Não potável
-        score -= 2
-        
-    # Cloro Residual (exemplo de faixa)
-    if 0.2 <= chlorine <= 2.0: # Ideal
-        score += 2
-    elif 0.1 <= chlorine < 0.2 or 2.0 < chlorine <= 4.0: # Limite / Excesso leve
-        score += 1
-    else: # Muito baixo ou muito alto
-        score -=1
-
-    # Condutividade (exemplo muito genérico, depende da fonte da água)
-    if conductivity < 50: # Pode ser muito pura, potencialmente corrosiva ou sem minerais
-        score +=0 
-    elif conductivity < 1000: # Geralmente OK
-        score += 1
-    elif conductivity < 2500: # Limite para água potável em algumas normas
-        score += 0
-    else: # > 2500 uS/cm - provavelmente não potável
-        score -=1
+    # Pontuação de cada parâmetro pela tabela de faixas compartilhada com a aplicação
+    # (seção "thresholds" do config/config.yaml):
+    # pH: < 6.0: -1 | 6.0-6.5: +1 | 6.5-8.5: +2 | 8.5-9.0: +1 | > 9.0: -1
+    # Turbidez: < 5: +2 | 5-25: +1 | 25-100: 0 | >= 100: -2
+    # Cloro: < 0.1: -1 | 0.1-0.2: +1 | 0.2-2.0: +2 | 2.0-4.0: +1 | > 4.0: -1
+    # Condutividade: < 50: 0 | 50-1000: +1 | 1000-2500: 0 | >= 2500: -1
+    thresholds = get_thresholds()
+    score = (
+        thresholds.lookup('ph', ph, 'score')
+        + thresholds.lookup('turbidity', turbidity, 'score')
+        + thresholds.lookup('chloramines', chlorine, 'score')
+        + thresholds.lookup('conductivity', conductivity, 'score')
+    )
 
     print(f"Score de potabilidade (simulado): {score}")
 
@@ -6,11 +6,13 @@
 ##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
 ####################################
 
+import math
 from datetime import datetime
 from typing import Dict, List, Optional
 from ..persistence.db import Reading, WaterQualityRepository
 from ..model.predict import get_predictor
 from ..utils.logging import get_logger
+from ..utils.thresholds import get_thresholds
 
 logger = get_logger(__name__)
 
@@ -20,6 +22,9 @@ class WaterQualityController:
     def __init__(self):
         self.repository = WaterQualityRepository()
         self.predictor = get_predictor()
+        # Sketches por hora de todo o histórico (None se desabilitado em config.yaml)
+        from ..processing.reading_rollup import get_reading_rollup
+        self.rollup = get_reading_rollup()
     
     def ingest_reading(self, reading_data: Dict[str, float]) -> Dict[str, any]:
         """
@@ -48,6 +53,8 @@ class WaterQualityController:
             
             # 3. Salvar no banco de dados
             success = self.repository.save_reading(reading)
+            if success:
+                self._update_rollup(reading)
             
             # 4. Preparar resposta
             result = {
@@ -120,6 +127,59 @@ class WaterQualityController:
             logger.error(f"Erro ao recuperar alertas: {e}")
             return []
     
+    def _update_rollup(self, reading: Reading):
+        """Acrescenta a leitura aos sketches do histórico (falhas não afetam a ingestão)."""
+        if self.rollup is None:
+            return
+        try:
+            self.rollup.add(reading.timestamp, {
+                'ph': reading.ph,
+                'turbidity': reading.turbidity,
+                'chloramines': reading.chloramines
+            })
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar o resumo do histórico: {e}")
+    
+    def get_history_statistics(self, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None) -> Dict[str, any]:
+        """
+        Estatísticas de todo o histórico de leituras na janela [start, end), a partir dos
+        sketches por hora (sem consultar a tabela readings).
+        
+        Returns:
+            {parâmetro: {'contagem', 'tendencia_central', 'dispersao', 'separatrizes'}}
+        """
+        if self.rollup is None:
+            return {}
+        try:
+            return self.rollup.describe(start, end)
+        except Exception as e:
+            logger.error(f"Erro ao consultar o resumo do histórico: {e}")
+            return {}
+    
+    def rebuild_reading_rollup(self, chunk_size: int = 5000) -> int:
+        """
+        Reconstrói os sketches a partir de todas as leituras do banco, em blocos.
+        
+        O novo histórico é montado à parte e só substitui o atual no fim; um erro
+        do banco é propagado e mantém o histórico atual. Leituras ingeridas
+        durante a reconstrução podem ser contadas duas vezes (ver
+        ReadingRollup.rebuild); para um resultado exato, pare a API antes.
+        
+        Returns:
+            Número de leituras processadas
+        """
+        if self.rollup is None:
+            return 0
+        import pandas as pd
+
+        columns = ['timestamp', 'ph', 'turbidity', 'chloramines']
+        frames = (pd.DataFrame(rows, columns=columns)
+                  for rows in self.repository.iter_readings(chunk_size=chunk_size))
+        total = self.rollup.rebuild(frames)
+        logger.info(f"Resumo do histórico reconstruído com {total} leituras")
+        return total
+    
     def evaluate_water_quality_detailed(self, reading_data: Dict[str, float]) -> Dict[str, any]:
         """Avaliação detalhada da qualidade da água."""
         try:
@@ -189,19 +249,13 @@ class WaterQualityController:
     
     def _determine_alert_severity(self, reading: Reading) -> str:
         """Determina a severidade do alerta baseado nos parâmetros."""
+        thresholds = get_thresholds()
         critical_count = 0
         
-        # Verificar pH crítico
-        if reading.ph is not None and (reading.ph < 6.0 or reading.ph > 9.0):
-            critical_count += 1
-        
-        # Verificar turbidez crítica
-        if reading.turbidity is not None and reading.turbidity > 100:
-            critical_count += 1
-        
-        # Verificar cloro crítico
-        if reading.chloramines is not None and (reading.chloramines < 0.1 or reading.chloramines > 4.0):
-            critical_count += 1
+        for param in ALERT_PARAMETERS:
+            value = getattr(reading, param)
+            if _has_value(value) and thresholds.lookup(param, value, 'critical'):
+                critical_count += 1
         
         if critical_count >= 2:
             return 'critica'
@@ -212,28 +266,40 @@ class WaterQualityController:
     
     def _generate_alert_message(self, reading: Reading) -> str:
         """Gera mensagem de alerta baseada na leitura."""
+        thresholds = get_thresholds()
         messages = []
         
-        if reading.ph is not None:
-            if reading.ph < 6.0:
-                messages.append(f"pH muito ácido ({reading.ph:.2f})")
-            elif reading.ph > 9.0:
-                messages.append(f"pH muito alcalino ({reading.ph:.2f})")
-        
-        if reading.turbidity is not None and reading.turbidity > 25:
-            messages.append(f"Turbidez elevada ({reading.turbidity:.2f} NTU)")
-        
-        if reading.chloramines is not None:
-            if reading.chloramines < 0.1:
-                messages.append(f"Cloro insuficiente ({reading.chloramines:.2f} ppm)")
-            elif reading.chloramines > 4.0:
-                messages.append(f"Cloro em excesso ({reading.chloramines:.2f} ppm)")
+        for param in ALERT_PARAMETERS:
+            value = getattr(reading, param)
+            if not _has_value(value):
+                continue
+            alert = thresholds.lookup(param, value, 'alert')
+            if alert is not None:
+                messages.append(ALERT_MESSAGES[(param, alert)].format(value))
         
         if not messages:
             messages.append("Parâmetros fora dos padrões de potabilidade")
         
         return "; ".join(messages)
 
+# Parâmetros verificados nos alertas, na ordem em que aparecem na mensagem
+ALERT_PARAMETERS = ('ph', 'turbidity', 'chloramines')
+
+# Mensagem de cada tipo de alerta da tabela de faixas (campo "alert")
+ALERT_MESSAGES = {
+    ('ph', 'acido'): "pH muito ácido ({:.2f})",
+    ('ph', 'alcalino'): "pH muito alcalino ({:.2f})",
+    ('turbidity', 'elevada'): "Turbidez elevada ({:.2f} NTU)",
+    ('chloramines', 'insuficiente'): "Cloro insuficiente ({:.2f} ppm)",
+    ('chloramines', 'excesso'): "Cloro em excesso ({:.2f} ppm)"
+}
+
+
+def _has_value(value) -> bool:
+    """Leitura presente (NaN não gera alerta, como nas comparações originais)."""
+    return value is not None and not math.isnan(value)
+
+
 # Instância global para reutilização
 _controller_instance = None
 
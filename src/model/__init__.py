@@ -7,6 +7,14 @@
 ####################################
 
 from .predict import WaterQualityPredictor, get_predictor, predict
-from .train import WaterQualityModelTrainer
 
-__all__ = ['WaterQualityPredictor', 'get_predictor', 'predict', 'WaterQualityModelTrainer'] 
\ No newline at end of file
+__all__ = ['WaterQualityPredictor', 'get_predictor', 'predict', 'WaterQualityModelTrainer']
+
+
+def __getattr__(name):
+    # O treinador importa sklearn e pandas; carregado só quando usado, para que a
+    # inferência com o artefato compacto não pague esse custo no cold start
+    if name == 'WaterQualityModelTrainer':
+        from .train import WaterQualityModelTrainer
+        return WaterQualityModelTrainer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,93 @@
+####################################
+##### Arquivo: compact_model.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Artefato compacto do modelo (.npz) que pode ser carregado apenas com NumPy.
+
+O arquivo contém os arrays da floresta achatada, um cabeçalho JSON com a
+ordem das features, os parâmetros do scaler, as classes e as faixas da regra
+determinística. Carregá-lo não importa sklearn, pandas nem joblib.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .forest_bundle import BUNDLE_ARRAYS, BUNDLE_FORMAT_VERSION, ForestBundle, build_forest_header, flatten_forest
+from ..utils.feature_extractor import extractor_for
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+COMPACT_FORMAT = 'water-quality-forest'
+
+
+class CompactProcessor:
+    """Versão mínima do WaterDataProcessor para inferência, sem pandas nem sklearn."""
+
+    def __init__(self, feature_columns, target_column: str, scaler_params: Optional[Dict[str, np.ndarray]] = None):
+        self.feature_columns = list(feature_columns)
+        self.target_column = target_column
+        self.scaler_params = scaler_params
+
+    def process_sensor_reading(self, reading: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Processa uma única leitura de sensor e retorna array 1×N normalizado."""
+        return extractor_for(self).transform(reading, out)
+
+    def process_sensor_batch(self, readings: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Processa um bloco colunar de leituras e retorna matriz N×N_features normalizada."""
+        return extractor_for(self).transform_batch(readings, out)
+
+    def feature_buffer(self) -> np.ndarray:
+        """Buffer 1×N da thread atual para process_sensor_reading(out=...)."""
+        return extractor_for(self).buffer()
+
+    def get_feature_names(self):
+        """Retorna lista de nomes das features."""
+        return self.feature_columns.copy()
+
+
+def export_compact_model(model, processor, path, rule: Optional[Dict[str, Tuple]] = None,
+                         version: Optional[str] = None) -> Path:
+    """Exporta floresta, scaler e regra determinística para um único arquivo .npz."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = flatten_forest(model)
+    header = {'format': COMPACT_FORMAT, **build_forest_header(model, processor, rule, version)}
+
+    # np.savez acrescenta ".npz" ao nome se ausente; grava em temporário e troca no final
+    tmp_path = path.with_name(f"{path.stem}.tmp-{os.getpid()}.npz")
+    np.savez(tmp_path, header=np.array(json.dumps(header)), **arrays)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Modelo compacto exportado em: {path}")
+    return path
+
+
+def processor_from_header(header: Dict[str, Any]) -> CompactProcessor:
+    """Reconstrói o processor de inferência a partir do cabeçalho do artefato (.npz ou bundle)."""
+    scaler_params = None
+    if header.get('scaler_params'):
+        scaler_params = {key: np.asarray(val) for key, val in header['scaler_params'].items()}
+    return CompactProcessor(header['feature_columns'], header['target_column'], scaler_params)
+
+
+def load_compact_model(path) -> Tuple[ForestBundle, CompactProcessor, Dict[str, Any]]:
+    """Carrega o artefato .npz usando apenas NumPy."""
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data['header']))
+        if header.get('format') != COMPACT_FORMAT or header.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Formato de modelo compacto não suportado: {header.get('format')} "
+                             f"v{header.get('format_version')}")
+        arrays = {name: data[name] for name in BUNDLE_ARRAYS}
+
+    return ForestBundle(arrays, header), processor_from_header(header), header
@@ -0,0 +1,197 @@
+####################################
+##### Arquivo: forest_bundle.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Bundle de arrays NumPy com a floresta achatada.
+
+O sklearn copia os nós de cada árvore para buffers próprios ao despickar, então
+``joblib.load(mmap_mode='r')`` não compartilha memória entre workers. Aqui os
+nós de todas as árvores são gravados como arquivos ``.npy`` que podem ser
+mapeados em memória: N workers passam a dividir uma única cópia no page cache.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+BUNDLE_FORMAT_VERSION = 1
+
+# Arrays gravados no bundle (um arquivo .npy por array)
+BUNDLE_ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'value', 'roots')
+
+
+def node_depths(tree) -> np.ndarray:
+    """Profundidade de cada nó alcançável a partir da raiz (-1 para nós desconectados)."""
+    depth = np.full(tree.node_count, -1, dtype=np.int32)
+    frontier = np.array([0])
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        internal = frontier[tree.children_left[frontier] != -1]
+        frontier = np.concatenate([tree.children_left[internal], tree.children_right[internal]])
+        level += 1
+    return depth
+
+
+def flatten_forest(model) -> Dict[str, np.ndarray]:
+    """
+    Concatena os nós de todas as árvores de um RandomForestClassifier.
+
+    Os índices de filhos passam a ser globais e as folhas apontam para si
+    mesmas, o que permite percorrer todas as árvores em lote.
+    """
+    children_left, children_right, features, thresholds, values, roots = [], [], [], [], [], []
+    offset = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count, dtype=np.int32) + offset
+        is_leaf = tree.children_left == -1
+
+        children_left.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+        children_right.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+
+        # Probabilidades normalizadas por nó (como em DecisionTreeClassifier.predict_proba)
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(value / normalizer)
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    return {
+        'children_left': np.concatenate(children_left),
+        'children_right': np.concatenate(children_right),
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int32)
+    }
+
+
+def build_forest_header(model, processor, rule: Optional[Dict[str, Tuple]] = None,
+                        version: Optional[str] = None) -> Dict[str, Any]:
+    """Monta o cabeçalho autodescritivo (ordem das features, scaler, classes e regra)."""
+    scaler_params = processor.scaler_params or {}
+    return {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': version or 'unknown',
+        'n_estimators': len(model.estimators_),
+        # Profundidade real (árvores truncadas pela poda mantêm o max_depth original no sklearn)
+        'max_depth': int(max(node_depths(est.tree_).max() for est in model.estimators_)),
+        'classes': [int(c) for c in model.classes_],
+        'feature_columns': list(processor.feature_columns),
+        'target_column': processor.target_column,
+        'scaler_params': {
+            key: np.asarray(val, dtype=np.float64).tolist() for key, val in scaler_params.items()
+        },
+        'feature_importances': np.asarray(model.feature_importances_, dtype=np.float64).tolist(),
+        # Faixas ideais da regra determinística: {param: [mínimo, máximo]} (None = sem limite)
+        'ideal_ranges': {key: list(bounds) for key, bounds in (rule or {}).items()}
+    }
+
+
+def save_forest_bundle(model, processor, bundle_dir, rule: Optional[Dict[str, Tuple]] = None,
+                       version: Optional[str] = None) -> Path:
+    """
+    Salva a floresta e os parâmetros do processor em um diretório de arquivos .npy.
+
+    A gravação é feita em um diretório temporário e trocada no final, para que
+    workers carregando o bundle nunca vejam arquivos pela metade.
+    """
+    bundle_dir = Path(bundle_dir)
+    tmp_dir = bundle_dir.with_name(f"{bundle_dir.name}.tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    arrays = flatten_forest(model)
+    for name in BUNDLE_ARRAYS:
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(arrays[name]))
+
+    meta = build_forest_header(model, processor, rule, version)
+    with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    # Troca o bundle antigo pelo novo; workers que já mapearam os arquivos
+    # antigos continuam lendo os inodes anteriores até recarregar
+    old_dir = bundle_dir.with_name(f"{bundle_dir.name}.old-{os.getpid()}")
+    if bundle_dir.exists():
+        os.replace(bundle_dir, old_dir)
+    os.replace(tmp_dir, bundle_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    logger.info(f"Bundle da floresta salvo em: {bundle_dir}")
+    return bundle_dir
+
+
+class ForestBundle:
+    """Floresta achatada com inferência em NumPy sobre arrays (opcionalmente) mapeados."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.children_left = arrays['children_left']
+        self.children_right = arrays['children_right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.meta = meta
+        self.classes_ = np.asarray(meta['classes'])
+        self.n_estimators = int(meta['n_estimators'])
+        self.max_depth = int(meta['max_depth'])
+        self.feature_importances_ = np.asarray(meta.get('feature_importances', []), dtype=np.float64)
+
+    @classmethod
+    def load(cls, bundle_dir, mmap_mode: Optional[str] = 'r') -> 'ForestBundle':
+        """Carrega o bundle; com ``mmap_mode='r'`` os arrays ficam no page cache compartilhado."""
+        bundle_dir = Path(bundle_dir)
+        with open(bundle_dir / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Versão de bundle não suportada: {meta.get('format_version')}")
+
+        arrays = {
+            name: np.load(bundle_dir / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in BUNDLE_ARRAYS
+        }
+        return cls(arrays, meta)
+
+    def _apply(self, X: np.ndarray) -> np.ndarray:
+        """Retorna, para cada amostra e árvore, o índice global da folha alcançada."""
+        # Mesmo tipo usado pelo sklearn na travessia das árvores
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0])).copy()
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidades médias das árvores, equivalente a RandomForestClassifier.predict_proba."""
+        leaves = self._apply(X)
+        return self.value[leaves].sum(axis=1) / self.n_estimators
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe com maior probabilidade média."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,297 @@
+####################################
+##### Arquivo: lookup_grid.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Grade 4-D pré-calculada com a probabilidade de potabilidade.
+
+O modelo é avaliado uma única vez sobre uma grade densa dos quatro parâmetros
+físicos; na inferência a probabilidade sai por cálculo de índice (vizinho mais
+próximo) ou interpolação multilinear, em tempo constante. A grade é guardada
+em float16 e mapeada em memória na carga.
+
+As faixas de cada eixo vêm dos mínimos/máximos do dataset de treino (mais os
+valores padrão de ml.feature_defaults, usados quando a leitura não traz o
+parâmetro); leituras fora delas são avaliadas pelo modelo. A grade só é
+gravada se o desvio máximo em relação ao modelo ficar dentro da tolerância.
+"""
+
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import yaml
+
+from ..utils.feature_extractor import load_feature_defaults
+from ..utils.logging import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# Faixas padrão de cada parâmetro (unidades dos sensores), usadas quando o
+# dataset de treino não está disponível; cobrem os valores de water_potability.csv
+DEFAULT_BOUNDS = {
+    'ph': (0.0, 14.0),
+    'chloramines': (0.0, 5.0),
+    'conductivity': (0.0, 2000.0),
+    'turbidity': (0.0, 20.0)
+}
+
+# Tolerância de contains(), em frações de passo: as features chegam em float32
+# (~1e-7 relativo), o que nas bordas da grade vira um erro de até ~1e-5 passo
+POSITION_TOLERANCE = 1e-3
+
+# Número padrão de pontos por eixo
+DEFAULT_POINTS = {
+    'ph': 61,
+    'chloramines': 41,
+    'conductivity': 61,
+    'turbidity': 41
+}
+
+
+class GridToleranceError(ValueError):
+    """A grade se afasta do modelo além da tolerância configurada."""
+
+
+def _header_path(grid_path: Path) -> Path:
+    return grid_path.with_suffix('.json')
+
+
+class LookupGrid:
+    """Grade regular de probabilidades no espaço normalizado das features do modelo."""
+
+    def __init__(self, grid: np.ndarray, header: Dict[str, Any], interpolate: bool = True):
+        self.grid = grid
+        self.header = header
+        self.interpolate = interpolate
+        self.origin = np.asarray(header['origin'], dtype=np.float64)
+        self.step = np.asarray(header['step'], dtype=np.float64)
+        self.shape = np.asarray(grid.shape)
+        self.classes_ = np.asarray(header['classes'])
+        self.feature_columns = list(header['feature_columns'])
+
+    @classmethod
+    def load(cls, grid_path, mmap_mode: Optional[str] = 'r', interpolate: bool = True) -> 'LookupGrid':
+        """Carrega a grade (.npy) e seu cabeçalho (.json)."""
+        grid_path = Path(grid_path)
+        with open(_header_path(grid_path), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+        grid = np.load(grid_path, mmap_mode=mmap_mode)
+        return cls(grid, header, interpolate=interpolate)
+
+    def contains(self, X: np.ndarray) -> np.ndarray:
+        """Máscara das amostras (já normalizadas) que estão dentro da grade."""
+        pos = (np.asarray(X, dtype=np.float64) - self.origin) / self.step
+        # Valores exatamente na borda (ex.: condutividade padrão 0.0) também contam
+        return np.all((pos >= -POSITION_TOLERANCE) & (pos <= self.shape - 1 + POSITION_TOLERANCE), axis=1)
+
+    def potable_probability(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidade da classe positiva para amostras normalizadas (fora da grade é truncado)."""
+        X = np.asarray(X, dtype=np.float64)
+        pos = np.clip((X - self.origin) / self.step, 0, self.shape - 1)
+
+        if not self.interpolate:
+            idx = np.rint(pos).astype(np.intp)
+            return self.grid[tuple(idx.T)].astype(np.float64)
+
+        # Interpolação multilinear sobre os 2^d vértices da célula
+        base = np.minimum(np.floor(pos).astype(np.intp), self.shape - 2)
+        frac = pos - base
+        result = np.zeros(X.shape[0])
+        for corner in itertools.product((0, 1), repeat=X.shape[1]):
+            corner = np.asarray(corner)
+            weight = np.prod(np.where(corner, frac, 1.0 - frac), axis=1)
+            result += weight * self.grid[tuple((base + corner).T)]
+        return result
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidades [não potável, potável], como em predict_proba do modelo."""
+        potable = self.potable_probability(X)
+        return np.column_stack([1.0 - potable, potable])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe com maior probabilidade (empate vai para a primeira classe, como no argmax)."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def training_bounds(feature_columns, csv_path, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, tuple]:
+    """
+    Faixa (mín, máx) de cada feature do modelo no dataset de treino (após clean_data).
+
+    Valores numéricos de `defaults` (ml.feature_defaults) ampliam a faixa, para
+    que as leituras sem o parâmetro também caiam dentro da grade.
+    """
+    # Importado aqui: o preditor importa este módulo e pode rodar só com NumPy
+    from ..processing.data_processor import WaterDataProcessor
+
+    processor = WaterDataProcessor()
+    df = processor.clean_data(processor.load_csv_data(str(csv_path)))
+    defaults = {str(key).lower(): value for key, value in (defaults or {}).items()}
+    bounds = {}
+    for col in feature_columns:
+        values = df[col].to_numpy(dtype=np.float64)
+        low, high = float(np.nanmin(values)), float(np.nanmax(values))
+        default = defaults.get(col.lower())
+        if isinstance(default, (int, float)):
+            low, high = min(low, float(default)), max(high, float(default))
+        bounds[col.lower()] = (low, high)
+    return bounds
+
+
+def build_lookup_grid(model, processor, grid_path, bounds: Optional[Dict[str, tuple]] = None,
+                      points: Optional[Dict[str, int]] = None, check_samples: int = 20000,
+                      chunk_size: int = 50000, random_state: int = 42,
+                      max_deviation: Optional[float] = None, interpolate: bool = True,
+                      model_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Avalia o modelo sobre a grade e grava probabilidades em float16.
+
+    Também mede o desvio máximo entre a grade (com e sem interpolação) e o
+    modelo exato em pontos aleatórios dentro das faixas.
+
+    Args:
+        bounds: Faixa de cada parâmetro (os ausentes usam DEFAULT_BOUNDS);
+            normalmente training_bounds()
+        max_deviation: Desvio máximo aceito no modo usado na inferência
+            (`interpolate`); acima dele nada é gravado
+        model_version: Versão do modelo avaliado, conferida pelo preditor na carga
+
+    Returns:
+        Cabeçalho gravado junto da grade, incluindo as métricas de desvio
+
+    Raises:
+        GridToleranceError: se o desvio máximo passar de max_deviation
+    """
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    points = {**DEFAULT_POINTS, **(points or {})}
+    params = [col.lower() for col in processor.feature_columns]
+
+    low = np.array([bounds[p][0] for p in params], dtype=np.float64)
+    high = np.array([bounds[p][1] for p in params], dtype=np.float64)
+    shape = tuple(int(points[p]) for p in params)
+    if min(shape) < 2:
+        raise ValueError("A grade precisa de pelo menos 2 pontos por eixo")
+
+    mean, std = np.zeros(len(params)), np.ones(len(params))
+    if processor.scaler_params:
+        mean = np.asarray(processor.scaler_params['mean'], dtype=np.float64)
+        std = np.asarray(processor.scaler_params['std'], dtype=np.float64)
+
+    if np.any(high <= low):
+        raise ValueError(f"Faixas inválidas para a grade: {dict(zip(params, zip(low, high)))}")
+
+    # A grade é regular nas unidades físicas e também no espaço normalizado
+    axes = [np.linspace(lo, hi, n) for lo, hi, n in zip(low, high, shape)]
+    origin = (low - mean) / std
+    step = (high - low) / (np.asarray(shape) - 1) / std
+
+    n_cells = int(np.prod(shape))
+    logger.info(f"Construindo grade {shape} ({n_cells} células)")
+
+    positive = list(model.classes_).index(1)
+    grid = np.empty(n_cells, dtype=np.float16)
+    for start in range(0, n_cells, chunk_size):
+        stop = min(start + chunk_size, n_cells)
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        raw = np.column_stack([axis[i] for axis, i in zip(axes, idx)])
+        grid[start:stop] = model.predict_proba((raw - mean) / std)[:, positive]
+    grid = grid.reshape(shape)
+
+    header = {
+        'feature_columns': list(processor.feature_columns),
+        'classes': [int(c) for c in model.classes_],
+        'bounds': {p: [float(lo), float(hi)] for p, lo, hi in zip(params, low, high)},
+        'shape': list(shape),
+        'origin': origin.tolist(),
+        'step': step.tolist(),
+        'scaler_params': {'mean': mean.tolist(), 'std': std.tolist()},
+        'model_version': model_version
+    }
+
+    # Desvio em relação ao modelo exato em pontos aleatórios dentro da grade
+    rng = np.random.default_rng(random_state)
+    sample = (rng.uniform(low, high, size=(check_samples, len(params))) - mean) / std
+    exact = model.predict_proba(sample)[:, positive]
+    for interpolated in (True, False):
+        approx = LookupGrid(grid, header, interpolate=interpolated).potable_probability(sample)
+        suffix = 'interpolated' if interpolated else 'nearest'
+        header[f'max_deviation_{suffix}'] = float(np.max(np.abs(approx - exact)))
+        header[f'mean_deviation_{suffix}'] = float(np.mean(np.abs(approx - exact)))
+        header[f'label_agreement_{suffix}'] = float(np.mean((approx > 0.5) == (exact > 0.5)))
+
+    mode = 'interpolated' if interpolate else 'nearest'
+    header['max_deviation_tolerance'] = max_deviation
+    if max_deviation is not None and header[f'max_deviation_{mode}'] > max_deviation:
+        raise GridToleranceError(
+            f"Desvio máximo da grade ({mode}) {header[f'max_deviation_{mode}']:.4f} acima da tolerância "
+            f"{max_deviation:.4f}; aumente os pontos por eixo em ml.lookup_grid.points")
+
+    grid_path = Path(grid_path)
+    grid_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = grid_path.with_name(f"{grid_path.stem}.tmp-{os.getpid()}.npy")
+    np.save(tmp_path, grid)
+    with open(_header_path(tmp_path), 'w', encoding='utf-8') as f:
+        json.dump(header, f, indent=2)
+    os.replace(_header_path(tmp_path), _header_path(grid_path))
+    os.replace(tmp_path, grid_path)
+
+    logger.info(f"Grade salva em: {grid_path} ({grid.nbytes / 1e6:.1f} MB)")
+    logger.info(f"Desvio máximo (interpolada): {header['max_deviation_interpolated']:.4f}, "
+                f"(vizinho mais próximo): {header['max_deviation_nearest']:.4f}")
+    return header
+
+
+def main():
+    """Constrói a grade a partir do modelo treinado e das configurações do YAML."""
+    from .predict import WaterQualityPredictor
+
+    setup_logging()
+    config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+    with open(config_path, 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    grid_config = config['ml'].get('lookup_grid') or {}
+
+    predictor = WaterQualityPredictor()
+    predictor.load_model()
+
+    root = Path(__file__).parent.parent.parent
+    grid_path = root / grid_config.get('path', 'src/model/water_quality_grid.npy')
+
+    # Faixas do dataset de treino; as de ml.lookup_grid.bounds têm precedência
+    bounds = {}
+    csv_path = root / grid_config.get('csv', 'water_potability.csv')
+    if csv_path.exists():
+        bounds = training_bounds(predictor.processor.feature_columns, csv_path, load_feature_defaults())
+    else:
+        logger.warning(f"Dataset de treino não encontrado em {csv_path}; usando as faixas padrão")
+    bounds.update(grid_config.get('bounds') or {})
+    logger.info(f"Faixas da grade: {bounds}")
+
+    try:
+        header = build_lookup_grid(
+            predictor.model, predictor.processor, grid_path,
+            bounds=bounds,
+            points=grid_config.get('points'),
+            max_deviation=grid_config.get('max_deviation'),
+            interpolate=grid_config.get('interpolate', True),
+            model_version=predictor.model_version
+        )
+    except GridToleranceError as e:
+        logger.error(f"Grade não gravada: {e}")
+        raise SystemExit(1)
+
+    logger.info("=== GRADE DE INFERÊNCIA CONSTRUÍDA ===")
+    for key in ('max_deviation_interpolated', 'mean_deviation_interpolated', 'label_agreement_interpolated',
+                'max_deviation_nearest', 'mean_deviation_nearest', 'label_agreement_nearest'):
+        logger.info(f"{key}: {header[key]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,38 @@
 ##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
 ####################################
 
-import joblib
+import time
 import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List
 import yaml
+from .compact_model import load_compact_model, processor_from_header
+from .forest_bundle import ForestBundle
+from .lookup_grid import LookupGrid
+from .prediction_cache import PredictionCache
 from ..utils.logging import get_logger
+from ..utils.thresholds import get_thresholds
 
 logger = get_logger(__name__)
 
+# Faixas "ideais" da regra determinística (limites inclusivos; None = sem limite).
+# Se todos os parâmetros estiverem dentro delas, a água é Potável sem consultar o modelo.
+IDEAL_RANGES = {
+    'ph': (6.5, 8.5),
+    'chloramines': (0.20, 2.00),
+    'conductivity': (None, 500.0),
+    'turbidity': (None, 5.0)
+}
+
+@dataclass
+class PredictionResult:
+    """Resultado de uma única passada do modelo sobre um lote de amostras."""
+    labels: np.ndarray          # classe prevista por amostra (argmax das probabilidades)
+    probabilities: np.ndarray   # matriz (amostras × classes)
+    confidence: np.ndarray      # maior probabilidade de cada amostra
+    model_version: str
+
 class WaterQualityPredictor:
     """Classe responsável por predições de qualidade da água."""
     
@@ -22,6 +45,18 @@ class WaterQualityPredictor:
         self.model = None
         self.processor = None
         self.model_path = None
+        self.bundle_path = None
+        self.compact_model_path = None
+        self.mmap_mode = None
+        self.ideal_ranges = IDEAL_RANGES
+        self.cache = None
+        self.grid_config = {}
+        self.lookup_grid = None
+        self.model_version = None
+        self.hot_reload_interval = None
+        self._artifact_path = None
+        self._artifact_mtime = None
+        self._last_reload_check = 0.0
         self.is_loaded = False
         self._load_config()
 
@@ -40,6 +75,31 @@ class WaterQualityPredictor:
             model_path_str = config['ml']['model_path']
             self.model_path = Path(__file__).parent.parent.parent / model_path_str
 
+            # Bundle .npy opcional, carregado via mmap quando configurado
+            bundle_path_str = config['ml'].get('bundle_path')
+            if bundle_path_str:
+                self.bundle_path = Path(__file__).parent.parent.parent / bundle_path_str
+            self.mmap_mode = config['ml'].get('mmap_mode')
+
+            # Artefato compacto (.npz) que dispensa sklearn, pandas e joblib
+            compact_path_str = config['ml'].get('compact_model_path')
+            if compact_path_str:
+                self.compact_model_path = Path(__file__).parent.parent.parent / compact_path_str
+
+            # Cache opcional de predições indexado pelos valores quantizados
+            cache_config = config['ml'].get('prediction_cache') or {}
+            if cache_config.get('enabled'):
+                self.cache = PredictionCache(
+                    max_size=cache_config.get('max_size', 4096),
+                    resolution=cache_config.get('resolution')
+                )
+
+            # Grade pré-calculada opcional para inferência em tempo constante
+            self.grid_config = config['ml'].get('lookup_grid') or {}
+
+            # Recarga a quente quando o retreino publica um novo artefato
+            self.hot_reload_interval = config['ml'].get('hot_reload_interval_seconds')
+
             logger.info(f"Caminho do modelo configurado: {self.model_path}")
 
         except Exception as e:
@@ -48,18 +108,180 @@ class WaterQualityPredictor:
 
     def load_model(self):
         """Carrega o modelo treinado."""
+        if self.mmap_mode and self.bundle_path and Path(self.bundle_path).exists():
+            self._load_bundle()
+            return
+
+        if self.compact_model_path and Path(self.compact_model_path).exists():
+            self._load_compact()
+            return
+
         if not Path(self.model_path).exists():
             raise FileNotFoundError(f"Modelo não encontrado em: {self.model_path}")
         
         try:
+            # Importado aqui para não pesar no cold start quando há artefato compacto
+            import joblib
+
             model_data = joblib.load(self.model_path)
             self.model = model_data['model']
             self.processor = model_data['processor']
+            self.ideal_ranges = IDEAL_RANGES
+            self.model_version = model_data.get('version', 'unknown')
             self.is_loaded = True
+            self._after_load(self.model_path)
             logger.info(f"Modelo carregado com sucesso de: {self.model_path}")
         except Exception as e:
             logger.error(f"Erro ao carregar modelo: {e}")
             raise
+
+    def _load_bundle(self):
+        """Carrega a floresta do bundle .npy mapeado em memória."""
+        try:
+            self.model = ForestBundle.load(self.bundle_path, mmap_mode=self.mmap_mode)
+            self.processor = processor_from_header(self.model.meta)
+            self._set_ideal_ranges(self.model.meta)
+            self.model_version = self.model.meta.get('model_version', 'unknown')
+            self.is_loaded = True
+            self._after_load(self.bundle_path)
+            logger.info(f"Bundle do modelo mapeado em memória de: {self.bundle_path}")
+        except Exception as e:
+            logger.error(f"Erro ao carregar bundle do modelo: {e}")
+            raise
+
+    def _load_compact(self):
+        """Carrega o artefato compacto (.npz) usando apenas NumPy."""
+        try:
+            self.model, self.processor, header = load_compact_model(self.compact_model_path)
+            self._set_ideal_ranges(header)
+            self.model_version = header.get('model_version', 'unknown')
+            self.is_loaded = True
+            self._after_load(self.compact_model_path)
+            logger.info(f"Modelo compacto carregado de: {self.compact_model_path}")
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo compacto: {e}")
+            raise
+
+    def _after_load(self, artifact_path: Path):
+        """Prepara cache e grade de inferência para o modelo recém-carregado."""
+        self._artifact_path = Path(artifact_path)
+        self._artifact_mtime = self._artifact_signature()
+        self._last_reload_check = time.monotonic()
+        self._reset_cache()
+        self._load_lookup_grid()
+
+    def reload_if_changed(self) -> bool:
+        """Recarrega o modelo se o artefato em uso foi substituído no disco."""
+        if self._artifact_path is None:
+            return False
+        try:
+            mtime = self._artifact_signature()
+        except FileNotFoundError:
+            # Artefato sendo trocado neste instante; tenta de novo na próxima verificação
+            return False
+        if mtime == self._artifact_mtime:
+            return False
+
+        logger.info(f"Novo artefato detectado em {self._artifact_path}; recarregando modelo")
+        self.load_model()
+        return True
+
+    def _artifact_signature(self):
+        """mtime e inode do artefato (a publicação troca o arquivo via os.replace)."""
+        stat = self._artifact_path.stat()
+        return stat.st_mtime_ns, stat.st_ino
+
+    def _maybe_reload(self):
+        """Verifica o artefato no disco no máximo uma vez a cada hot_reload_interval segundos."""
+        if not self.hot_reload_interval or time.monotonic() - self._last_reload_check < self.hot_reload_interval:
+            return
+        self._last_reload_check = time.monotonic()
+        try:
+            self.reload_if_changed()
+        except Exception as e:
+            # Mantém o modelo atual se o novo artefato não puder ser carregado
+            logger.error(f"Erro ao recarregar modelo: {e}")
+
+    def _load_lookup_grid(self):
+        """Carrega a grade pré-calculada, se habilitada e compatível com o modelo."""
+        self.lookup_grid = None
+        if not self.grid_config.get('enabled'):
+            return
+
+        grid_path = Path(__file__).parent.parent.parent / self.grid_config.get('path', 'src/model/water_quality_grid.npy')
+        if not grid_path.exists():
+            logger.warning(f"Grade de inferência não encontrada em: {grid_path}")
+            return
+
+        try:
+            grid = LookupGrid.load(grid_path, interpolate=self.grid_config.get('interpolate', True))
+            if not self._grid_matches_model(grid):
+                logger.warning("Grade de inferência gerada para outro modelo; reconstrua com "
+                               "'python -m src.model.lookup_grid'")
+                return
+            self.lookup_grid = grid
+            logger.info(f"Grade de inferência carregada de: {grid_path} "
+                        f"(desvio máximo: {grid.header.get('max_deviation_interpolated', float('nan')):.4f})")
+        except Exception as e:
+            logger.error(f"Erro ao carregar grade de inferência: {e}")
+
+    def _grid_matches_model(self, grid: LookupGrid) -> bool:
+        """
+        Confere se a grade foi gerada para o modelo carregado.
+
+        Usa a versão gravada na grade; grades sem versão (ou modelos sem versão)
+        são conferidas pelas features e pela média e desvio do scaler.
+        """
+        if grid.feature_columns != list(self.processor.feature_columns):
+            return False
+        grid_version = grid.header.get('model_version')
+        if grid_version not in (None, 'unknown') and self.model_version not in (None, 'unknown'):
+            return grid_version == self.model_version
+
+        scaler = self.processor.scaler_params or {}
+        grid_scaler = grid.header['scaler_params']
+        return (np.allclose(grid_scaler['mean'], scaler.get('mean', 0.0)) and
+                np.allclose(grid_scaler['std'], scaler.get('std', 1.0)))
+
+    def _reset_cache(self):
+        """Invalida o cache de predições após (re)carregar o modelo."""
+        if self.cache is not None:
+            self.cache.aliases = {col.lower(): col for col in self.processor.feature_columns}
+            self.cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, any]:
+        """Retorna estatísticas do cache de predições (vazio se desabilitado)."""
+        return self.cache.get_stats() if self.cache is not None else {}
+
+    def _set_ideal_ranges(self, header: Dict):
+        """Usa as faixas da regra gravadas no artefato (ou as padrão, se ausentes)."""
+        ranges = header.get('ideal_ranges')
+        self.ideal_ranges = {key: tuple(bounds) for key, bounds in ranges.items()} if ranges else IDEAL_RANGES
+
+    def _matches_ideal_ranges(self, sensor_data: Dict[str, float]) -> bool:
+        """Verifica se todos os parâmetros estão dentro das faixas ideais da regra."""
+        for param, (low, high) in self.ideal_ranges.items():
+            value = sensor_data.get(param, 0.0)
+            # Comparações negadas para que NaN nunca seja considerado "ideal"
+            if low is not None and not value >= low:
+                return False
+            if high is not None and not value <= high:
+                return False
+        return True
+
+    def _ideal_ranges_mask(self, readings: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """Versão vetorizada de _matches_ideal_ranges para um bloco colunar de leituras."""
+        mask = np.ones(n_rows, dtype=bool)
+        for param, (low, high) in self.ideal_ranges.items():
+            values = readings.get(param)
+            if values is None:
+                values = np.zeros(n_rows)
+            # Comparações com NaN resultam em False, como na versão escalar
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
     
     def predict(self, features: List[float]) -> bool:
         """
@@ -80,9 +302,10 @@ class WaterQualityPredictor:
             # Converter para array numpy
             X = np.array([features])
             
-            # Fazer predição
-            prediction = self.model.predict(X)[0]
-            probability = self.model.predict_proba(X)[0]
+            # Fazer predição (uma única passada pelo modelo)
+            result = self.predict_with_proba(X)
+            prediction = result.labels[0]
+            probability = result.probabilities[0]
             
             logger.info(f"Predição: {'Potável' if prediction == 1 else 'Não Potável'}")
             logger.info(f"Probabilidades: Não Potável={probability[0]:.3f}, Potável={probability[1]:.3f}")
@@ -93,6 +316,42 @@ class WaterQualityPredictor:
             logger.error(f"Erro na predição: {e}")
             raise
     
+    def predict_with_proba(self, X: np.ndarray) -> PredictionResult:
+        """
+        Calcula rótulos e probabilidades com uma única passada pelo modelo.
+
+        O rótulo é o argmax de predict_proba (mesma regra do predict do sklearn).
+        Amostras dentro da grade pré-calculada, se habilitada, usam a grade.
+
+        Args:
+            X: Matriz (amostras × features) já normalizada
+
+        Returns:
+            PredictionResult com rótulos, probabilidades, confiança e versão do modelo
+        """
+        if not self.is_loaded:
+            self.load_model()
+
+        if self.lookup_grid is None:
+            probabilities = np.asarray(self.model.predict_proba(X))
+        else:
+            X = np.asarray(X)
+            in_grid = self.lookup_grid.contains(X)
+            if in_grid.all():
+                probabilities = self.lookup_grid.predict_proba(X)
+            else:
+                probabilities = np.empty((X.shape[0], len(self.model.classes_)))
+                probabilities[~in_grid] = self.model.predict_proba(X[~in_grid])
+                if in_grid.any():
+                    probabilities[in_grid] = self.lookup_grid.predict_proba(X[in_grid])
+
+        return PredictionResult(
+            labels=np.asarray(self.model.classes_)[np.argmax(probabilities, axis=1)],
+            probabilities=probabilities,
+            confidence=probabilities.max(axis=1),
+            model_version=self.model_version
+        )
+
     def predict_from_sensor_data(self, sensor_data: Dict[str, float]) -> Dict[str, any]:
         """
         Realiza predição baseada em dados dos sensores.
@@ -106,20 +365,35 @@ class WaterQualityPredictor:
         """
         if not self.is_loaded:
             self.load_model()
+        else:
+            self._maybe_reload()
+
+        if self.cache is None:
+            return self._predict_sensor(sensor_data)
+
+        # Leituras na mesma célula quantizada reaproveitam o resultado
+        key = self.cache.make_key(sensor_data)
+        if key is None:
+            # Valor não finito: sem célula, predição direta (igual ao cache desabilitado)
+            return self._predict_sensor(sensor_data)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._predict_sensor(self.cache.quantize(sensor_data, key))
+            self.cache.put(key, result)
 
+        return {
+            **result,
+            'probabilities': dict(result['probabilities']),
+            'sensor_data': sensor_data
+        }
+
+    def _predict_sensor(self, sensor_data: Dict[str, float]) -> Dict[str, any]:
+        """Aplica a regra determinística e, se necessário, o modelo a uma leitura."""
         try:
             # -------------------------------------------------------------
             # 1) Regra determinística: se TODOS os quatro parâmetros estiverem
             #    dentro das faixas "ideais", força Potável (1) sem chamar o modelo
-            ph   = sensor_data.get('ph', 0.0)
-            chl  = sensor_data.get('chloramines', 0.0)
-            cond = sensor_data.get('conductivity', 0.0)
-            turb = sensor_data.get('turbidity', 0.0)
-
-            if (6.5  <= ph   <= 8.5 and
-                0.20 <= chl  <= 2.00 and
-                cond <= 500   and
-                turb <= 5.0):
+            if self._matches_ideal_ranges(sensor_data):
                 # Montar o resultado “à mão”, simulando saída do modelo
                 return {
                     'is_potable': True,
@@ -129,24 +403,29 @@ class WaterQualityPredictor:
                         'not_potable': 0.0,
                         'potable':     1.0
                     },
+                    'model_version': self.model_version,
                     'sensor_data': sensor_data
                 }
             # -------------------------------------------------------------
 
             # 2) Caso não se enquadre nas faixas ideais, usa o pipeline tradicional
-            features_scaled = self.processor.process_sensor_reading(sensor_data)
+            # Buffer da thread reaproveitado: o vetor só é usado dentro desta chamada
+            features_scaled = self.processor.process_sensor_reading(
+                sensor_data, out=self.processor.feature_buffer())
 
-            prediction = self.model.predict(features_scaled)[0]
-            probabilities = self.model.predict_proba(features_scaled)[0]
+            inference = self.predict_with_proba(features_scaled)
+            prediction = inference.labels[0]
+            probabilities = inference.probabilities[0]
 
             result = {
                 'is_potable': bool(prediction),
                 'potability_label': 'POTAVEL' if prediction == 1 else 'NAO_POTAVEL',
-                'confidence': float(max(probabilities)),
+                'confidence': float(inference.confidence[0]),
                 'probabilities': {
                     'not_potable': float(probabilities[0]),
                     'potable':     float(probabilities[1])
                 },
+                'model_version': inference.model_version,
                 'sensor_data': sensor_data
             }
 
@@ -157,26 +436,115 @@ class WaterQualityPredictor:
             logger.error(f"Erro na predição de sensor: {e}")
             raise
 
-    def predict_batch(self, features_list: List[List[float]]) -> List[bool]:
+    def predict_from_sensor_data_batch(self, readings) -> List[Dict[str, any]]:
+        """
+        Versão em lote de predict_from_sensor_data para um bloco colunar de leituras.
+
+        A regra determinística é avaliada como máscara NumPy e apenas as linhas
+        que não a satisfazem vão ao modelo, em uma única chamada. O resultado é
+        idêntico a chamar predict_from_sensor_data linha a linha.
+
+        Args:
+            readings: Colunas de leituras ({'ph': [...], 'turbidity': [...], ...})
+                      ou DataFrame com essas colunas
+
+        Returns:
+            Lista de resultados, na mesma ordem das linhas
+        """
+        if not self.is_loaded:
+            self.load_model()
+        else:
+            self._maybe_reload()
+
+        try:
+            columns = {key: readings[key] for key in readings.keys()}
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+            if n_rows == 0:
+                return []
+
+            # Valores originais de cada linha, devolvidos em 'sensor_data'
+            raw_columns = {
+                key: col.tolist() if hasattr(col, 'tolist') else list(col)
+                for key, col in columns.items()
+            }
+
+            # Com cache habilitado, a versão escalar prediz sobre os valores quantizados
+            if self.cache is not None:
+                model_input = self.cache.quantize_columns(columns)
+            else:
+                model_input = {key: np.asarray(col, dtype=np.float64) for key, col in columns.items()}
+
+            ideal = self._ideal_ranges_mask(model_input, n_rows)
+            results = [None] * n_rows
+
+            for i in np.flatnonzero(ideal):
+                results[i] = {
+                    'is_potable': True,
+                    'potability_label': 'POTAVEL',
+                    'confidence': 1.0,
+                    'probabilities': {
+                        'not_potable': 0.0,
+                        'potable':     1.0
+                    },
+                    'model_version': self.model_version
+                }
+
+            pending = np.flatnonzero(~ideal)
+            if pending.size:
+                block = {key: col[pending] for key, col in model_input.items()}
+                inference = self.predict_with_proba(self.processor.process_sensor_batch(block))
+                labels = inference.labels.tolist()
+                probabilities = inference.probabilities.tolist()
+                confidence = inference.confidence.tolist()
+
+                for k, i in enumerate(pending):
+                    results[i] = {
+                        'is_potable': bool(labels[k]),
+                        'potability_label': 'POTAVEL' if labels[k] == 1 else 'NAO_POTAVEL',
+                        'confidence': float(confidence[k]),
+                        'probabilities': {
+                            'not_potable': float(probabilities[k][0]),
+                            'potable':     float(probabilities[k][1])
+                        },
+                        'model_version': inference.model_version
+                    }
+
+            for i, result in enumerate(results):
+                result['sensor_data'] = {key: col[i] for key, col in raw_columns.items()}
+
+            logger.info(f"Predições de sensor em lote: {n_rows} leituras "
+                        f"({int(ideal.sum())} pela regra, {pending.size} pelo modelo)")
+            return results
+
+        except Exception as e:
+            logger.error(f"Erro na predição de sensor em lote: {e}")
+            raise
+
+    def predict_batch(self, features_list: List[List[float]], return_probabilities: bool = False):
         """
         Realiza predições em lote.
         
         Args:
             features_list: Lista de listas com features
+            return_probabilities: Se True, devolve também a matriz de probabilidades
+                                  (calculada na mesma passada pelo modelo)
         
         Returns:
-            Lista de predições booleanas
+            Lista de predições booleanas, ou tupla (predições, probabilidades)
         """
         if not self.is_loaded:
             self.load_model()
         
         try:
             X = np.array(features_list)
-            predictions = self.model.predict(X)
+            result = self.predict_with_proba(X)
+            predictions = [bool(pred) for pred in result.labels]
             
             logger.info(f"Predições em lote: {len(predictions)} amostras processadas")
             
-            return [bool(pred) for pred in predictions]
+            if return_probabilities:
+                return predictions, result.probabilities
+            return predictions
             
         except Exception as e:
             logger.error(f"Erro na predição em lote: {e}")
@@ -224,55 +592,85 @@ class WaterQualityPredictor:
     
     def _analyze_parameters(self, sensor_data: Dict[str, float]) -> Dict[str, Dict]:
         """Analisa parâmetros individuais da água."""
+        thresholds = get_thresholds()
         analysis = {}
         
-        # Análise do pH
-        ph = sensor_data.get('ph', 7.0)
-        if 6.5 <= ph <= 8.5:
-            ph_status = 'normal'
-        elif 6.0 <= ph < 6.5 or 8.5 < ph <= 9.0:
-            ph_status = 'atencao'
-        else:
-            ph_status = 'critico'
-        
-        analysis['ph'] = {
-            'value': ph,
-            'status': ph_status,
-            'ideal_range': '6.5 - 8.5'
-        }
-        
-        # Análise da turbidez
-        turbidity = sensor_data.get('turbidity', 4.0)
-        if turbidity < 5:
-            turbidity_status = 'normal'
-        elif turbidity < 25:
-            turbidity_status = 'atencao'
-        else:
-            turbidity_status = 'critico'
-        
-        analysis['turbidity'] = {
-            'value': turbidity,
-            'status': turbidity_status,
-            'ideal_range': '< 5 NTU'
-        }
-        
-        # Análise do cloro
-        chloramines = sensor_data.get('chloramines', 0.0)
-        if 0.2 <= chloramines <= 2.0:
-            chlor_status = 'normal'
-        elif 0.1 <= chloramines < 0.2 or 2.0 < chloramines <= 4.0:
-            chlor_status = 'atencao'
-        else:
-            chlor_status = 'critico'
-        
-        analysis['chloramines'] = {
-            'value': chloramines,
-            'status': chlor_status,
-            'ideal_range': '0.2 - 2.0 ppm'
-        }
+        for param, (default, ideal_range) in ANALYZED_PARAMETERS.items():
+            value = sensor_data.get(param, default)
+            analysis[param] = {
+                'value': value,
+                'status': thresholds.lookup(param, value, 'status'),
+                'ideal_range': ideal_range
+            }
         
         return analysis
     
+    def evaluate_water_quality_batch(self, readings,
+                                     include_recommendations: bool = True) -> List[Dict[str, any]]:
+        """
+        Versão em lote de evaluate_water_quality para um bloco colunar de leituras.
+
+        Os status dos parâmetros e o nível de risco são calculados com NumPy; as
+        recomendações (strings) só são montadas se solicitadas. Com
+        include_recommendations=True o resultado é idêntico ao da versão escalar.
+
+        Args:
+            readings: Colunas de leituras ({'ph': [...], 'turbidity': [...], ...})
+                      ou DataFrame com essas colunas
+            include_recommendations: Se deve gerar as recomendações de cada leitura
+
+        Returns:
+            Lista de análises, na mesma ordem das linhas
+        """
+        predictions = self.predict_from_sensor_data_batch(readings)
+        n_rows = len(predictions)
+        if n_rows == 0:
+            return []
+
+        thresholds = get_thresholds()
+        columns = {key: readings[key] for key in readings.keys()}
+        statuses = {}
+        values = {}
+        for param, (default, _) in ANALYZED_PARAMETERS.items():
+            if param in columns:
+                raw = columns[param]
+                values[param] = raw.tolist() if hasattr(raw, 'tolist') else list(raw)
+            else:
+                values[param] = [default] * n_rows
+            statuses[param] = thresholds.lookup(param, np.asarray(values[param], dtype=np.float64), 'status')
+
+        is_potable = np.array([p['is_potable'] for p in predictions], dtype=bool)
+        codes = np.column_stack(list(statuses.values()))
+        critical = np.count_nonzero(codes == 'critico', axis=1)
+        attention = np.count_nonzero(codes == 'atencao', axis=1)
+        risk_codes = np.select(
+            [~is_potable | (critical > 0), attention >= 2, attention == 1],
+            [0, 1, 2],
+            default=3
+        )
+
+        results = []
+        for i, prediction in enumerate(predictions):
+            parameter_analysis = {
+                param: {
+                    'value': values[param][i],
+                    'status': str(statuses[param][i]),
+                    'ideal_range': ideal_range
+                }
+                for param, (_, ideal_range) in ANALYZED_PARAMETERS.items()
+            }
+            risk_level = RISK_LEVELS[risk_codes[i]]
+            result = {
+                **prediction,
+                'parameter_analysis': parameter_analysis,
+                'risk_level': risk_level
+            }
+            if include_recommendations:
+                result['recommendations'] = self._get_recommendations(parameter_analysis, risk_level)
+            results.append(result)
+
+        return results
+
     def _determine_risk_level(self, prediction_result: Dict, parameter_analysis: Dict) -> str:
         """Determina nível de risco baseado na predição e análise de parâmetros."""
         if not prediction_result['is_potable']:
@@ -312,6 +710,17 @@ class WaterQualityPredictor:
         
         return recommendations
 
+# Níveis de risco na ordem de prioridade usada por _determine_risk_level
+RISK_LEVELS = ('alto', 'medio', 'baixo', 'muito_baixo')
+
+# Parâmetros analisados individualmente: valor padrão e faixa ideal exibida
+# (as faixas de status vêm da tabela compartilhada em src/utils/thresholds.py)
+ANALYZED_PARAMETERS = {
+    'ph': (7.0, '6.5 - 8.5'),
+    'turbidity': (4.0, '< 5 NTU'),
+    'chloramines': (0.0, '0.2 - 2.0 ppm')
+}
+
 # Instância global para reutilização
 _predictor_instance = None
 
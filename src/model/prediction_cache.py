@@ -0,0 +1,147 @@
+####################################
+##### Arquivo: prediction_cache.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Resolução padrão de cada parâmetro (próxima da resolução dos sensores do ESP32)
+DEFAULT_RESOLUTION = {
+    'ph': 0.01,
+    'chloramines': 0.01,
+    'conductivity': 1.0,
+    'turbidity': 0.01
+}
+
+
+class PredictionCache:
+    """
+    Cache LRU de predições indexado pelos valores de sensor quantizados.
+
+    Cada parâmetro é arredondado para a resolução configurada; leituras que caem
+    na mesma célula compartilham o resultado. A predição de uma célula é sempre
+    feita sobre os valores quantizados, então o resultado não depende de qual
+    leitura chegou primeiro.
+    """
+
+    def __init__(self, max_size: int = 4096, resolution: Optional[Dict[str, float]] = None,
+                 aliases: Optional[Dict[str, str]] = None):
+        self.max_size = max_size
+        self.resolution = dict(resolution or DEFAULT_RESOLUTION)
+        # Nomes alternativos aceitos na leitura (ex.: 'Chloramines' para 'chloramines')
+        self.aliases = dict(aliases or {})
+        self._params = tuple(sorted(self.resolution))
+        self._entries: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _value(self, reading: Dict[str, Any], param: str):
+        if param in reading:
+            return reading[param]
+        alias = self.aliases.get(param)
+        if alias is not None and alias in reading:
+            return reading[alias]
+        return None
+
+    def make_key(self, reading: Dict[str, Any]) -> Optional[Tuple]:
+        """
+        Quantiza os parâmetros da leitura (parâmetros ausentes viram None).
+
+        Retorna None se algum valor não for finito (NaN/inf não têm célula):
+        a leitura deve ser predita sem passar pelo cache.
+        """
+        key = []
+        for param in self._params:
+            value = self._value(reading, param)
+            if value is None:
+                key.append(None)
+                continue
+            value = float(value)
+            if not math.isfinite(value):
+                return None
+            key.append(round(value / self.resolution[param]))
+        return tuple(key)
+
+    def quantize(self, reading: Dict[str, Any], key: Tuple) -> Dict[str, float]:
+        """Leitura representativa da célula, usada para calcular a predição em cache."""
+        return {
+            param: cell * self.resolution[param]
+            for param, cell in zip(self._params, key)
+            if cell is not None
+        }
+
+    def quantize_columns(self, readings: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Versão vetorizada de make_key + quantize para um bloco colunar de leituras.
+
+        Linhas com algum valor não finito não têm célula (make_key → None) e
+        seguem com os valores originais, como na predição escalar.
+        """
+        raw, quantized = {}, {}
+        for param in self._params:
+            column = self._value(readings, param)
+            if column is None:
+                continue
+            raw[param] = np.asarray(column, dtype=np.float64)
+            resolution = self.resolution[param]
+            quantized[param] = np.round(raw[param] / resolution) * resolution
+
+        if raw:
+            finite = np.all([np.isfinite(values) for values in raw.values()], axis=0)
+            if not finite.all():
+                for param in quantized:
+                    quantized[param] = np.where(finite, quantized[param], raw[param])
+        return quantized
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Retorna o resultado em cache (marcando-o como recente) ou None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple, result: Dict[str, Any]):
+        """Armazena um resultado, descartando o menos usado se o cache estiver cheio."""
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Invalida todas as entradas (ex.: após recarregar o modelo)."""
+        with self._lock:
+            self._entries.clear()
+        logger.info("Cache de predições invalidado")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de uso do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0
+            }
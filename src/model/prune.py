@@ -0,0 +1,287 @@
+####################################
+##### Arquivo: prune.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Poda da floresta: menos árvores (e, opcionalmente, menor profundidade) com
+perda de acurácia limitada.
+
+As probabilidades de cada árvore no conjunto de validação são calculadas uma
+vez sobre a floresta achatada, para cada profundidade candidata (truncar em
+profundidade d equivale a parar no nó alcançado após d passos). Para cada
+profundidade, as árvores são escolhidas de forma gulosa: a cada passo entra a
+que mais aumenta a acurácia da média das já escolhidas. Isso gera a curva
+acurácia × custo de inferência (árvores × profundidade); o modelo escolhido é o
+de menor custo cuja acurácia fica dentro da tolerância da floresta completa.
+
+A seleção usa o próprio conjunto de validação, então a acurácia reportada é
+otimista; prefira tolerâncias pequenas ou confira em outro conjunto.
+
+Uso:
+    python -m src.model.prune                    # salva em ml.pruning.output_dir
+    python -m src.model.prune --publish          # substitui os artefatos publicados
+"""
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+import yaml
+
+from ..utils.feature_extractor import FEATURE_DTYPE
+from ..utils.logging import get_logger, setup_logging
+from .compact_model import export_compact_model
+from .forest_bundle import ForestBundle, build_forest_header, flatten_forest, node_depths, save_forest_bundle
+from .tuning import REFERENCE_COST
+
+logger = get_logger(__name__)
+
+
+def _forest_depth(model) -> int:
+    return int(max(node_depths(est.tree_).max() for est in model.estimators_))
+
+
+def _tree_probabilities(model, X: np.ndarray, depths: Sequence[Optional[int]]) -> Dict[Optional[int], np.ndarray]:
+    """Probabilidades (árvores × amostras × classes) de cada árvore truncada em cada profundidade."""
+    arrays = flatten_forest(model)
+    X = np.asarray(X, dtype=FEATURE_DTYPE)
+    rows = np.arange(X.shape[0])[:, None]
+    nodes = np.broadcast_to(arrays['roots'], (X.shape[0], arrays['roots'].shape[0])).copy()
+
+    full_depth = _forest_depth(model)
+    # Profundidades iguais ou maiores que a original equivalem a não truncar (None)
+    wanted = {full_depth if d is None or d >= full_depth else int(d) for d in depths}
+
+    probabilities = {}
+    for step in range(full_depth + 1):
+        if step in wanted:
+            key = None if step == full_depth else step
+            probabilities[key] = arrays['value'][nodes].transpose(1, 0, 2)
+        go_left = X[rows, arrays['feature'][nodes]] <= arrays['threshold'][nodes]
+        nodes = np.where(go_left, arrays['children_left'][nodes], arrays['children_right'][nodes])
+    return probabilities
+
+
+def greedy_tree_order(tree_proba: np.ndarray, y_index: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Seleção gulosa de árvores (forward selection).
+
+    Args:
+        tree_proba: Probabilidades por árvore (árvores × amostras × classes)
+        y_index: Índice da classe correta de cada amostra
+
+    Returns:
+        Lista com a árvore acrescentada e a acurácia do conjunto a cada passo
+    """
+    n_trees, n_samples, _ = tree_proba.shape
+    true_proba = tree_proba[:, np.arange(n_samples), y_index]
+    remaining = np.arange(n_trees)
+    total = np.zeros(tree_proba.shape[1:])
+    total_true = np.zeros(n_samples)
+    steps = []
+
+    for _ in range(n_trees):
+        candidates = total[None] + tree_proba[remaining]
+        correct = np.argmax(candidates, axis=2) == y_index
+        accuracy = correct.mean(axis=1)
+        # Empates na acurácia: maior probabilidade média na classe correta
+        margin = (total_true[None] + true_proba[remaining]).mean(axis=1)
+        best = np.lexsort((-margin, -accuracy))[0]
+
+        tree = int(remaining[best])
+        total += tree_proba[tree]
+        total_true += true_proba[tree]
+        remaining = np.delete(remaining, best)
+        steps.append({'tree': tree, 'accuracy': float(accuracy[best])})
+    return steps
+
+
+def truncate_tree(estimator, max_depth: int):
+    """Cópia da árvore com os nós na profundidade max_depth transformados em folhas."""
+    estimator = copy.deepcopy(estimator)
+    tree = estimator.tree_
+    depth = node_depths(tree)
+    # Nós abaixo do corte também viram folhas, para não contarem na importância das features
+    cut = (depth >= max_depth) | (depth < 0)
+    tree.children_left[cut] = -1
+    tree.children_right[cut] = -1
+    return estimator
+
+
+def build_pruned_model(model, trees: Sequence[int], max_depth: Optional[int] = None):
+    """RandomForestClassifier com apenas as árvores escolhidas (truncadas, se max_depth)."""
+    pruned = copy.copy(model)
+    estimators = [model.estimators_[i] for i in trees]
+    if max_depth is not None:
+        estimators = [truncate_tree(est, max_depth) for est in estimators]
+    else:
+        estimators = [copy.deepcopy(est) for est in estimators]
+    pruned.estimators_ = estimators
+    pruned.n_estimators = len(estimators)
+    # O score OOB da floresta completa não vale para o subconjunto
+    for attr in ('oob_score_', 'oob_decision_function_'):
+        pruned.__dict__.pop(attr, None)
+    return pruned
+
+
+def _measure_latency(model, X: np.ndarray, repeats: int = 5) -> float:
+    """Mediana do tempo (ms) de predict_proba da floresta achatada sobre X."""
+    header = {'classes': [int(c) for c in model.classes_], 'n_estimators': len(model.estimators_),
+              'max_depth': _forest_depth(model)}
+    bundle = ForestBundle(flatten_forest(model), header)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        bundle.predict_proba(X)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def prune_forest(model, X_val, y_val, tolerance: float = 0.005,
+                 depths: Sequence[int] = (), min_trees: int = 1) -> Dict[str, Any]:
+    """
+    Escolhe o menor modelo (árvores × profundidade) dentro da tolerância de acurácia.
+
+    Args:
+        model: RandomForestClassifier treinado
+        X_val, y_val: Conjunto de validação (X já normalizado)
+        tolerance: Perda de acurácia aceita em relação à floresta completa
+        depths: Profundidades candidatas além da original
+        min_trees: Mínimo de árvores do modelo escolhido (limita o sobreajuste à validação)
+
+    Returns:
+        Dicionário com o modelo podado, a escolha e a curva acurácia × custo
+    """
+    y_index = np.searchsorted(model.classes_, np.asarray(y_val))
+    probabilities = _tree_probabilities(model, X_val, [None, *depths])
+    full_depth = _forest_depth(model)
+
+    full_proba = probabilities[None]
+    full_accuracy = float(np.mean(np.argmax(full_proba.sum(axis=0), axis=1) == y_index))
+    target = full_accuracy - tolerance
+
+    curve = []
+    orders = {}
+    for depth, tree_proba in probabilities.items():
+        steps = greedy_tree_order(tree_proba, y_index)
+        orders[depth] = [step['tree'] for step in steps]
+        effective_depth = full_depth if depth is None else depth
+        for n_trees, step in enumerate(steps, start=1):
+            curve.append({
+                'n_trees': n_trees,
+                'max_depth': depth,
+                'accuracy': step['accuracy'],
+                'latency_cost': n_trees * effective_depth / REFERENCE_COST
+            })
+
+    # A floresta completa (todas as árvores, sem truncar) sempre é elegível
+    eligible = [point for point in curve
+                if point['accuracy'] >= target and point['n_trees'] >= min(min_trees, len(model.estimators_))]
+    chosen = min(eligible, key=lambda p: (p['latency_cost'], -p['accuracy']))
+    trees = orders[chosen['max_depth']][:chosen['n_trees']]
+    pruned = build_pruned_model(model, trees, chosen['max_depth'])
+
+    X_val = np.asarray(X_val, dtype=FEATURE_DTYPE)
+    report = {
+        'tolerance': tolerance,
+        'full_accuracy': full_accuracy,
+        'full_n_trees': len(model.estimators_),
+        'full_max_depth': full_depth,
+        'full_latency_cost': len(model.estimators_) * full_depth / REFERENCE_COST,
+        'full_latency_ms': _measure_latency(model, X_val),
+        'pruned_accuracy': chosen['accuracy'],
+        'pruned_n_trees': chosen['n_trees'],
+        'pruned_max_depth': chosen['max_depth'],
+        'pruned_latency_cost': chosen['latency_cost'],
+        'pruned_latency_ms': _measure_latency(pruned, X_val),
+        'selected_trees': trees,
+        'validation_samples': int(len(y_index)),
+        'curve': curve
+    }
+
+    logger.info(f"Floresta completa: {report['full_n_trees']} árvores, profundidade {full_depth}, "
+                f"acurácia {full_accuracy:.4f}, {report['full_latency_ms']:.2f} ms")
+    logger.info(f"Floresta podada: {chosen['n_trees']} árvores, profundidade "
+                f"{chosen['max_depth'] or full_depth}, acurácia {chosen['accuracy']:.4f}, "
+                f"{report['pruned_latency_ms']:.2f} ms")
+    return {'model': pruned, 'report': report}
+
+
+def save_pruned_model(model, processor, output_dir, report: Dict[str, Any],
+                      rule=None, version: Optional[str] = None) -> Path:
+    """Grava o modelo podado (.pkl, bundle e .npz) e o relatório em output_dir."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    joblib.dump({'model': model, 'processor': processor, 'version': version},
+                output_dir / 'water_quality_model.pkl', compress=0)
+    save_forest_bundle(model, processor, output_dir / 'water_quality_model.bundle', rule=rule, version=version)
+    export_compact_model(model, processor, output_dir / 'water_quality_model.npz', rule=rule, version=version)
+
+    with open(output_dir / 'pruning_report.json', 'w', encoding='utf-8') as f:
+        json.dump({**report, 'header': build_forest_header(model, processor, rule, version)}, f, indent=2)
+
+    logger.info(f"Modelo podado salvo em: {output_dir}")
+    return output_dir
+
+
+def main():
+    """Poda o modelo publicado usando o conjunto de teste do treino como validação."""
+    from .predict import IDEAL_RANGES
+    from .train import WaterQualityModelTrainer
+
+    parser = argparse.ArgumentParser(description="Poda da floresta do modelo de qualidade da água")
+    parser.add_argument('--tolerance', type=float, default=None, help="Perda de acurácia aceita")
+    parser.add_argument('--depths', type=int, nargs='*', default=None,
+                        help="Profundidades candidatas além da original (ex.: 8 6 4)")
+    parser.add_argument('--publish', action='store_true',
+                        help="Substitui os artefatos publicados (a API recarrega automaticamente)")
+    args = parser.parse_args()
+
+    setup_logging()
+    root = Path(__file__).parent.parent.parent
+    with open(root / "config" / "config.yaml", 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    prune_config = config['ml'].get('pruning') or {}
+
+    trainer = WaterQualityModelTrainer()
+    model_data = joblib.load(trainer.model_path)
+    model, processor = model_data['model'], model_data['processor']
+
+    # Mesmo split do treino (random_state fixo): o conjunto de teste não foi visto no ajuste
+    features = trainer._load_features(str(root / prune_config.get('csv', 'water_potability.csv')))
+    _, X_test, _, y_test = processor.split_data(features.X, features.y)
+    mean = np.asarray(processor.scaler_params['mean'], dtype=FEATURE_DTYPE)
+    std = np.asarray(processor.scaler_params['std'], dtype=FEATURE_DTYPE)
+    X_val = (np.asarray(X_test, dtype=FEATURE_DTYPE) - mean) / std
+
+    depths = args.depths if args.depths is not None else prune_config.get('depths', [])
+    result = prune_forest(
+        model, X_val, y_test,
+        tolerance=args.tolerance if args.tolerance is not None else prune_config.get('tolerance', 0.005),
+        depths=[d for d in depths if d is not None],
+        min_trees=prune_config.get('min_trees', 1)
+    )
+
+    if args.publish:
+        trainer.model = result['model']
+        trainer.processor = processor
+        trainer.save_model()
+        logger.info(f"Modelo podado publicado (versão {trainer.model_version})")
+    else:
+        version = f"{model_data.get('version') or 'unknown'}-pruned"
+        save_pruned_model(result['model'], processor, root / prune_config.get('output_dir', 'src/model/pruned'),
+                          result['report'], rule=IDEAL_RANGES, version=version)
+
+
+if __name__ == "__main__":
+    main()
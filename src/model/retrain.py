@@ -0,0 +1,236 @@
+####################################
+##### Arquivo: retrain.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Retreino incremental a partir das leituras acumuladas no Oracle.
+
+Rótulos: só são usadas leituras com resultado de laboratório (tabela
+lab_results). A coluna readings.potability é gravada pelo controller com a
+predição do próprio modelo; treinar ou avaliar com ela seria circular (o
+candidato aprenderia a imitar o modelo atual e a comparação na janela recente
+mediria só a concordância entre os dois), por isso ela nunca é lida aqui.
+Limitação: sem resultados de laboratório cadastrados não há retreino — o ciclo
+termina com 'insufficient_data'.
+
+As leituras rotuladas são lidas em blocos (fetchmany) desde a última
+execução e mantidas em uma janela de tamanho fixo. O modelo atual recebe novas
+árvores (warm start) treinadas com as leituras novas mais uma amostra do
+dataset base, normalizadas com o scaler já publicado. O candidato é comparado
+ao modelo atual na janela mais recente (não usada no ajuste) e, se não piorar,
+é publicado com save_model; os preditores recarregam o artefato ao notar a
+mudança do arquivo.
+"""
+
+import copy
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import yaml
+from sklearn.metrics import accuracy_score
+
+from ..persistence.db import WaterQualityRepository
+from ..utils.feature_extractor import FEATURE_DTYPE
+from ..utils.logging import get_logger
+from .train import WaterQualityModelTrainer
+
+logger = get_logger(__name__)
+
+class RecentWindow:
+    """Mantém apenas as `capacity` leituras mais recentes, com memória limitada."""
+
+    def __init__(self, capacity: int, n_features: int):
+        self.capacity = capacity
+        self.X = np.empty((0, n_features), dtype=FEATURE_DTYPE)
+        self.y = np.empty(0, dtype=np.int8)
+        self.total_seen = 0
+        self.last_timestamp = None
+
+    def append(self, X: np.ndarray, y: np.ndarray, last_timestamp):
+        self.X = np.concatenate([self.X, X.astype(FEATURE_DTYPE, copy=False)])[-self.capacity:]
+        self.y = np.concatenate([self.y, y.astype(np.int8)])[-self.capacity:]
+        self.total_seen += len(y)
+        self.last_timestamp = last_timestamp
+
+    def __len__(self):
+        return len(self.y)
+
+
+class OnlineRetrainer:
+    """Pipeline de retreino incremental (warm start) com publicação do artefato."""
+
+    def __init__(self, repository: Optional[WaterQualityRepository] = None,
+                 trainer: Optional[WaterQualityModelTrainer] = None):
+        self.config = self._load_config()
+        self.repository = repository
+        self.trainer = trainer or WaterQualityModelTrainer()
+        self.state_path = Path(__file__).parent.parent.parent / self.config.get(
+            'state_path', 'src/model/retrain_state.json')
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Carrega a seção ml.retraining do arquivo YAML."""
+        config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file)
+        return config['ml'].get('retraining') or {}
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: Dict[str, Any]):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, default=str)
+
+    def _load_current_model(self):
+        """Carrega o modelo sklearn publicado (o .pkl guarda a floresta ajustável)."""
+        model_data = joblib.load(self.trainer.model_path)
+        return model_data['model'], model_data['processor']
+
+    def _readings_to_features(self, rows, processor):
+        """Converte linhas do banco em (X normalizado, y) pelo mesmo caminho da inferência."""
+        data = np.asarray([row[1:] for row in rows], dtype=np.float64)
+        y = data[:, 3].astype(np.int8)
+
+        # process_sensor_batch, como o preditor: a condutividade (ausente na tabela
+        # readings) recebe o padrão de ml.feature_defaults, normalizado do mesmo jeito
+        X = processor.process_sensor_batch({'ph': data[:, 0], 'turbidity': data[:, 1],
+                                            'chloramines': data[:, 2]})
+
+        valid = ~np.isnan(X).any(axis=1)
+        return X[valid], y[valid]
+
+    def collect_new_readings(self, processor, since=None) -> RecentWindow:
+        """
+        Lê em blocos as leituras com resultado de laboratório, guardando no máximo max_rows na memória.
+
+        A marca d'água (`since`) é o instante da análise de laboratório, não o da
+        leitura: resultados que chegam depois continuam sendo considerados.
+        """
+        window = RecentWindow(self.config.get('max_rows', 200000), len(processor.feature_columns))
+        for rows in self.repository.iter_lab_labelled_readings(since=since,
+                                                               chunk_size=self.config.get('chunk_size', 5000)):
+            X, y = self._readings_to_features(rows, processor)
+            window.append(X, y, rows[-1][0])
+        logger.info(f"Leituras novas com resultado de laboratório: {window.total_seen} (mantidas: {len(window)})")
+        return window
+
+    def _base_sample(self, processor, n_samples: int):
+        """Amostra do dataset base, normalizada com o scaler publicado."""
+        csv_path = Path(__file__).parent.parent.parent / self.config.get('base_csv', 'water_potability.csv')
+        df = processor.clean_data(processor.load_csv_data(str(csv_path)))
+        X, y = processor.prepare_features(df)
+        mean = np.asarray(processor.scaler_params['mean'], dtype=FEATURE_DTYPE)
+        std = np.asarray(processor.scaler_params['std'], dtype=FEATURE_DTYPE)
+        X = (np.asarray(X, dtype=FEATURE_DTYPE) - mean) / std
+        y = np.asarray(y)
+        if len(y) > n_samples:
+            idx = np.random.default_rng(42).choice(len(y), n_samples, replace=False)
+            X, y = X[idx], y[idx]
+        return X, y
+
+    def _warm_start(self, model, X, y):
+        """Acrescenta árvores treinadas em (X, y) e descarta as mais antigas acima do limite."""
+        candidate = copy.deepcopy(model)
+        # O score OOB do modelo anterior não vale para as árvores novas
+        for attr in ('oob_score_', 'oob_decision_function_'):
+            if hasattr(candidate, attr):
+                delattr(candidate, attr)
+        candidate.set_params(warm_start=True, oob_score=False,
+                             n_estimators=len(model.estimators_) + self.config.get('trees_per_update', 20))
+        candidate.fit(X, y)
+
+        max_trees = self.config.get('max_trees', 300)
+        if len(candidate.estimators_) > max_trees:
+            candidate.estimators_ = candidate.estimators_[-max_trees:]
+            candidate.n_estimators = max_trees
+        return candidate
+
+    def run_once(self) -> Dict[str, Any]:
+        """Executa um ciclo de retreino; publica o candidato se ele não piorar na janela recente."""
+        start = time.perf_counter()
+        state = self._load_state()
+        since = datetime.fromisoformat(state['last_timestamp']) if state.get('last_timestamp') else None
+
+        if self.repository is None:
+            self.repository = WaterQualityRepository()
+
+        model, processor = self._load_current_model()
+        window = self.collect_new_readings(processor, since=since)
+
+        min_rows = self.config.get('min_new_rows', 50)
+        if len(window) < min_rows:
+            logger.info(f"Leituras novas insuficientes ({len(window)} < {min_rows}); retreino adiado")
+            return {'published': False, 'reason': 'insufficient_data', 'new_rows': len(window)}
+
+        # Janela mais recente fica de fora do ajuste para a comparação
+        n_holdout = max(1, int(len(window) * self.config.get('holdout_fraction', 0.2)))
+        X_new, y_new = window.X[:-n_holdout], window.y[:-n_holdout]
+        X_holdout, y_holdout = window.X[-n_holdout:], window.y[-n_holdout:]
+
+        # Rótulos novos de uma só classe não dão árvores úteis nem comparação justa;
+        # a marca d'água fica onde está para a próxima janela incluir estas leituras
+        if len(np.unique(y_new)) < 2:
+            logger.info("Rótulos novos com uma única classe; retreino adiado")
+            return {'published': False, 'reason': 'single_class', 'new_rows': len(window)}
+
+        X_base, y_base = self._base_sample(processor, self.config.get('base_sample_size', 2000))
+        X_fit = np.vstack([X_base, X_new])
+        y_fit = np.concatenate([y_base, y_new])
+
+        candidate = self._warm_start(model, X_fit, y_fit)
+
+        current_accuracy = accuracy_score(y_holdout, model.predict(X_holdout))
+        candidate_accuracy = accuracy_score(y_holdout, candidate.predict(X_holdout))
+        logger.info(f"Acurácia na janela recente ({n_holdout} leituras): "
+                    f"atual={current_accuracy:.4f}, candidato={candidate_accuracy:.4f}")
+
+        result = {
+            'new_rows': window.total_seen,
+            'holdout_rows': n_holdout,
+            'current_accuracy': current_accuracy,
+            'candidate_accuracy': candidate_accuracy,
+            'n_estimators': len(candidate.estimators_),
+            'published': False
+        }
+
+        if candidate_accuracy >= current_accuracy - self.config.get('tolerance', 0.01):
+            self.trainer.model = candidate
+            self.trainer.processor = processor
+            self.trainer.save_model()
+            result['published'] = True
+            result['model_version'] = self.trainer.model_version
+            logger.info(f"Novo modelo publicado (versão {self.trainer.model_version})")
+        else:
+            logger.warning("Candidato pior que o modelo atual na janela recente; mantido o modelo atual")
+
+        # A marca d'água avança mesmo sem publicar, para não reprocessar as mesmas leituras
+        state['last_timestamp'] = window.last_timestamp.isoformat() if window.last_timestamp else None
+        state['last_run'] = datetime.now().isoformat(timespec='seconds')
+        state['last_result'] = result
+        self._save_state(state)
+
+        result['elapsed_seconds'] = time.perf_counter() - start
+        return result
+
+    def run_forever(self, interval: Optional[float] = None):
+        """Executa ciclos de retreino a cada `interval` segundos."""
+        interval = interval or self.config.get('interval_seconds', 3600)
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erro no retreino: {e}")
+            time.sleep(interval)
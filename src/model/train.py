@@ -6,14 +6,23 @@
 ##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
 ####################################
 
+import argparse
+import time
+from contextlib import contextmanager
 import joblib
 import pandas as pd
+from datetime import datetime
 import numpy as np
 from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import cross_val_score, GridSearchCV
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from ..processing.data_processor import WaterDataProcessor
+from ..processing.feature_cache import CachedFeatures, FeatureCache
+from .compact_model import export_compact_model
+from .forest_bundle import save_forest_bundle
+from .predict import IDEAL_RANGES
+from .tuning import budgeted_search, save_tuning_results
 from ..utils.logging import get_logger, setup_logging
 import yaml
 
@@ -21,6 +30,15 @@ import yaml
 setup_logging()
 logger = get_logger(__name__)
 
+@contextmanager
+def _timed(timings: dict, phase: str):
+    """Acumula em timings[phase] o tempo de parede do bloco."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
 class WaterQualityModelTrainer:
     """Classe responsável pelo treinamento do modelo de qualidade da água."""
     
@@ -28,6 +46,13 @@ class WaterQualityModelTrainer:
         self.processor = WaterDataProcessor()
         self.model = None
         self.model_path = None
+        self.bundle_path = None
+        self.compact_model_path = None
+        self.model_version = None
+        self.tuning_config = {}
+        self.evaluation_config = {}
+        self.data_config = {}
+        self.feature_cache = FeatureCache(enabled=False)
         self._load_config()
     
     def _load_config(self):
@@ -36,64 +61,91 @@ class WaterQualityModelTrainer:
         with open(config_path, 'r', encoding='utf-8') as file:
             config = yaml.safe_load(file)
         self.model_path = config['ml']['model_path']
+        self.bundle_path = config['ml'].get('bundle_path')
+        self.compact_model_path = config['ml'].get('compact_model_path')
+        self.tuning_config = config['ml'].get('tuning') or {}
+        self.evaluation_config = config['ml'].get('evaluation') or {}
+        self.data_config = config['ml'].get('data') or {}
+        cache_config = config['ml'].get('feature_cache') or {}
+        self.feature_cache = FeatureCache(enabled=cache_config.get('enabled', False),
+                                          cache_dir=cache_config.get('dir'))
     
-    def train_model(self, csv_path: str):
-        """Treina o modelo de classificação de qualidade da água."""
+    def train_model(self, csv_path: str, tune: bool = False):
+        """
+        Treina o modelo de classificação de qualidade da água.
+        
+        A avaliação no treino usa, por padrão, o score out-of-bag do próprio
+        ajuste (ml.evaluation.mode: "oob"); a validação cruzada, que reajusta
+        uma floresta por fold, só roda com mode "cv" ou "both".
+        """
         logger.info("Iniciando treinamento do modelo")
+        timings = {}
         
-        # 1. Carregar e processar dados
-        df = self.processor.load_csv_data(csv_path)
-        if df.empty:
-            raise ValueError("Não foi possível carregar dados do CSV")
-        
-        # 2. Limpar dados
-        df_clean = self.processor.clean_data(df)
-        
-        # 3. Preparar features e target
-        X, y = self.processor.prepare_features(df_clean)
+        # 1-3. Carregar, limpar e preparar features e target (ou ler do cache)
+        with _timed(timings, 'load'):
+            features = self._load_features(csv_path)
+            X, y = features.X, features.y
         
-        # 4. Dividir dados
-        X_train, X_test, y_train, y_test = self.processor.split_data(X, y)
-        
-        # 5. Normalizar features
-        X_train_scaled, X_test_scaled = self.processor.normalize_features(X_train, X_test)
+        with _timed(timings, 'prepare'):
+            # 4. Dividir dados
+            X_train, X_test, y_train, y_test = self.processor.split_data(X, y)
+            
+            # 5. Normalizar features
+            X_train_scaled, X_test_scaled = self.processor.normalize_features(X_train, X_test)
         
         # 6. Treinar modelo
-        logger.info("Treinando modelo Random Forest")
-        
-        # Configurar modelo com hiperparâmetros otimizados
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            class_weight='balanced'  # Para lidar com possível desbalanceamento
-        )
-        
-        # Treinar modelo
-        self.model.fit(X_train_scaled, y_train)
+        if tune:
+            # Busca com orçamento de tempo; o melhor candidato já volta treinado
+            with _timed(timings, 'tune'):
+                self.model = self.tune_hyperparameters(X_train_scaled, y_train)
+        else:
+            logger.info("Treinando modelo Random Forest")
+            
+            # Configurar modelo com hiperparâmetros otimizados
+            self.model = RandomForestClassifier(
+                n_estimators=100,
+                max_depth=10,
+                min_samples_split=5,
+                min_samples_leaf=2,
+                random_state=42,
+                class_weight='balanced',  # Para lidar com possível desbalanceamento
+                oob_score=self._use_oob()
+            )
+            
+            # Treinar modelo
+            with _timed(timings, 'fit'):
+                self.model.fit(X_train_scaled, y_train)
         
         # 7. Avaliar modelo
-        train_score = self.model.score(X_train_scaled, y_train)
-        test_score = self.model.score(X_test_scaled, y_test)
-        
-        logger.info(f"Acurácia no treino: {train_score:.4f}")
-        logger.info(f"Acurácia no teste: {test_score:.4f}")
-        
-        # 8. Predições e métricas detalhadas
-        y_pred = self.model.predict(X_test_scaled)
-        
-        logger.info("\nRelatório de Classificação:")
-        logger.info(f"\n{classification_report(y_test, y_pred)}")
-        
-        logger.info("\nMatriz de Confusão:")
-        logger.info(f"\n{confusion_matrix(y_test, y_pred)}")
-        
-        # 9. Cross-validation
-        cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=5)
-        logger.info(f"Cross-validation scores: {cv_scores}")
-        logger.info(f"CV Score médio: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+        with _timed(timings, 'evaluate'):
+            train_score = self.model.score(X_train_scaled, y_train)
+            test_score = self.model.score(X_test_scaled, y_test)
+            
+            logger.info(f"Acurácia no treino: {train_score:.4f}")
+            logger.info(f"Acurácia no teste: {test_score:.4f}")
+            
+            # 8. Predições e métricas detalhadas
+            y_pred = self.model.predict(X_test_scaled)
+            
+            logger.info("\nRelatório de Classificação:")
+            logger.info(f"\n{classification_report(y_test, y_pred)}")
+            
+            logger.info("\nMatriz de Confusão:")
+            logger.info(f"\n{confusion_matrix(y_test, y_pred)}")
+        
+        # 9. Score out-of-bag (sem reajustes) e/ou validação cruzada
+        oob_score = getattr(self.model, 'oob_score_', None)
+        if oob_score is not None:
+            logger.info(f"OOB score: {oob_score:.4f}")
+        
+        cv_scores = None
+        if self.evaluation_config.get('mode', 'oob') in ('cv', 'both'):
+            with _timed(timings, 'cross_validation'):
+                cv_scores = cross_val_score(self.model, X_train_scaled, y_train,
+                                            cv=self.evaluation_config.get('cv_folds', 5),
+                                            n_jobs=self.evaluation_config.get('n_jobs'))
+            logger.info(f"Cross-validation scores: {cv_scores}")
+            logger.info(f"CV Score médio: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
         
         # 10. Importância das features
         feature_importance = self.model.feature_importances_
@@ -103,13 +155,31 @@ class WaterQualityModelTrainer:
         for name, importance in zip(feature_names, feature_importance):
             logger.info(f"{name}: {importance:.4f}")
         
+        logger.info("\nTempo por etapa:")
+        for phase, seconds in timings.items():
+            logger.info(f"{phase}: {seconds:.2f}s")
+        
         return {
             'train_accuracy': train_score,
             'test_accuracy': test_score,
+            'oob_score': oob_score,
             'cv_scores': cv_scores,
-            'feature_importance': dict(zip(feature_names, feature_importance))
+            'feature_importance': dict(zip(feature_names, feature_importance)),
+            'timings': timings
         }
     
+    def _load_features(self, csv_path: str) -> CachedFeatures:
+        """Features limpas do CSV, do cache em disco quando o arquivo não mudou."""
+        return self.feature_cache.get_or_build(
+            csv_path, self.processor,
+            chunked=self.data_config.get('chunked', False),
+            chunk_size=self.data_config.get('chunk_size', 100_000)
+        )
+    
+    def _use_oob(self) -> bool:
+        """Se o ajuste final deve calcular o score out-of-bag."""
+        return self.evaluation_config.get('mode', 'oob') in ('oob', 'both')
+    
     def optimize_hyperparameters(self, X_train, y_train):
         """Otimiza hiperparâmetros usando Grid Search."""
         logger.info("Otimizando hiperparâmetros")
@@ -136,6 +206,39 @@ class WaterQualityModelTrainer:
         
         return grid_search.best_estimator_
     
+    def tune_hyperparameters(self, X_train, y_train):
+        """
+        Busca rápida de hiperparâmetros (halving ou aleatória) com orçamento de tempo.
+
+        O objetivo penaliza o custo de inferência (árvores × profundidade). O
+        resultado é acrescentado ao histórico em JSON e o melhor candidato é
+        treinado com todos os dados de treino.
+        """
+        config = self.tuning_config
+        logger.info(f"Otimizando hiperparâmetros (estratégia: {config.get('strategy', 'halving')}, "
+                    f"orçamento: {config.get('time_budget_seconds', 60)}s)")
+        
+        rf = RandomForestClassifier(random_state=42, class_weight='balanced')
+        results = budgeted_search(
+            rf, X_train, y_train,
+            param_distributions=config.get('param_distributions'),
+            strategy=config.get('strategy', 'halving'),
+            n_candidates=config.get('n_candidates', 24),
+            factor=config.get('factor', 3),
+            cv=config.get('cv', 3),
+            n_jobs=config.get('n_jobs', -1),
+            time_budget=config.get('time_budget_seconds', 60),
+            latency_penalty=config.get('latency_penalty', 0.05)
+        )
+        
+        if config.get('results_path'):
+            save_tuning_results(results, config['results_path'],
+                                extra={'n_train_samples': int(len(y_train))})
+        
+        best_model = rf.set_params(**results['best_params'], oob_score=self._use_oob())
+        best_model.fit(X_train, y_train)
+        return best_model
+    
     def save_model(self):
         """Salva o modelo treinado e o processor."""
         if self.model is None:
@@ -145,20 +248,34 @@ class WaterQualityModelTrainer:
         model_dir = Path(self.model_path).parent
         model_dir.mkdir(parents=True, exist_ok=True)
         
+        # Versão gravada em todos os artefatos e devolvida junto das predições
+        self.model_version = datetime.now().strftime('%Y%m%d%H%M%S')
+
         # Salvar modelo e processor juntos
         model_data = {
             'model': self.model,
-            'processor': self.processor
+            'processor': self.processor,
+            'version': self.model_version
         }
         
-        joblib.dump(model_data, self.model_path)
+        # Sem compressão para carregar rápido; o .pkl é lido inteiro (retreino e fallback do
+        # preditor) — o artefato mapeado em memória é o bundle .npy abaixo
+        joblib.dump(model_data, self.model_path, compress=0)
         logger.info(f"Modelo salvo em: {self.model_path}")
+
+        # Bundle .npy da floresta para compartilhamento via mmap entre workers
+        if self.bundle_path:
+            save_forest_bundle(self.model, self.processor, self.bundle_path,
+                               rule=IDEAL_RANGES, version=self.model_version)
+
+        # Artefato compacto (.npz) carregável apenas com NumPy
+        if self.compact_model_path:
+            export_compact_model(self.model, self.processor, self.compact_model_path,
+                                 rule=IDEAL_RANGES, version=self.model_version)
     
     def get_data_insights(self, csv_path: str):
         """Gera insights sobre os dados."""
-        df = self.processor.load_csv_data(csv_path)
-        df_clean = self.processor.clean_data(df)
-        summary = self.processor.get_data_summary(df_clean)
+        summary = self._load_features(csv_path).summary
         
         logger.info("=== INSIGHTS DOS DADOS ===")
         logger.info(f"Total de registros: {summary['total_records']}")
@@ -173,6 +290,11 @@ class WaterQualityModelTrainer:
 
 def main():
     """Função principal para treinamento do modelo."""
+    parser = argparse.ArgumentParser(description="Treinamento do modelo de qualidade da água")
+    parser.add_argument('--tune', action='store_true',
+                        help="Busca hiperparâmetros (config ml.tuning) antes de treinar")
+    args = parser.parse_args()
+    
     logger.info("=== INICIANDO TREINAMENTO DO MODELO ===")
     
     # Caminho do CSV de dados
@@ -189,7 +311,8 @@ def main():
         trainer.get_data_insights(str(csv_path))
         
         # Treinar modelo
-        results = trainer.train_model(str(csv_path))
+        tune = args.tune or trainer.tuning_config.get('enabled', False)
+        results = trainer.train_model(str(csv_path), tune=tune)
         
         # Salvar modelo
         trainer.save_model()
@@ -0,0 +1,190 @@
+####################################
+##### Arquivo: tuning.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Busca de hiperparâmetros barata o suficiente para rodar a cada retreino.
+
+Candidatos são sorteados do espaço configurado e avaliados por validação
+cruzada (folds em paralelo). Na estratégia "halving" cada rodada usa mais
+amostras e mantém só a melhor fração dos candidatos (successive halving); na
+estratégia "random" todos são avaliados com o conjunto inteiro. A busca para
+quando o orçamento de tempo acaba e devolve o melhor candidato já avaliado.
+
+O objetivo é a acurácia menos uma penalidade pelo custo de inferência da
+floresta (árvores × profundidade, relativo à floresta padrão de 100 árvores
+com profundidade 10), para favorecer florestas rápidas com acurácia parecida.
+"""
+
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, cross_validate
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Custo de referência: floresta padrão do treino (100 árvores, profundidade 10)
+REFERENCE_COST = 100 * 10
+
+DEFAULT_PARAM_DISTRIBUTIONS = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [4, 6, 8, 10, 12, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4]
+}
+
+
+def latency_cost(model) -> float:
+    """Custo relativo de inferência: nº de árvores × profundidade máxima real."""
+    depth = max(estimator.tree_.max_depth for estimator in model.estimators_)
+    return len(model.estimators_) * depth / REFERENCE_COST
+
+
+def make_latency_scorer(penalty: float):
+    """Scorer (estimator, X, y) com acurácia penalizada pelo custo de inferência."""
+    def scorer(estimator, X, y):
+        return accuracy_score(y, estimator.predict(X)) - penalty * latency_cost(estimator)
+    return scorer
+
+
+def _accuracy(estimator, X, y):
+    return accuracy_score(y, estimator.predict(X))
+
+
+def _latency(estimator, X, y):
+    return latency_cost(estimator)
+
+
+def budgeted_search(estimator, X, y, param_distributions: Optional[Dict[str, List]] = None,
+                    strategy: str = 'halving', n_candidates: int = 24, factor: int = 3,
+                    cv: int = 3, n_jobs: int = -1, time_budget: float = 60.0,
+                    latency_penalty: float = 0.05, random_state: int = 42) -> Dict[str, Any]:
+    """
+    Busca aleatória ou successive halving com orçamento de tempo.
+
+    Args:
+        estimator: Estimador base (clonado para cada candidato)
+        X, y: Dados de treino
+        param_distributions: Valores possíveis de cada hiperparâmetro
+        strategy: "halving" ou "random"
+        n_candidates: Número de candidatos sorteados
+        factor: Fração mantida a cada rodada do halving (1/factor)
+        cv: Número de folds da validação cruzada
+        n_jobs: Processos usados na validação cruzada
+        time_budget: Tempo máximo da busca, em segundos
+        latency_penalty: Peso da penalidade de custo de inferência no objetivo
+        random_state: Semente do sorteio de candidatos e dos subconjuntos
+
+    Returns:
+        Dicionário com melhores parâmetros, objetivo e histórico dos candidatos
+    """
+    if strategy not in ('halving', 'random'):
+        raise ValueError(f"Estratégia de busca desconhecida: {strategy}")
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    candidates = list(ParameterSampler(param_distributions or DEFAULT_PARAM_DISTRIBUTIONS,
+                                       n_iter=n_candidates, random_state=random_state))
+    scoring = {'objective': make_latency_scorer(latency_penalty), 'accuracy': _accuracy, 'latency': _latency}
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    rng = np.random.default_rng(random_state)
+
+    # Rodadas do halving: amostras crescem por 'factor' até o conjunto inteiro
+    if strategy == 'halving':
+        n_rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+        min_samples = max(cv * 20, len(y) // factor ** (n_rounds - 1))
+        round_samples = [min(len(y), min_samples * factor ** r) for r in range(n_rounds)]
+    else:
+        round_samples = [len(y)]
+
+    start = time.perf_counter()
+    history = []
+    best = None
+    budget_exhausted = False
+
+    for round_index, n_samples in enumerate(round_samples):
+        idx = np.sort(rng.permutation(len(y))[:n_samples])
+        round_results = []
+
+        for params in candidates:
+            # Sempre avalia ao menos um candidato, mesmo com orçamento mínimo
+            if history and time.perf_counter() - start > time_budget:
+                budget_exhausted = True
+                break
+
+            model = clone(estimator).set_params(**params)
+            scores = cross_validate(model, X[idx], y[idx], cv=folds, scoring=scoring, n_jobs=n_jobs)
+            entry = {
+                'round': round_index,
+                'n_samples': int(n_samples),
+                'params': params,
+                'objective': float(np.mean(scores['test_objective'])),
+                'accuracy': float(np.mean(scores['test_accuracy'])),
+                'latency_cost': float(np.mean(scores['test_latency'])),
+                'fit_time': float(np.sum(scores['fit_time']))
+            }
+            history.append(entry)
+            round_results.append(entry)
+
+        if round_results:
+            round_best = max(round_results, key=lambda e: e['objective'])
+            # Resultados de rodadas com mais amostras prevalecem sobre os anteriores
+            best = round_best
+            logger.info(f"Rodada {round_index} ({n_samples} amostras, {len(round_results)} candidatos): "
+                        f"melhor objetivo {round_best['objective']:.4f} com {round_best['params']}")
+
+        if budget_exhausted:
+            logger.warning(f"Orçamento de {time_budget:.0f}s esgotado na rodada {round_index}")
+            break
+
+        # Mantém a melhor fração dos candidatos para a próxima rodada
+        ranked = sorted(round_results, key=lambda e: e['objective'], reverse=True)
+        candidates = [e['params'] for e in ranked[:max(1, len(ranked) // factor)]]
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Busca concluída em {elapsed:.1f}s ({len(history)} avaliações): {best['params']}, "
+                f"acurácia {best['accuracy']:.4f}, custo {best['latency_cost']:.2f}")
+
+    return {
+        'strategy': strategy,
+        'best_params': best['params'],
+        'best_objective': best['objective'],
+        'best_accuracy': best['accuracy'],
+        'best_latency_cost': best['latency_cost'],
+        'latency_penalty': latency_penalty,
+        'time_budget': time_budget,
+        'elapsed_seconds': elapsed,
+        'budget_exhausted': budget_exhausted,
+        'history': history
+    }
+
+
+def save_tuning_results(results: Dict[str, Any], path, extra: Optional[Dict[str, Any]] = None) -> Path:
+    """Acrescenta o resultado da busca ao histórico em JSON, para comparação entre execuções."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    runs = []
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            runs = json.load(f)
+
+    runs.append({'timestamp': datetime.now().isoformat(timespec='seconds'), **results, **(extra or {})})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2, default=str)
+
+    logger.info(f"Resultados da busca salvos em: {path}")
+    return path
@@ -80,6 +80,40 @@ class DatabaseConnection:
             logger.error(f"Erro ao executar query: {e}")
             return None
     
+    def iter_query(self, query: str, params: dict = None, chunk_size: int = 5000,
+                   raise_errors: bool = False):
+        """
+        Executa uma query SELECT e devolve os resultados em blocos (fetchmany).
+        
+        Por padrão erros são registrados e a iteração termina; com raise_errors
+        eles são propagados, para quem não pode confundir falha com fim dos dados.
+        """
+        if not self.connection:
+            if not self.connect():
+                if raise_errors:
+                    raise ConnectionError("Não foi possível conectar ao Oracle")
+                return
+                
+        cursor = self.connection.cursor()
+        try:
+            cursor.arraysize = chunk_size
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        except oracledb.Error as e:
+            logger.error(f"Erro ao executar query: {e}")
+            if raise_errors:
+                raise
+        finally:
+            cursor.close()
+    
     def execute_command(self, command: str, params: dict = None):
         """Executa um comando INSERT/UPDATE/DELETE."""
         if not self.connection:
@@ -109,7 +143,7 @@ class WaterQualityRepository:
         self._create_table_if_not_exists()
     
     def _create_table_if_not_exists(self):
-        """Cria a tabela readings se não existir."""
+        """Cria as tabelas readings e lab_results se não existirem."""
         create_table_sql = """
         CREATE TABLE readings (
             id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
@@ -121,19 +155,34 @@ class WaterQualityRepository:
         )
         """
         
-        # Tenta criar a tabela, ignora erro se já existir
+        # Potabilidade determinada em laboratório para a amostra de uma leitura.
+        # readings.potability é a predição do modelo; só estes rótulos servem de
+        # verdade para o retreino.
+        create_lab_table_sql = """
+        CREATE TABLE lab_results (
+            id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            reading_id NUMBER NOT NULL REFERENCES readings(id),
+            potability NUMBER(1) NOT NULL,
+            analyzed_at TIMESTAMP NOT NULL
+        )
+        """
+        
+        # Tenta criar as tabelas, ignora erro se já existirem
         if self.db.connect():
             try:
-                cursor = self.db.connection.cursor()
-                cursor.execute(create_table_sql)
-                self.db.connection.commit()
-                cursor.close()
-                logger.info("Tabela readings criada com sucesso")
-            except oracledb.Error as e:
-                if e.args[0].code == 955:  # Table already exists
-                    logger.info("Tabela readings já existe")
-                else:
-                    logger.error(f"Erro ao criar tabela: {e}")
+                for table, sql in (('readings', create_table_sql), ('lab_results', create_lab_table_sql)):
+                    cursor = self.db.connection.cursor()
+                    try:
+                        cursor.execute(sql)
+                        self.db.connection.commit()
+                        logger.info(f"Tabela {table} criada com sucesso")
+                    except oracledb.Error as e:
+                        if e.args[0].code == 955:  # Table already exists
+                            logger.info(f"Tabela {table} já existe")
+                        else:
+                            logger.error(f"Erro ao criar tabela {table}: {e}")
+                    finally:
+                        cursor.close()
             finally:
                 self.db.disconnect()
     
@@ -160,6 +209,28 @@ class WaterQualityRepository:
         
         return success
     
+    def save_lab_result(self, reading_id: int, potability: int,
+                        analyzed_at: Optional[datetime] = None) -> bool:
+        """Registra o resultado de laboratório (potabilidade real) da amostra de uma leitura."""
+        insert_sql = """
+        INSERT INTO lab_results (reading_id, potability, analyzed_at)
+        VALUES (:reading_id, :potability, :analyzed_at)
+        """
+        
+        params = {
+            'reading_id': reading_id,
+            'potability': int(potability),
+            'analyzed_at': analyzed_at or datetime.now()
+        }
+        
+        success = self.db.execute_command(insert_sql, params)
+        if success:
+            logger.info(f"Resultado de laboratório salvo para a leitura {reading_id}")
+        else:
+            logger.error("Falha ao salvar resultado de laboratório")
+        
+        return success
+    
     def get_readings(self, limit: int = 100) -> List[Reading]:
         """Recupera leituras do banco de dados."""
         select_sql = """
@@ -213,4 +284,52 @@ class WaterQualityRepository:
             )
             alerts.append(reading)
         
-        return alerts 
\ No newline at end of file
+        return alerts
+    
+    def iter_readings(self, since: Optional[datetime] = None, chunk_size: int = 5000):
+        """
+        Percorre todas as leituras, em ordem cronológica e em blocos.
+        
+        Erros de banco são propagados (uma falha não parece o fim dos dados).
+        
+        Args:
+            since: Considera apenas leituras posteriores a este instante
+            chunk_size: Número de linhas por bloco
+        
+        Yields:
+            Listas de tuplas (timestamp, ph, turbidity, chloramines)
+        """
+        select_sql = """
+        SELECT timestamp, ph, turbidity, chloramines
+        FROM readings
+        WHERE timestamp > :since
+        ORDER BY timestamp
+        """
+        
+        params = {'since': since or datetime(1970, 1, 1)}
+        yield from self.db.iter_query(select_sql, params, chunk_size=chunk_size, raise_errors=True)
+    
+    def iter_lab_labelled_readings(self, since: Optional[datetime] = None, chunk_size: int = 5000):
+        """
+        Percorre as leituras com resultado de laboratório, na ordem das análises e em blocos.
+        
+        O rótulo é lab_results.potability (verdade de campo), nunca
+        readings.potability, que é escrita pelo preditor.
+        
+        Args:
+            since: Considera apenas resultados analisados após este instante
+            chunk_size: Número de linhas por bloco
+        
+        Yields:
+            Listas de tuplas (analyzed_at, ph, turbidity, chloramines, potability)
+        """
+        select_sql = """
+        SELECT l.analyzed_at, r.ph, r.turbidity, r.chloramines, l.potability
+        FROM lab_results l
+        JOIN readings r ON r.id = l.reading_id
+        WHERE l.analyzed_at > :since
+        ORDER BY l.analyzed_at
+        """
+        
+        params = {'since': since or datetime(1970, 1, 1)}
+        yield from self.db.iter_query(select_sql, params, chunk_size=chunk_size, raise_errors=True)
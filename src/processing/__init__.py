@@ -6,6 +6,22 @@
 ##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
 ####################################
 
-from .data_processor import WaterDataProcessor
+from .streaming_stats import StreamingStats
 
-__all__ = ['WaterDataProcessor'] 
\ No newline at end of file
+__all__ = ['WaterDataProcessor', 'FeatureCache', 'StreamingStats', 'ReadingRollup', 'get_reading_rollup']
+
+_LAZY = {
+    'WaterDataProcessor': '.data_processor',
+    'FeatureCache': '.feature_cache',
+    'ReadingRollup': '.reading_rollup',
+    'get_reading_rollup': '.reading_rollup',
+}
+
+
+def __getattr__(name):
+    # data_processor e feature_cache importam sklearn e pandas; carregados só quando
+    # usados, para que a API (controller → reading_rollup) não pague esse custo no cold start
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,26 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterable, Iterator, Tuple
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 from sklearn.utils import resample
 import logging
 
+from .streaming_stats import StreamingStats
+from ..utils.feature_extractor import FEATURE_DTYPE, extractor_for
+
+# Bits mais altos do float32 usados como bucket no cálculo da mediana em blocos
+_MEDIAN_BUCKET_BITS = 20
+
+
+def _median_buckets(values: np.ndarray) -> np.ndarray:
+    """Bucket de cada valor float32, em ordem crescente de valor."""
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+    # Negativos: inverte todos os bits; positivos: liga o bit de sinal
+    ordered = np.where(bits >> 31, ~bits, bits | np.uint32(0x80000000))
+    return (ordered >> np.uint32(32 - _MEDIAN_BUCKET_BITS)).astype(np.intp)
+
 class WaterDataProcessor:
     """Processador de dados de qualidade da água."""
 
@@ -39,24 +53,19 @@ class WaterDataProcessor:
           [ 'ph', 'Chloramines', 'Conductivity', 'Turbidity', 'Potability' ] (todas numéricas).
         """
         try:
-            # 1) Se a coluna "Potability" existir como texto, faça o mapeamento direto:
-            if 'Potability' in df.columns and df['Potability'].dtype == object:
-                df = df.copy()
-                df['Potability'] = df['Potability'].map({
-                    'Potável': 1,
-                    'Suspeita': 0,
-                    'Contaminada': 0
-                })
-                # Agora df['Potability'] é 0/1, não mais texto
-
-            # 2) Verificar se as colunas obrigatórias existem
+            # 1) Verificar se as colunas obrigatórias existem
             missing_cols = set(self.feature_columns + [self.target_column]) - set(df.columns)
             if missing_cols:
                 raise ValueError(f"Colunas faltando: {missing_cols}")
 
-            # 3) Selecionar apenas as colunas de interesse
+            # 2) Selecionar apenas as colunas de interesse (única cópia do DataFrame)
             df_clean = df[self.feature_columns + [self.target_column]].copy()
 
+            # 3) Se a coluna "Potability" existir como texto, faça o mapeamento direto:
+            if 'Potability' in df_clean.columns and not pd.api.types.is_numeric_dtype(df_clean['Potability']):
+                df_clean['Potability'] = self._map_potability(df_clean['Potability'])
+                # Agora df['Potability'] é 0/1, não mais texto
+
             # 4) Log de quantos NaNs existem antes de preencher
             missing_before = df_clean.isnull().sum().sum()
             self.logger.info(f"Valores ausentes antes da limpeza: {missing_before}")
@@ -64,15 +73,16 @@ class WaterDataProcessor:
             # 5) Remover linhas cuja Potability ainda seja NaN (caso alguma não tenha sido mapeada)
             df_clean = df_clean.dropna(subset=[self.target_column])
 
-            # 6) Preencher NaNs nas features com a mediana
+            # 6) Preencher NaNs nas features com a mediana (todas as colunas de uma vez)
+            medians = {}
             for col in self.feature_columns:
                 n_missing = df_clean[col].isnull().sum()
                 if n_missing > 0:
-                    median_value = df_clean[col].median()
-                    df_clean = df_clean.copy()
-                    df_clean[col] = df_clean[col].fillna(median_value)
+                    medians[col] = df_clean[col].median()
                     self.logger.info(
-                        f"Preenchidos {n_missing} valores ausentes em '{col}' com mediana {median_value:.2f}")
+                        f"Preenchidos {n_missing} valores ausentes em '{col}' com mediana {medians[col]:.2f}")
+            if medians:
+                df_clean = df_clean.fillna(medians)
 
             # 7) Log de quantos NaNs ainda restam após preencher (esperamos zero)
             missing_after = df_clean.isnull().sum().sum()
@@ -85,42 +95,171 @@ class WaterDataProcessor:
             self.logger.error(f"Erro na limpeza dos dados: {e}")
             raise
 
+    @staticmethod
+    def _map_potability(values: pd.Series) -> pd.Series:
+        """Mapeia os rótulos em texto de 'Potability' para 0/1 (não mapeados viram NaN)."""
+        return values.map({
+            'Potável': 1,
+            'Suspeita': 0,
+            'Contaminada': 0
+        })
+
+    def _iter_csv_chunks(self, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Lê o CSV em blocos, só com as colunas usadas e features em float32."""
+        reader = pd.read_csv(
+            file_path,
+            usecols=self.feature_columns + [self.target_column],
+            dtype={col: np.float32 for col in self.feature_columns},
+            chunksize=chunk_size
+        )
+        for chunk in reader:
+            if 'Potability' in chunk.columns and not pd.api.types.is_numeric_dtype(chunk['Potability']):
+                chunk['Potability'] = self._map_potability(chunk['Potability'])
+            yield chunk.dropna(subset=[self.target_column])
+
+    def compute_medians_chunked(self, file_path: str, chunk_size: int = 100_000) -> Dict[str, float]:
+        """
+        Mediana exata de cada feature em duas passadas pelo CSV, com memória limitada.
+
+        A primeira passada conta os valores por bucket (os 20 bits mais altos da
+        representação float32, que preservam a ordem); a segunda guarda só os
+        valores dos buckets que contêm os elementos centrais.
+        """
+        n_features = len(self.feature_columns)
+        counts = np.zeros((n_features, 1 << _MEDIAN_BUCKET_BITS), dtype=np.int64)
+        for chunk in self._iter_csv_chunks(file_path, chunk_size):
+            for j, col in enumerate(self.feature_columns):
+                values = chunk[col].to_numpy(dtype=np.float32)
+                counts[j] += np.bincount(_median_buckets(values[~np.isnan(values)]),
+                                         minlength=counts.shape[1])
+
+        # Buckets dos dois elementos centrais (iguais quando o total é ímpar)
+        targets = []
+        for j in range(n_features):
+            total = int(counts[j].sum())
+            if total == 0:
+                targets.append(None)
+                continue
+            cumulative = np.cumsum(counts[j])
+            ranks = ((total - 1) // 2, total // 2)
+            buckets = [int(np.searchsorted(cumulative, r, side='right')) for r in ranks]
+            offset = int(cumulative[buckets[0] - 1]) if buckets[0] > 0 else 0
+            targets.append((ranks, buckets, offset))
+
+        collected = [[] for _ in range(n_features)]
+        for chunk in self._iter_csv_chunks(file_path, chunk_size):
+            for j, col in enumerate(self.feature_columns):
+                if targets[j] is None:
+                    continue
+                values = chunk[col].to_numpy(dtype=np.float32)
+                keys = _median_buckets(values)
+                low, high = targets[j][1]
+                collected[j].append(values[(keys >= low) & (keys <= high) & ~np.isnan(values)])
+
+        medians = {}
+        for j, col in enumerate(self.feature_columns):
+            if targets[j] is None:
+                medians[col] = float('nan')
+                continue
+            ranks, _, offset = targets[j]
+            values = np.sort(np.concatenate(collected[j]).astype(np.float64))
+            medians[col] = float((values[ranks[0] - offset] + values[ranks[1] - offset]) / 2)
+        return medians
+
+    def iter_clean_chunks(self, file_path: str, chunk_size: int = 100_000,
+                          medians: Dict[str, float] = None) -> Iterator[pd.DataFrame]:
+        """Percorre o CSV em blocos já limpos (NaNs preenchidos com as medianas globais)."""
+        medians = medians or self.compute_medians_chunked(file_path, chunk_size)
+        for chunk in self._iter_csv_chunks(file_path, chunk_size):
+            yield chunk.fillna(medians)
+
+    def load_csv_chunked(self, file_path: str, chunk_size: int = 100_000) -> pd.DataFrame:
+        """
+        Equivalente a load_csv_data + clean_data para arquivos maiores que a memória.
+
+        O CSV é lido em blocos com usecols e features em float32 e copiado para
+        arrays pré-alocados; o resultado tem só as colunas de features e alvo.
+        """
+        try:
+            medians = self.compute_medians_chunked(file_path, chunk_size)
+
+            n_rows = 0
+            for chunk in self._iter_csv_chunks(file_path, chunk_size):
+                n_rows += len(chunk)
+
+            features = {col: np.empty(n_rows, dtype=np.float32) for col in self.feature_columns}
+            target = np.empty(n_rows, dtype=np.int8)
+            missing = dict.fromkeys(self.feature_columns, 0)
+            position = 0
+            for chunk in self._iter_csv_chunks(file_path, chunk_size):
+                stop = position + len(chunk)
+                for col in self.feature_columns:
+                    block = features[col][position:stop]
+                    block[:] = chunk[col].to_numpy(dtype=np.float32)
+                    nan_mask = np.isnan(block)
+                    missing[col] += int(nan_mask.sum())
+                    block[nan_mask] = medians[col]
+                target[position:stop] = chunk[self.target_column].to_numpy()
+                position = stop
+
+            for col, n_missing in missing.items():
+                if n_missing > 0:
+                    self.logger.info(
+                        f"Preenchidos {n_missing} valores ausentes em '{col}' com mediana {medians[col]:.2f}")
+            self.logger.info(f"Registros finais após limpeza (leitura em blocos): {n_rows}")
+
+            return pd.DataFrame({**features, self.target_column: target}, copy=False)
+
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar dados em blocos: {e}")
+            raise
+
     def get_data_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Gera um resumo estatístico do DataFrame limpo.
         Espera que 'Potability' seja 0/1, então soma pode ser convertida em int.
+        Todas as estatísticas saem de uma única passada (StreamingStats).
         """
         try:
-            summary = {
-                'total_records': len(df),
-                'potable_count': int(df[self.target_column].sum()),
-                'non_potable_count': int(len(df) - df[self.target_column].sum()),
-                'feature_stats': {}
-            }
-            for col in self.feature_columns:
-                if col in df.columns:
-                    summary['feature_stats'][col] = {
-                        'mean': float(df[col].mean()),
-                        'std': float(df[col].std()),
-                        'min': float(df[col].min()),
-                        'max': float(df[col].max()),
-                        'missing': int(df[col].isnull().sum())
-                    }
-            return summary
+            columns = [col for col in self.feature_columns if col in df.columns] + [self.target_column]
+            return self._summary_from_stats(StreamingStats(columns).update(df))
 
         except Exception as e:
             self.logger.error(f"Erro na geração do resumo: {e}")
             raise
 
+    def get_data_summary_from_chunks(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """Mesmo resumo de get_data_summary, acumulado sobre blocos (ex.: iter_clean_chunks)."""
+        try:
+            stats = StreamingStats(self.feature_columns + [self.target_column]).update_chunks(chunks)
+            return self._summary_from_stats(stats)
+
+        except Exception as e:
+            self.logger.error(f"Erro na geração do resumo: {e}")
+            raise
+
+    def _summary_from_stats(self, stats: StreamingStats) -> Dict[str, Any]:
+        target = stats.columns.index(self.target_column)
+        total_records = int(stats.count[target] + stats.nulls[target])
+        potable_count = int(stats.total[target])
+        return {
+            'total_records': total_records,
+            'potable_count': potable_count,
+            'non_potable_count': total_records - potable_count,
+            'feature_stats': {
+                col: stats.column_stats(col) for col in stats.columns if col != self.target_column
+            }
+        }
+
     def prepare_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
-        """Extrai X (features) e y (target) para treinamento."""
+        """Extrai X (features, float32) e y (target) para treinamento."""
         try:
             available_features = [col for col in self.feature_columns if col in df.columns]
             if not available_features:
                 raise ValueError("Nenhuma feature encontrada no dataset")
 
             self.logger.info(f"Features utilizadas: {available_features}")
-            X = df[available_features].values
+            X = df[available_features].to_numpy(dtype=FEATURE_DTYPE)
             y = df[self.target_column].values  # já é 0/1
             return X, y
 
@@ -153,17 +292,22 @@ class WaterDataProcessor:
 
     def normalize_features(self, X_train: np.ndarray, X_test: np.ndarray = None
                            ) -> Tuple[np.ndarray, np.ndarray]:
-        """Aplica normalização (z-score) às features."""
+        """
+        Aplica normalização (z-score) às features.
+
+        Média e desvio são acumulados em float64 e guardados em float32, o mesmo
+        tipo das features normalizadas entregues ao modelo.
+        """
         try:
             self.logger.info("Normalizando features")
-            mean = np.mean(X_train, axis=0)
-            std = np.std(X_train, axis=0)
+            mean = np.mean(X_train, axis=0, dtype=np.float64).astype(FEATURE_DTYPE)
+            std = np.std(X_train, axis=0, dtype=np.float64).astype(FEATURE_DTYPE)
             self.scaler_params = {'mean': mean, 'std': std}
 
-            X_train_scaled = (X_train - mean) / std
+            X_train_scaled = (np.asarray(X_train, dtype=FEATURE_DTYPE) - mean) / std
             X_test_scaled = None
             if X_test is not None:
-                X_test_scaled = (X_test - mean) / std
+                X_test_scaled = (np.asarray(X_test, dtype=FEATURE_DTYPE) - mean) / std
 
             self.logger.info(f"Features normalizadas (treino): {X_train_scaled.shape}")
             if X_test_scaled is not None:
@@ -174,31 +318,45 @@ class WaterDataProcessor:
             self.logger.error(f"Erro na normalização: {e}")
             raise
 
-    def process_sensor_reading(self, reading: Dict[str, Any]) -> np.ndarray:
-        """Processa uma única leitura de sensor e retorna array 1×4 normalizado."""
+    def process_sensor_reading(self, reading: Dict[str, Any], out: np.ndarray = None) -> np.ndarray:
+        """
+        Processa uma única leitura de sensor e retorna array 1×4 normalizado.
+
+        Aceita chaves minúsculas ou com case; features ausentes recebem o padrão
+        de ml.feature_defaults. Se `out` for informado (ex.: buffer do extrator),
+        o resultado é escrito nele.
+        """
         try:
-            features = []
-            for col in self.feature_columns:
-                # aceita chaves minúsculas ou com case
-                if col.lower() in reading:
-                    features.append(float(reading[col.lower()]))
-                elif col in reading:
-                    features.append(float(reading[col]))
-                else:
-                    self.logger.warning(f"Feature de sensor '{col}' não encontrada; atribuindo 0.0")
-                    features.append(0.0)
-
-            features_array = np.array(features).reshape(1, -1)
-            if self.scaler_params:
-                mean = self.scaler_params['mean']
-                std = self.scaler_params['std']
-                features_array = (features_array - mean) / std
-            return features_array
+            return extractor_for(self).transform(reading, out)
 
         except Exception as e:
             self.logger.error(f"Erro no processamento da leitura: {e}")
             raise
 
+    def process_sensor_batch(self, readings: Dict[str, Any], out: np.ndarray = None) -> np.ndarray:
+        """
+        Processa um bloco colunar de leituras ({'ph': [...], ...}) e retorna matriz N×4 normalizada.
+
+        Usa as mesmas regras de process_sensor_reading; `out` pode ser uma fatia
+        N×4 de uma matriz maior.
+        """
+        try:
+            return extractor_for(self).transform_batch(readings, out)
+
+        except Exception as e:
+            self.logger.error(f"Erro no processamento do lote de leituras: {e}")
+            raise
+
+    def feature_buffer(self) -> np.ndarray:
+        """Buffer 1×4 da thread atual para process_sensor_reading(out=...)."""
+        return extractor_for(self).buffer()
+
+    def __getstate__(self):
+        # O extrator (com buffers por thread) é recriado sob demanda após a carga
+        state = self.__dict__.copy()
+        state.pop('_extractor', None)
+        return state
+
     def get_feature_names(self):
         """Retorna lista de nomes das features."""
         return self.feature_columns.copy()
@@ -0,0 +1,191 @@
+####################################
+##### Arquivo: feature_cache.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Cache das matrizes de treino já limpas (X/y) e dos resumos estatísticos.
+
+As entradas ficam em ``.feature_cache/`` ao lado do CSV, indexadas por um hash
+do conteúdo do arquivo, das colunas configuradas e dos parâmetros de limpeza;
+qualquer mudança no CSV ou na configuração gera uma chave nova e as entradas
+antigas do mesmo arquivo são removidas. Para não reler o CSV a cada chamada, o
+hash do conteúdo é reaproveitado enquanto tamanho e mtime não mudarem. Os
+arrays são mapeados em memória na carga.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logging import get_logger
+from .streaming_stats import StreamingStats
+
+logger = get_logger(__name__)
+
+# Incrementar quando clean_data/load_csv_chunked mudarem o resultado da limpeza
+CLEANING_VERSION = 2
+
+CACHE_DIR_NAME = '.feature_cache'
+
+
+@dataclass
+class CachedFeatures:
+    """Matrizes limpas e resumos de um CSV."""
+    X: np.ndarray                       # features limpas (amostras × features)
+    y: np.ndarray                       # alvo 0/1
+    summary: Dict[str, Any]             # get_data_summary dos dados limpos
+    raw_summary: Optional[Dict[str, Any]]  # estatísticas do CSV antes da limpeza
+    key: str
+
+
+def raw_data_summary(df: pd.DataFrame, target_column: str) -> Dict[str, Any]:
+    """Estatísticas do CSV como lido (antes da limpeza), usadas pela página Dataset."""
+    numeric = df.select_dtypes(include=[np.number]).columns.tolist()
+    stats = StreamingStats(numeric).update(df)
+    feature_stats = {}
+    for col in numeric:
+        feature_stats[col] = {**stats.column_stats(col), 'median': float(df[col].median())}
+    return {
+        'total_records': len(df),
+        'n_columns': int(df.shape[1]),
+        'missing_values': int(df.isnull().sum().sum()),
+        'potable_count': int(pd.to_numeric(df[target_column], errors='coerce').sum())
+        if target_column in df.columns else 0,
+        'feature_stats': feature_stats
+    }
+
+
+class FeatureCache:
+    """Cache em disco das features limpas, invalidado pelo conteúdo do CSV."""
+
+    def __init__(self, enabled: bool = True, cache_dir: Optional[str] = None):
+        self.enabled = enabled
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def _dir_for(self, csv_path: Path) -> Path:
+        return self.cache_dir or csv_path.parent / CACHE_DIR_NAME
+
+    def _content_hash(self, csv_path: Path) -> str:
+        """SHA-256 do CSV, reaproveitado do índice enquanto tamanho e mtime não mudarem."""
+        stat = csv_path.stat()
+        index_path = self._dir_for(csv_path) / 'index.json'
+        index = {}
+        if index_path.exists():
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+
+        entry = index.get(str(csv_path))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+
+        digest = hashlib.sha256()
+        with open(csv_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+        index[str(csv_path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(f"index.tmp-{os.getpid()}.json")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
+        return digest.hexdigest()
+
+    def make_key(self, csv_path, processor, chunked: bool = False) -> str:
+        """Chave da entrada: conteúdo do CSV + colunas + parâmetros de limpeza."""
+        csv_path = Path(csv_path).resolve()
+        params = {
+            'content': self._content_hash(csv_path),
+            'features': list(processor.feature_columns),
+            'target': processor.target_column,
+            'cleaning_version': CLEANING_VERSION,
+            'chunked': bool(chunked)
+        }
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"{csv_path.stem}-{'chunked' if chunked else 'full'}-{digest[:16]}"
+
+    def load(self, csv_path, key: str) -> Optional[CachedFeatures]:
+        """Carrega a entrada (arrays mapeados em memória) ou None se não existir."""
+        entry_dir = self._dir_for(Path(csv_path).resolve()) / key
+        if not (entry_dir / 'summary.json').exists():
+            return None
+        with open(entry_dir / 'summary.json', 'r', encoding='utf-8') as f:
+            summaries = json.load(f)
+        return CachedFeatures(
+            X=np.load(entry_dir / 'X.npy', mmap_mode='r'),
+            y=np.load(entry_dir / 'y.npy', mmap_mode='r'),
+            summary=summaries['summary'],
+            raw_summary=summaries.get('raw_summary'),
+            key=key
+        )
+
+    def store(self, csv_path, features: CachedFeatures):
+        """Grava a entrada de forma atômica e remove as entradas antigas do mesmo CSV."""
+        csv_path = Path(csv_path).resolve()
+        cache_dir = self._dir_for(csv_path)
+        entry_dir = cache_dir / features.key
+        tmp_dir = cache_dir / f"{features.key}.tmp-{os.getpid()}"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        np.save(tmp_dir / 'X.npy', np.ascontiguousarray(features.X))
+        np.save(tmp_dir / 'y.npy', np.ascontiguousarray(features.y))
+        with open(tmp_dir / 'summary.json', 'w', encoding='utf-8') as f:
+            json.dump({'summary': features.summary, 'raw_summary': features.raw_summary}, f, indent=2)
+
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+
+        # Entradas do mesmo CSV e modo de leitura com outra chave ficaram obsoletas
+        prefix = features.key.rsplit('-', 1)[0]
+        for old_dir in cache_dir.glob(f"{prefix}-*"):
+            if old_dir.is_dir() and old_dir.name != features.key and '.tmp-' not in old_dir.name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.info(f"Features em cache: {entry_dir}")
+
+    def get_or_build(self, csv_path, processor, chunked: bool = False,
+                     chunk_size: int = 100_000) -> CachedFeatures:
+        """Retorna as features do cache ou limpa o CSV, grava a entrada e a retorna."""
+        key = self.make_key(csv_path, processor, chunked) if self.enabled else ''
+        if self.enabled:
+            cached = self.load(csv_path, key)
+            if cached is not None:
+                logger.info(f"Features carregadas do cache ({key}): {cached.X.shape}")
+                return cached
+
+        raw_summary = None
+        if chunked:
+            df_clean = processor.load_csv_chunked(str(csv_path), chunk_size)
+        else:
+            df = processor.load_csv_data(str(csv_path))
+            if df.empty:
+                raise ValueError("Não foi possível carregar dados do CSV")
+            raw_summary = raw_data_summary(df, processor.target_column)
+            df_clean = processor.clean_data(df)
+
+        if df_clean.empty:
+            raise ValueError("Não foi possível carregar dados do CSV")
+
+        X, y = processor.prepare_features(df_clean)
+        features = CachedFeatures(X=X, y=y, summary=processor.get_data_summary(df_clean),
+                                  raw_summary=raw_summary, key=key)
+        if self.enabled:
+            self.store(csv_path, features)
+        return features
@@ -0,0 +1,450 @@
+####################################
+##### Arquivo: reading_rollup.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Resumo contínuo das leituras em buckets por hora, para estatísticas de todo o
+histórico sem exportar a tabela ``readings``.
+
+Cada bucket guarda, por parâmetro, contagem/média/variância/mín/máx
+(StreamingStats), um t-digest para quantis e um sketch de valores frequentes
+para a moda; como todos são combináveis, a estatística de qualquer janela é a
+junção dos buckets dela. Os buckets ficam em um JSON por dia
+(``AAAA-MM-DD.json``); depois de ``hourly_retention_days`` as horas do dia são
+fundidas em um único bucket diário, e janelas que cortam esses dias passam a
+incluir o dia inteiro.
+
+Em memória ficam só as leituras ainda não gravadas; o flush relê o arquivo do
+dia e soma essas leituras a ele, com o diretório travado (arquivo ``.lock``)
+durante a leitura e a escrita. Assim vários processos (API, interface,
+reconstrução) podem alimentar o mesmo diretório sem um sobrescrever o que o
+outro gravou.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import yaml
+
+from .sketches import FrequentValues, TDigest
+from .streaming_stats import StreamingStats
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+DEFAULT_PARAMETERS = ('ph', 'turbidity', 'chloramines')
+QUARTILE_PROBS = [0.25, 0.5, 0.75]
+DECILE_PROBS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path):
+    """Trava exclusiva entre processos sobre `lock_path` (bloqueia até obter)."""
+    while True:
+        f = open(lock_path, 'a+b')
+        if fcntl is None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            break
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        # Se o diretório foi trocado (rebuild) enquanto esperava, trava o arquivo novo
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(lock_path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    try:
+        yield
+    finally:
+        if fcntl is None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.close()
+
+
+def _number(value: float):
+    """Número arredondado como no statistics.json (NA se ausente)."""
+    return 'NA' if value is None or not np.isfinite(value) else round(float(value), 4)
+
+
+class RollupBucket:
+    """Sketches combináveis de todos os parâmetros em um intervalo de tempo."""
+
+    def __init__(self, parameters: Sequence[str], compression: float = 200.0,
+                 mode_capacity: int = 64, mode_decimals: int = 2):
+        self.parameters = list(parameters)
+        self.stats = StreamingStats(self.parameters)
+        self.digests = {name: TDigest(compression) for name in self.parameters}
+        self.modes = {name: FrequentValues(mode_capacity, mode_decimals) for name in self.parameters}
+
+    def update(self, values: np.ndarray) -> 'RollupBucket':
+        """Acrescenta um bloco (leituras × parâmetros, NaN = ausente)."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.parameters))
+        self.stats.update(values)
+        for j, name in enumerate(self.parameters):
+            self.digests[name].update(values[:, j])
+            self.modes[name].update(values[:, j])
+        return self
+
+    def merge(self, other: 'RollupBucket') -> 'RollupBucket':
+        self.stats.merge(other.stats)
+        for name in self.parameters:
+            self.digests[name].merge(other.digests[name])
+            self.modes[name].merge(other.modes[name])
+        return self
+
+    def describe(self) -> Dict[str, Any]:
+        """Estatísticas por parâmetro no formato do statistics.json, com 'contagem'."""
+        variance = self.stats.variance()
+        results = {}
+        for j, name in enumerate(self.parameters):
+            count = int(self.stats.count[j])
+            if count == 0:
+                continue
+            digest = self.digests[name]
+            quartiles = digest.quantiles(QUARTILE_PROBS)
+            results[name] = {
+                'contagem': count,
+                'tendencia_central': {
+                    'media': _number(self.stats.mean[j]),
+                    'mediana': _number(quartiles[1]),
+                    'moda': _number(self.modes[name].mode())
+                },
+                'dispersao': {
+                    'variancia': _number(variance[j]),
+                    'desvio_padrao': _number(np.sqrt(variance[j])),
+                    'amplitude': _number(self.stats.max[j] - self.stats.min[j]),
+                    'iqr': _number(quartiles[2] - quartiles[0])
+                },
+                'separatrizes': {
+                    'quartis': [_number(q) for q in quartiles],
+                    'decis': [_number(d) for d in digest.quantiles(DECILE_PROBS)]
+                }
+            }
+        return results
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stats': self.stats.to_dict(),
+            'digests': {name: digest.to_dict() for name, digest in self.digests.items()},
+            'modes': {name: sketch.to_dict() for name, sketch in self.modes.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'RollupBucket':
+        bucket = cls(state['stats']['columns'])
+        bucket.stats = StreamingStats.from_dict(state['stats'])
+        bucket.digests = {name: TDigest.from_dict(s) for name, s in state['digests'].items()}
+        bucket.modes = {name: FrequentValues.from_dict(s) for name, s in state['modes'].items()}
+        return bucket
+
+
+class ReadingRollup:
+    """Buckets horários das leituras, gravados em um arquivo JSON por dia."""
+
+    def __init__(self, directory, parameters: Sequence[str] = DEFAULT_PARAMETERS, compression: float = 200.0,
+                 mode_capacity: int = 64, mode_decimals: int = 2, hourly_retention_days: int = 31,
+                 flush_interval: float = 30.0):
+        self.directory = Path(directory)
+        self.parameters = list(parameters)
+        self.compression = compression
+        self.mode_capacity = mode_capacity
+        self.mode_decimals = mode_decimals
+        self.hourly_retention_days = hourly_retention_days
+        self.flush_interval = flush_interval
+
+        # Leituras ainda não gravadas: {dia: {hora: bucket}}
+        self._days: Dict[date, Dict[int, RollupBucket]] = {}
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        # Dia do último compact() feito pelo flush (None = ainda não feito neste processo)
+        self._compacted_on: Optional[date] = None
+
+    def _new_bucket(self) -> RollupBucket:
+        return RollupBucket(self.parameters, self.compression, self.mode_capacity, self.mode_decimals)
+
+    def _directory_lock(self):
+        """Trava do diretório entre processos, para ler e regravar os arquivos dos dias."""
+        return _locked(self.directory / '.lock')
+
+    def _path(self, day: date) -> Path:
+        return self.directory / f"{day.isoformat()}.json"
+
+    def _read_day(self, day: date) -> Optional[Dict[str, Any]]:
+        """Buckets gravados do dia ({'hours': {hora: bucket}} ou {'day': bucket}), ou None se não houver."""
+        try:
+            with open(self._path(day), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rollup de {day} ilegível: {e}")
+            return None
+        if 'day' in state:
+            return {'day': RollupBucket.from_dict(state['day'])}
+        return {'hours': {int(hour): RollupBucket.from_dict(b) for hour, b in state['hours'].items()}}
+
+    def _bucket_for(self, hour_start: datetime) -> RollupBucket:
+        hours = self._days.setdefault(hour_start.date(), {})
+        bucket = hours.get(hour_start.hour)
+        if bucket is None:
+            bucket = hours[hour_start.hour] = self._new_bucket()
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Ingestão
+    # ------------------------------------------------------------------
+
+    def add(self, timestamp: datetime, values: Dict[str, Optional[float]]):
+        """
+        Acrescenta uma leitura (parâmetros ausentes ou None contam como NaN).
+
+        Os dias alterados são gravados no máximo a cada flush_interval segundos.
+        """
+        row = np.array([[np.nan if values.get(name) is None else values[name] for name in self.parameters]],
+                       dtype=np.float64)
+        with self._lock:
+            self._bucket_for(timestamp.replace(minute=0, second=0, microsecond=0)).update(row)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def add_frame(self, df: 'pd.DataFrame', timestamp_column: str = 'timestamp'):
+        """Acrescenta um bloco de leituras com coluna de horário (ex.: blocos do banco)."""
+        # pandas só é necessário aqui (reconstrução); a ingestão da API usa apenas add()
+        import pandas as pd
+
+        if df.empty:
+            return
+        hours = pd.to_datetime(df[timestamp_column]).dt.floor('h')
+        values = df.reindex(columns=self.parameters).to_numpy(dtype=np.float64)
+        with self._lock:
+            for hour_start, positions in pd.Series(np.arange(len(df))).groupby(hours.to_numpy()).groups.items():
+                self._bucket_for(pd.Timestamp(hour_start).to_pydatetime()).update(values[positions])
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def flush(self, today: Optional[date] = None):
+        """
+        Soma as leituras pendentes aos arquivos dos seus dias e as libera da memória.
+
+        Dias além de hourly_retention_days são gravados já compactados.
+
+        No primeiro flush do processo e a cada virada de dia também são
+        compactados os dias gravados que passaram de hourly_retention_days,
+        mesmo sem leituras novas.
+        """
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.hourly_retention_days)
+        with self._lock:
+            if self._days:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with self._directory_lock():
+                    for day, pending in sorted(self._days.items()):
+                        state = self._read_day(day) or {'hours': {}}
+                        if 'day' in state:
+                            state['day'] = self._merge([state['day'], *pending.values()])
+                        else:
+                            for hour, bucket in pending.items():
+                                stored = state['hours'].get(hour)
+                                state['hours'][hour] = bucket if stored is None else stored.merge(bucket)
+                            if day < cutoff:
+                                state = {'day': self._merge(state['hours'].values())}
+                        self._write_day(day, state)
+            self._days.clear()
+            if self._compacted_on != today:
+                since = None
+                if self._compacted_on is not None:
+                    since = self._compacted_on - timedelta(days=self.hourly_retention_days)
+                self.compact(today, since=since)
+                self._compacted_on = today
+            self._last_flush = time.monotonic()
+
+    def clear(self):
+        """Remove todos os buckets (memória e disco)."""
+        with self._lock:
+            for day in self._stored_days(None, None):
+                self._path(day).unlink(missing_ok=True)
+            self._days.clear()
+
+    def rebuild(self, frames: Iterable['pd.DataFrame'], timestamp_column: str = 'timestamp') -> int:
+        """
+        Recria o histórico a partir de blocos de leituras (ex.: todo o banco).
+
+        Os buckets são montados em um diretório temporário ao lado do atual, que
+        só é trocado no fim; se a leitura dos blocos falhar, o histórico atual
+        fica intacto. Leituras recebidas por outros processos durante a
+        reconstrução são somadas ao novo histórico no próximo flush deles, e as
+        que já estavam no banco podem ser contadas duas vezes (no máximo
+        flush_interval segundos de leituras); para um resultado exato, pare a
+        ingestão durante a reconstrução.
+
+        Returns:
+            Número de leituras processadas
+        """
+        self.flush()
+        staging_dir = self.directory.with_name(f"{self.directory.name}.rebuild-{os.getpid()}")
+        old_dir = self.directory.with_name(f"{self.directory.name}.old-{os.getpid()}")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        staging = ReadingRollup(staging_dir, self.parameters, self.compression, self.mode_capacity,
+                                self.mode_decimals, self.hourly_retention_days, self.flush_interval)
+        total = 0
+        try:
+            for df in frames:
+                staging.add_frame(df, timestamp_column)
+                staging.flush()
+                total += len(df)
+            staging_dir.mkdir(parents=True, exist_ok=True)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        with self._lock:
+            shutil.rmtree(old_dir, ignore_errors=True)
+            if not self.directory.exists():
+                os.replace(staging_dir, self.directory)
+            else:
+                # Flushes de outros processos esperam a troca e depois passam para a
+                # trava do diretório novo. No Windows um diretório com arquivo aberto
+                # não pode ser renomeado, então lá a troca é feita sem a trava.
+                with self._directory_lock() if fcntl is not None else contextlib.nullcontext():
+                    os.replace(self.directory, old_dir)
+                    os.replace(staging_dir, self.directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return total
+
+    def compact(self, today: Optional[date] = None, since: Optional[date] = None):
+        """
+        Funde em bucket diário as horas gravadas de dias além de hourly_retention_days.
+
+        Com `since`, só os dias a partir dele são verificados (os anteriores já
+        foram compactados).
+        """
+        cutoff = (today or date.today()) - timedelta(days=self.hourly_retention_days)
+        with self._lock:
+            if not self.directory.exists():
+                return
+            with self._directory_lock():
+                for day in self._stored_days(since, cutoff - timedelta(days=1)):
+                    state = self._read_day(day)
+                    if state is not None and 'hours' in state:
+                        self._write_day(day, {'day': self._merge(state['hours'].values())})
+
+    def _write_day(self, day: date, state: Dict[str, Any]):
+        if 'day' in state:
+            payload = {'day': state['day'].to_dict()}
+        else:
+            payload = {'hours': {str(hour): bucket.to_dict() for hour, bucket in state['hours'].items()}}
+        path = self._path(day)
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    def _merge(self, buckets: Iterable[RollupBucket]) -> RollupBucket:
+        merged = self._new_bucket()
+        for bucket in buckets:
+            merged.merge(bucket)
+        return merged
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _stored_days(self, first: Optional[date], last: Optional[date]):
+        """Dias com arquivo ou leituras pendentes dentro de [first, last] (limites None = abertos)."""
+        days = set(self._days)
+        if self.directory.exists():
+            for path in self.directory.glob('????-??-??.json'):
+                try:
+                    days.add(date.fromisoformat(path.stem))
+                except ValueError:
+                    continue
+        return sorted(day for day in days
+                      if (first is None or day >= first) and (last is None or day <= last))
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> RollupBucket:
+        """
+        Junção dos buckets da janela [start, end) (horas contadas pelo início).
+
+        Dias já compactados entram inteiros se tiverem alguma hora na janela.
+        """
+        first_hour = start.replace(minute=0, second=0, microsecond=0) if start else None
+        result = self._new_bucket()
+        with self._lock:
+            for day in self._stored_days(first_hour.date() if first_hour else None, end.date() if end else None):
+                day_start = datetime.combine(day, datetime.min.time())
+                state = self._read_day(day) or {'hours': {}}
+                if 'day' in state:
+                    if end is None or day_start < end:
+                        result.merge(state['day'])
+                hours = [state.get('hours', {}).items(), self._days.get(day, {}).items()]
+                for hour, bucket in (item for items in hours for item in items):
+                    hour_start = day_start.replace(hour=hour)
+                    if (first_hour is None or hour_start >= first_hour) and (end is None or hour_start < end):
+                        result.merge(bucket)
+        return result
+
+    def describe(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """Estatísticas por parâmetro da janela (formato do statistics.json + 'contagem')."""
+        return self.query(start, end).describe()
+
+
+def _load_rollup_config() -> Dict[str, Any]:
+    config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+    try:
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        return {}
+    return config.get('rollup') or {}
+
+
+_rollup: Optional[ReadingRollup] = None
+_rollup_lock = threading.Lock()
+
+
+def get_reading_rollup() -> Optional[ReadingRollup]:
+    """Rollup do processo configurado em config.yaml (None se desabilitado)."""
+    global _rollup
+    with _rollup_lock:
+        if _rollup is None:
+            config = _load_rollup_config()
+            if not config.get('enabled', True):
+                return None
+            _rollup = ReadingRollup(
+                Path(__file__).parent.parent.parent / config.get('dir', 'src/processing/.rollup'),
+                parameters=config.get('parameters', DEFAULT_PARAMETERS),
+                compression=config.get('compression', 200),
+                mode_capacity=config.get('mode_capacity', 64),
+                mode_decimals=config.get('mode_decimals', 2),
+                hourly_retention_days=config.get('hourly_retention_days', 31),
+                flush_interval=config.get('flush_interval_seconds', 30)
+            )
+            # Grava o que ainda estiver só em memória ao encerrar o processo
+            atexit.register(_rollup.flush)
+        return _rollup
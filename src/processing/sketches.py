@@ -0,0 +1,178 @@
+####################################
+##### Arquivo: sketches.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Resumos aproximados e combináveis de distribuições (sketches).
+
+- ``TDigest``: quantis (mediana, quartis, decis, IQR) com memória fixa. Os
+  valores são agrupados em centróides (média, peso) cujo tamanho é limitado
+  pela função de escala k1, ``k(q) = δ/(2π)·asin(2q − 1)``: centróides
+  pequenos nas caudas e maiores no centro, o que mantém o erro relativo baixo
+  perto de 0 e 1. Dois digests se combinam juntando os centróides.
+- ``FrequentValues``: moda pelo algoritmo de Misra-Gries sobre os valores
+  arredondados a ``decimals`` casas. Guarda no máximo ``capacity`` contadores;
+  todo valor com frequência acima de n/(capacity + 1) é mantido, e as
+  contagens são subestimadas em no máximo esse valor.
+
+Ambos são serializáveis em JSON (``to_dict``/``from_dict``).
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+class TDigest:
+    """t-digest com buffer: os valores novos são incorporados em lote aos centróides."""
+
+    def __init__(self, compression: float = 200.0):
+        self.compression = float(compression)
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values) -> 'TDigest':
+        """Acrescenta valores (NaN são ignorados)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += values.size
+        if self._buffered >= 5 * self.compression:
+            self._flush()
+        return self
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Combina com outro digest (o resultado resume a união dos dados)."""
+        other._flush()
+        if other.weights.size:
+            self._flush()
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        values = np.concatenate(self._buffer)
+        self._buffer, self._buffered = [], 0
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(values.size)]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Reagrupa os centróides: um grupo por unidade da escala k1 (medida no início de cada centróide)."""
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        _, groups = np.unique(groups, return_inverse=True)
+        self.weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=weights * means) / self.weights
+
+    def quantiles(self, probs) -> np.ndarray:
+        """Quantis aproximados (interpolação linear entre os centros dos centróides)."""
+        self._flush()
+        probs = np.asarray(probs, dtype=np.float64)
+        if not self.weights.size:
+            return np.full(probs.shape, np.nan)
+        if self.weights.size == 1:
+            return np.full(probs.shape, self.means[0])
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(probs * total, positions, values)
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._flush()
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'TDigest':
+        digest = cls(state['compression'])
+        digest.means = np.asarray(state['means'], dtype=np.float64)
+        digest.weights = np.asarray(state['weights'], dtype=np.float64)
+        digest.min = float(state['min'])
+        digest.max = float(state['max'])
+        return digest
+
+
+class FrequentValues:
+    """Valores mais frequentes (Misra-Gries) para estimar a moda."""
+
+    def __init__(self, capacity: int = 64, decimals: int = 2):
+        self.capacity = int(capacity)
+        self.decimals = int(decimals)
+        self.counts: Dict[float, int] = {}
+        self.total = 0
+
+    def update(self, values) -> 'FrequentValues':
+        """Acrescenta valores (arredondados a `decimals` casas; NaN são ignorados)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            keys, counts = np.unique(np.round(values, self.decimals), return_counts=True)
+            self._add(zip(keys.tolist(), counts.tolist()), int(values.size))
+        return self
+
+    def merge(self, other: 'FrequentValues') -> 'FrequentValues':
+        self._add(other.counts.items(), other.total)
+        return self
+
+    def _add(self, items, total: int):
+        for key, count in items:
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += total
+        if len(self.counts) > self.capacity:
+            # Desconta a (capacity + 1)-ésima maior contagem de todos e remove os que zeram
+            threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {key: count - threshold for key, count in self.counts.items() if count > threshold}
+
+    def mode(self) -> float:
+        """Valor mais frequente (no empate, o menor, como no table() do R); NaN se vazio."""
+        if not self.counts:
+            return float('nan')
+        return min(self.counts.items(), key=lambda item: (-item[1], item[0]))[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'capacity': self.capacity,
+            'decimals': self.decimals,
+            'total': self.total,
+            'counts': [[key, count] for key, count in self.counts.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'FrequentValues':
+        sketch = cls(state['capacity'], state['decimals'])
+        sketch.total = int(state['total'])
+        sketch.counts = {float(key): int(count) for key, count in state['counts']}
+        return sketch
@@ -0,0 +1,132 @@
+####################################
+##### Arquivo: streaming_stats.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Estatísticas descritivas em uma única passada sobre os blocos.
+
+Cada bloco de dados é resumido em contagem, média, soma dos quadrados dos
+desvios (M2), mínimo, máximo, soma e nulos por coluna (média e M2 em duas
+passadas sobre o bloco, já em memória), e os resumos são combinados pela
+fórmula paralela de Chan et al. — o que permite processar arrays
+inteiros, iteradores de blocos ou juntar resultados de processos diferentes.
+"""
+
+from typing import Any, Dict, Iterable, Sequence
+
+import numpy as np
+
+
+class StreamingStats:
+    """Resumo combinável (count, média, M2, min, max, soma, nulos) de várias colunas."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.nulls = np.zeros(n, dtype=np.int64)
+        self.mean = np.zeros(n, dtype=np.float64)
+        self.m2 = np.zeros(n, dtype=np.float64)
+        self.total = np.zeros(n, dtype=np.float64)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+
+    def update(self, values) -> 'StreamingStats':
+        """Acrescenta um bloco (amostras × colunas, ou DataFrame com as colunas)."""
+        if hasattr(values, 'loc'):
+            values = values[self.columns].to_numpy(dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+
+        nan_mask = np.isnan(values)
+        count = (~nan_mask).sum(axis=0)
+        self.nulls += nan_mask.sum(axis=0)
+        if not count.any():
+            return self
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total = np.nansum(values, axis=0)
+            mean = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+            m2 = np.nansum((values - mean) ** 2, axis=0)
+
+        block = StreamingStats(self.columns)
+        block.count = count
+        block.mean = mean
+        block.m2 = m2
+        block.total = total
+        # fmin/fmax ignoram NaN (colunas só com NaN ficam com ±inf pelo where)
+        has_values = count > 0
+        block.min = np.where(has_values, np.fmin.reduce(values, axis=0), np.inf)
+        block.max = np.where(has_values, np.fmax.reduce(values, axis=0), -np.inf)
+        return self.merge(block)
+
+    def update_chunks(self, chunks: Iterable) -> 'StreamingStats':
+        """Acrescenta todos os blocos de um iterador (ex.: iter_clean_chunks)."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: 'StreamingStats') -> 'StreamingStats':
+        """Combina com outro resumo das mesmas colunas (fórmula paralela de Chan)."""
+        if other.columns != self.columns:
+            raise ValueError("Resumos com colunas diferentes não podem ser combinados")
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(count > 0, other.count / np.maximum(count, 1), 0.0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.count = count
+        self.nulls = self.nulls + other.nulls
+        self.total = self.total + other.total
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """Variância por coluna (ddof=1, como pandas e R); NaN se não houver dados suficientes."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        return np.sqrt(self.variance(ddof))
+
+    def column_stats(self, column: str) -> Dict[str, Any]:
+        """Estatísticas de uma coluna no formato de get_data_summary."""
+        j = self.columns.index(column)
+        empty = self.count[j] == 0
+        return {
+            'mean': float('nan') if empty else float(self.mean[j]),
+            'std': float(self.std()[j]),
+            'min': float('nan') if empty else float(self.min[j]),
+            'max': float('nan') if empty else float(self.max[j]),
+            'missing': int(self.nulls[j])
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializável (para enviar entre processos ou gravar em JSON)."""
+        return {
+            'columns': self.columns,
+            'count': self.count.tolist(),
+            'nulls': self.nulls.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'total': self.total.tolist(),
+            'min': self.min.tolist(),
+            'max': self.max.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'StreamingStats':
+        stats = cls(state['columns'])
+        stats.count = np.asarray(state['count'], dtype=np.int64)
+        stats.nulls = np.asarray(state['nulls'], dtype=np.int64)
+        for name in ('mean', 'm2', 'total', 'min', 'max'):
+            setattr(stats, name, np.asarray(state[name], dtype=np.float64))
+        return stats
@@ -7,5 +7,7 @@
 ####################################
 
 from .r_analyzer import RAnalyzer
+from .r_worker import RWorker, get_r_worker
+from .job_manager import RJobManager, RJobQueueFull, get_job_manager
 
-__all__ = ['RAnalyzer'] 
\ No newline at end of file
+__all__ = ['RAnalyzer', 'RWorker', 'get_r_worker', 'RJobManager', 'RJobQueueFull', 'get_job_manager'] 
\ No newline at end of file
@@ -0,0 +1,116 @@
+####################################
+##### Arquivo: binary_frame.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Troca de dados com o R em formato binário, sem passar por CSV.
+
+Layout do arquivo (.bin), lido no R com ``readBin``:
+
+- 4 bytes: tamanho do cabeçalho (inteiro little-endian);
+- cabeçalho JSON: ``{"nrow": N, "columns": [{"name": ..., "type": ...}]}``;
+- um bloco contíguo por coluna: ``double`` em float64 little-endian (ausentes
+  gravados com o padrão de bits do NA do R) ou ``integer``/``logical`` em
+  int32 little-endian (ausentes = NA_integer_).
+
+Colunas de texto não são transferidas: o script R só usa variáveis numéricas
+e a potabilidade. Quando disponível, o arquivo vai para um diretório em RAM
+(``/dev/shm``).
+"""
+
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Padrão de bits do NA_real_ do R (um NaN com payload 1954)
+R_NA_REAL_BITS = np.uint64(0x7FF00000000007A2)
+# NA_integer_ do R
+R_NA_INTEGER = np.iinfo(np.int32).min
+
+RAM_TMP_DIR = '/dev/shm'
+
+
+def transfer_dir(configured: Optional[str] = None) -> Optional[str]:
+    """Diretório dos arquivos de troca: o configurado, /dev/shm se gravável, ou o temp padrão (None)."""
+    if configured:
+        return configured
+    if os.path.isdir(RAM_TMP_DIR) and os.access(RAM_TMP_DIR, os.W_OK):
+        return RAM_TMP_DIR
+    return None
+
+
+def _column_block(series: pd.Series):
+    """(tipo no R, array little-endian) da coluna, ou None se não for transferida."""
+    if not pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return None
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        # Inteiros fora da faixa do int32 do R seguem como double
+        if np.abs(values[~missing]).max(initial=0) <= np.iinfo(np.int32).max:
+            kind = 'logical' if pd.api.types.is_bool_dtype(series) else 'integer'
+            return kind, np.where(missing, R_NA_INTEGER, values).astype('<i4')
+
+    block = values.astype('<f8')
+    block.view('<u8')[missing] = R_NA_REAL_BITS
+    return 'double', block
+
+
+def write_binary_frame(df: pd.DataFrame, path) -> Path:
+    """Grava as colunas numéricas/lógicas do DataFrame no formato binário."""
+    path = Path(path)
+    columns, blocks = [], []
+    for name in df.columns:
+        result = _column_block(df[name])
+        if result is None:
+            continue
+        columns.append({'name': str(name), 'type': result[0]})
+        blocks.append(result[1])
+
+    header = json.dumps({'nrow': int(len(df)), 'columns': columns}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<i', len(header)))
+        f.write(header)
+        for block in blocks:
+            block.tofile(f)
+    return path
+
+
+def read_binary_frame(path) -> pd.DataFrame:
+    """Lê um arquivo gravado por write_binary_frame (NA volta como NaN/<NA>)."""
+    with open(path, 'rb') as f:
+        (header_len,) = struct.unpack('<i', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        nrow = header['nrow']
+        data = {}
+        for column in header['columns']:
+            if column['type'] == 'double':
+                data[column['name']] = np.fromfile(f, dtype='<f8', count=nrow).astype(np.float64)
+            else:
+                values = np.fromfile(f, dtype='<i4', count=nrow)
+                series = pd.Series(values, dtype='Int32').mask(values == R_NA_INTEGER)
+                data[column['name']] = series.astype('boolean') if column['type'] == 'logical' else series
+    return pd.DataFrame(data)
+
+
+def create_transfer_file(df: pd.DataFrame, binary: bool = True, tmp_dir: Optional[str] = None) -> str:
+    """Grava os dados da análise em um arquivo temporário (.bin ou .csv) e retorna o caminho."""
+    suffix = '.bin' if binary else '.csv'
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix='water_analysis_', dir=transfer_dir(tmp_dir))
+    os.close(fd)
+    if binary:
+        write_binary_frame(df, path)
+    else:
+        df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,344 @@
+####################################
+##### Arquivo: job_manager.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Fila de análises R executadas em segundo plano.
+
+A interface envia a análise com ``submit`` e recebe um id de job; o
+processamento acontece em um pool fixo de threads e a página consulta
+``status``/``result`` até o job terminar, sem prender a execução do script
+do Streamlit.
+
+- Justiça entre usuários: cada sessão tem sua própria fila e as threads
+  atendem as sessões em rodízio (round-robin): o próximo job é o da sessão
+  atendida há mais tempo, então uma sessão com vários jobs não atrasa as
+  demais; cada sessão pode ter no máximo ``max_pending_per_session`` jobs
+  aguardando.
+- Persistência: o estado de cada job fica em ``<id>.json`` e o resultado em
+  ``<id>.result.json`` no diretório dos jobs; jobs que estavam na fila ou em
+  execução quando a aplicação parou são marcados como falhos na próxima
+  inicialização. Jobs concluídos há mais de ``retention_seconds`` são
+  removidos.
+- Concorrência: todas as threads usam o mesmo processo R persistente
+  (``get_r_worker``), que atende uma requisição por vez; os jobs R rodam,
+  portanto, um de cada vez. Por isso o padrão é ``max_workers=1``; threads
+  a mais só esperam na trava do worker.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+import yaml
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+PENDING_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class RJobError(RuntimeError):
+    """Erro ao enfileirar uma análise R."""
+
+
+class RJobQueueFull(RJobError):
+    """A sessão já tem o máximo de jobs aguardando."""
+
+
+def _write_json(path: Path, payload: Dict[str, Any]):
+    """Grava o JSON de forma atômica (arquivo temporário + rename)."""
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+class RJobManager:
+    """Pool limitado de threads que executa RAnalyzer.analyze_data em segundo plano."""
+
+    def __init__(self, jobs_dir, max_workers: int = 1, max_pending_per_session: int = 3,
+                 retention_seconds: float = 24 * 3600, poll_interval: float = 2.0,
+                 analyzer_factory: Optional[Callable[[], Any]] = None):
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending_per_session = max_pending_per_session
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+
+        if analyzer_factory is None:
+            from .r_analyzer import RAnalyzer
+            analyzer_factory = RAnalyzer
+        self._analyzer_factory = analyzer_factory
+        self._analyzer = None
+
+        # sessão -> jobs aguardando, e sessão -> vez em que foi atendida por último
+        self._queues: Dict[str, deque] = {}
+        self._served: Dict[str, int] = {}
+        self._turn = 0
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._inputs: Dict[str, tuple] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._recover()
+        self._threads = [
+            threading.Thread(target=self._worker_loop, name=f"r-job-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _status_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.json"
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.result.json"
+
+    def _save(self, job: Dict[str, Any]):
+        try:
+            _write_json(self._status_path(job['id']), job)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o estado do job R {job['id']}: {e}")
+
+    def _remove(self, job_id: str):
+        for path in (self._status_path(job_id), self._result_path(job_id)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _recover(self):
+        """Marca como falhos os jobs interrompidos e remove os expirados."""
+        now = time.time()
+        for path in self.jobs_dir.glob('*.json'):
+            if path.name.endswith('.result.json'):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+                continue
+            if not isinstance(job, dict):
+                logger.warning(f"Estado de job R inválido ignorado: {path.name}")
+                continue
+            # O nome do arquivo é o id; estados antigos ou editados podem não ter o campo
+            job['id'] = job.get('id') or path.stem
+
+            if job.get('status') in PENDING_STATUSES:
+                job.update(status=JOB_FAILED, finished=now,
+                           error="Análise interrompida: a aplicação foi reiniciada")
+                self._save(job)
+            elif now - (job.get('finished') or now) > self.retention_seconds:
+                self._remove(job['id'])
+
+    def _cleanup(self):
+        """Remove da memória e do disco os jobs concluídos há mais de retention_seconds."""
+        now = time.time()
+        with self._cond:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['status'] not in PENDING_STATUSES
+                       and now - job['finished'] > self.retention_seconds]
+            for job_id in expired:
+                del self._jobs[job_id]
+            # O histórico do rodízio só precisa das sessões ativas
+            if len(self._served) > 1024:
+                active = {job['session'] for job in self._jobs.values()}
+                self._served = {session: turn for session, turn in self._served.items() if session in active}
+        for job_id in expired:
+            self._remove(job_id)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, data: pd.DataFrame, session_id: str, analysis_type: str = "complete",
+               variables: Optional[List[str]] = None) -> str:
+        """
+        Enfileira uma análise e retorna o id do job.
+
+        Raises:
+            RJobQueueFull: se a sessão já tiver max_pending_per_session jobs aguardando
+        """
+        with self._cond:
+            if self._closed:
+                raise RJobError("Fila de análises R encerrada")
+            pending = self._queues.get(session_id)
+            if pending is not None and len(pending) >= self.max_pending_per_session:
+                raise RJobQueueFull(
+                    f"Já existem {len(pending)} análises aguardando nesta sessão; aguarde a conclusão")
+
+            job_id = uuid.uuid4().hex[:16]
+            job = {
+                'id': job_id,
+                'session': session_id,
+                'status': JOB_QUEUED,
+                'analysis_type': analysis_type,
+                'variables': None if variables is None else list(variables),
+                'rows': int(len(data)),
+                'submitted': time.time(),
+                'started': None,
+                'finished': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._inputs[job_id] = (data, {'analysis_type': analysis_type, 'variables': job['variables']})
+            self._queues.setdefault(session_id, deque()).append(job_id)
+            self._save(job)
+            self._cond.notify()
+
+        logger.info(f"Job R {job_id} enfileirado (sessão {session_id}, {len(data)} registros)")
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado do job (inclusive de execuções anteriores da aplicação), ou None se não existir."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        try:
+            with open(self._status_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Resultado no formato de analyze_data; None enquanto o job não termina."""
+        job = self.status(job_id)
+        if job is None or job['status'] in PENDING_STATUSES:
+            return None
+        try:
+            with open(self._result_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"error": job.get('error') or "Resultado da análise indisponível"}
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Posição do job na fila da sua sessão (1 = próximo), ou None se não estiver aguardando."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            pending = self._queues.get(job['session']) if job else None
+            if not pending or job_id not in pending:
+                return None
+            return list(pending).index(job_id) + 1
+
+    def shutdown(self, wait: bool = False):
+        """Para as threads (os jobs em execução terminam; os da fila ficam como interrompidos)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _analyzer_instance(self):
+        with self._cond:
+            if self._analyzer is None:
+                self._analyzer = self._analyzer_factory()
+            return self._analyzer
+
+    def _next_job(self):
+        """Próximo job em rodízio: o primeiro da sessão atendida há mais tempo (ou nunca atendida)."""
+        with self._cond:
+            while not self._queues and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+
+            session_id = min(self._queues, key=lambda session: self._served.get(session, -1))
+            pending = self._queues[session_id]
+            job_id = pending.popleft()
+            if not pending:
+                del self._queues[session_id]
+            self._turn += 1
+            self._served[session_id] = self._turn
+
+            job = self._jobs[job_id]
+            job.update(status=JOB_RUNNING, started=time.time())
+            self._save(job)
+            return job_id, self._inputs.pop(job_id)
+
+    def _worker_loop(self):
+        while True:
+            item = self._next_job()
+            if item is None:
+                return
+            job_id, (data, params) = item
+            try:
+                result = self._analyzer_instance().analyze_data(data, **params)
+            except Exception as e:
+                logger.error(f"Erro no job R {job_id}: {e}")
+                result = {"error": f"Erro na análise: {e}"}
+            self._finish(job_id, result)
+
+    def _finish(self, job_id: str, result: Dict[str, Any]):
+        try:
+            _write_json(self._result_path(job_id), result)
+        except (OSError, TypeError, ValueError) as e:
+            result = {"error": f"Não foi possível gravar o resultado: {e}"}
+
+        with self._cond:
+            job = self._jobs[job_id]
+            job.update(status=JOB_FAILED if 'error' in result else JOB_DONE,
+                       finished=time.time(), error=result.get('error'))
+            self._save(job)
+        logger.info(f"Job R {job_id} concluído ({job['status']}) "
+                    f"em {job['finished'] - job['started']:.1f}s")
+        self._cleanup()
+
+
+# Pool compartilhado pelas sessões do Streamlit (mesmo processo)
+_manager: Optional[RJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def _load_jobs_config() -> Dict[str, Any]:
+    """Seção r_analysis.jobs do config.yaml (vazia se ausente)."""
+    config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+    try:
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        return {}
+    return (config.get('r_analysis') or {}).get('jobs') or {}
+
+
+def get_job_manager() -> RJobManager:
+    """Retorna a fila de análises R do processo (criada na primeira chamada)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            config = _load_jobs_config()
+            _manager = RJobManager(
+                Path(__file__).parent.parent.parent / config.get('dir', 'src/r_analysis/.jobs'),
+                max_workers=config.get('max_workers', 1),
+                max_pending_per_session=config.get('max_pending_per_session', 3),
+                retention_seconds=config.get('retention_hours', 24) * 3600,
+                poll_interval=config.get('poll_interval_seconds', 2)
+            )
+        return _manager
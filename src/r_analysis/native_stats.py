@@ -0,0 +1,126 @@
+####################################
+##### Arquivo: native_stats.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Estatísticas descritivas em NumPy no mesmo formato do statistics.json do R.
+
+Reproduz ``water_analysis.R`` coluna a coluna, com todas as colunas
+processadas juntas em uma matriz:
+
+- quantis, mediana e IQR pelo tipo 7 do R (interpolação linear);
+- variância e desvio padrão amostrais (n - 1), via StreamingStats;
+- moda como em ``names(sort(table(x), decreasing = TRUE))[1]``: os valores são
+  agrupados pelo texto com 15 dígitos significativos e, no empate, vence o
+  menor valor;
+- números arredondados a 4 casas decimais e NA como "NA" (padrão do
+  ``write_json`` do jsonlite).
+"""
+
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from ..processing.streaming_stats import StreamingStats
+
+QUARTILE_PROBS = np.array([0.25, 0.5, 0.75])
+# Mesmos valores de seq(0.1, 0.9, 0.1) no R (from + i * by)
+DECILE_PROBS = 0.1 + np.arange(9) * 0.1
+
+# Casas decimais do write_json (digits = 4)
+JSON_DIGITS = 4
+
+
+def _json_number(value: float):
+    return 'NA' if not np.isfinite(value) else round(float(value), JSON_DIGITS)
+
+
+def quantiles_type7(sorted_values: np.ndarray, counts: np.ndarray, probs: np.ndarray) -> np.ndarray:
+    """
+    Quantis tipo 7 do R para cada coluna de uma matriz ordenada (NaN no fim).
+
+    Returns:
+        Matriz (probabilidades × colunas)
+    """
+    index = (counts[None, :] - 1) * probs[:, None]
+    lo = np.floor(index).astype(np.intp)
+    hi = np.ceil(index).astype(np.intp)
+    columns = np.arange(sorted_values.shape[1])[None, :]
+    low_values = sorted_values[lo, columns]
+    high_values = sorted_values[hi, columns]
+    # Mesma fórmula de quantile.default: (1 - h) * x[lo] + h * x[hi], só onde há interpolação
+    h = index - lo
+    interpolate = (index > lo) & (high_values != low_values)
+    return np.where(interpolate, (1 - h) * low_values + h * high_values, low_values)
+
+
+def table_mode(values: np.ndarray) -> float:
+    """Moda como no R: valor mais frequente do table() (texto com 15 dígitos), menor no empate."""
+    unique, counts = np.unique(values, return_counts=True)
+    # table() agrupa pelo as.character() do valor, que usa 15 dígitos significativos
+    labels = np.array([float(f"{value:.15g}") for value in unique])
+    keys, inverse = np.unique(labels, return_inverse=True)
+    totals = np.bincount(inverse, weights=counts)
+    return float(keys[np.argmax(totals)])
+
+
+def describe_columns(df: pd.DataFrame, exclude: Iterable[str] = ('potability',)) -> Dict[str, Any]:
+    """
+    Estatísticas de todas as colunas numéricas, no formato do statistics.json do R.
+
+    Args:
+        df: Dados da análise (colunas não numéricas são ignoradas, como no R)
+        exclude: Colunas puladas (a variável alvo)
+
+    Returns:
+        {variável: {'tendencia_central': ..., 'dispersao': ..., 'separatrizes': ...}}
+    """
+    exclude = set(exclude)
+    columns = [col for col in df.columns
+               if col not in exclude and pd.api.types.is_numeric_dtype(df[col])
+               and not pd.api.types.is_bool_dtype(df[col])]
+    if not columns:
+        return {}
+
+    values = df[columns].to_numpy(dtype=np.float64)
+    stats = StreamingStats(columns).update(values)
+    counts = stats.count
+    present = counts > 0
+    if not present.any():
+        return {}
+
+    # Uma ordenação para todas as colunas (NaN vão para o fim de cada coluna)
+    sorted_values = np.sort(values[:, present], axis=0)
+    n = counts[present]
+    quartiles = quantiles_type7(sorted_values, n, QUARTILE_PROBS)
+    deciles = quantiles_type7(sorted_values, n, DECILE_PROBS)
+    variance = stats.variance()[present]
+    std = stats.std()[present]
+    mean = stats.mean[present]
+    minimum, maximum = stats.min[present], stats.max[present]
+
+    results = {}
+    for k, col in enumerate(np.asarray(columns)[present]):
+        results[str(col)] = {
+            'tendencia_central': {
+                'media': _json_number(mean[k]),
+                'mediana': _json_number(quartiles[1, k]),
+                'moda': _json_number(table_mode(sorted_values[:n[k], k]))
+            },
+            'dispersao': {
+                'variancia': _json_number(variance[k]),
+                'desvio_padrao': _json_number(std[k]),
+                'amplitude': _json_number(maximum[k] - minimum[k]),
+                'iqr': _json_number(quartiles[2, k] - quartiles[0, k])
+            },
+            'separatrizes': {
+                'quartis': [_json_number(q) for q in quartiles[:, k]],
+                'decis': [_json_number(d) for d in deciles[:, k]]
+            }
+        }
+    return results
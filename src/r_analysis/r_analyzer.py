@@ -12,9 +12,15 @@ import json
 import tempfile
 import os
 from pathlib import Path
-import base64
 from typing import Dict, List, Any, Optional
+import hashlib
+import yaml
 from ..utils.logging import get_logger
+from .r_worker import RWorkerError, RWorkerTimeout, get_r_worker
+from .binary_frame import create_transfer_file
+from .r_discovery import discover_rscript
+from .native_stats import describe_columns
+from .result_cache import RResultCache, graphic_files, read_graphics
 
 logger = get_logger(__name__)
 
@@ -25,8 +31,84 @@ class RAnalyzer:
         self.r_script_path = Path(__file__).parent / "scripts"
         self.r_script_path.mkdir(exist_ok=True)
         self.rscript_path = None  # Será definido ao verificar disponibilidade
+        self.r_version = None
         self._r_availability_checked = False  # Flag para evitar verificações repetidas
+        self.config = self._load_config()
+        self._script_hash = None
         self._create_r_scripts()
+        self.result_cache = self._create_result_cache()
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Carrega a seção r_analysis do arquivo YAML (vazia se ausente)."""
+        config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+        try:
+            with open(config_path, 'r', encoding='utf-8') as file:
+                config = yaml.safe_load(file) or {}
+        except FileNotFoundError:
+            return {}
+        return config.get('r_analysis') or {}
+
+    def _create_result_cache(self) -> Optional[RResultCache]:
+        """Cache em disco dos resultados (r_analysis.cache), ou None se desabilitado."""
+        cache_config = self.config.get('cache') or {}
+        if not cache_config.get('enabled', True):
+            return None
+        cache_dir = Path(__file__).parent.parent.parent / cache_config.get('dir', 'src/r_analysis/.cache')
+        return RResultCache(cache_dir, max_bytes=int(cache_config.get('max_size_mb', 200) * 1024 * 1024))
+
+    def _get_worker(self):
+        """Worker R persistente compartilhado pelo processo (None se desabilitado)."""
+        worker_config = self.config.get('worker') or {}
+        if not worker_config.get('enabled', True):
+            return None
+        script_path = self.r_script_path / "water_analysis.R"
+        return get_r_worker(
+            [self.rscript_path, str(script_path), '--worker'],
+            startup_timeout=worker_config.get('startup_timeout_seconds', 30),
+            job_timeout=worker_config.get('job_timeout_seconds', 60),
+            health_check_interval=worker_config.get('health_check_interval_seconds', 30)
+        )
+
+    def _plot_options(self) -> Dict[str, Any]:
+        """Formato, resolução e processos paralelos dos gráficos (r_analysis.plots)."""
+        plot_config = self.config.get('plots') or {}
+        plot_format = str(plot_config.get('format', 'png')).lower()
+        if plot_format not in ('png', 'svg'):
+            logger.warning(f"Formato de gráfico não suportado: {plot_format}; usando png")
+            plot_format = 'png'
+        return {
+            'format': plot_format,
+            'dpi': int(plot_config.get('dpi', 150)),
+            'workers': int(plot_config.get('workers', 0))
+        }
+
+    def _run_analysis(self, data_file: str, output_dir: str, variables: Optional[List[str]] = None) -> str:
+        """
+        Gera os gráficos no R (worker persistente, se habilitado) e retorna a saída do R.
+
+        Args:
+            variables: Variáveis com histograma/boxplot (None = todas as numéricas)
+        """
+        options = {'plot_options': self._plot_options()}
+        if variables is not None:
+            options['variables'] = list(variables)
+
+        worker = self._get_worker()
+        if worker is not None:
+            return worker.submit('analyze', data_file=data_file, output_dir=output_dir, statistics=False,
+                                 **options)['output']
+
+        script_path = self.r_script_path / "water_analysis.R"
+        cmd = [self.rscript_path, str(script_path), data_file, output_dir, '--plots-only',
+               f"--options={json.dumps(options)}"]
+        timeout = (self.config.get('worker') or {}).get('job_timeout_seconds', 60)
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, encoding='utf-8')
+        except subprocess.TimeoutExpired:
+            raise RWorkerTimeout(f"Rscript não terminou em {timeout}s")
+        if result.returncode != 0:
+            raise RWorkerError(result.stderr)
+        return result.stdout
     
     def _create_r_scripts(self):
         """Cria os scripts R necessários para as análises."""
@@ -65,10 +147,84 @@ calc_separatrizes <- function(x) {
   )
 }
 
+# Leitura do arquivo binário gravado por binary_frame.py (cabeçalho JSON + colunas)
+read_binary_frame <- function(path) {
+  con <- file(path, "rb")
+  on.exit(close(con))
+  header_len <- readBin(con, "integer", n = 1, size = 4, endian = "little")
+  header <- fromJSON(rawToChar(readBin(con, "raw", n = header_len)), simplifyVector = FALSE)
+  nrow <- header$nrow
+  columns <- list()
+  for (col in header$columns) {
+    if (col$type == "double") {
+      values <- readBin(con, "double", n = nrow, size = 8, endian = "little")
+    } else {
+      values <- readBin(con, "integer", n = nrow, size = 4, endian = "little")
+      if (col$type == "logical") values <- as.logical(values)
+    }
+    columns[[col$name]] <- values
+  }
+  as.data.frame(columns, check.names = FALSE, stringsAsFactors = FALSE)
+}
+
+# Dados de entrada: binário (.bin) ou CSV
+read_input <- function(data_file) {
+  if (grepl("\\\\.bin$", data_file)) read_binary_frame(data_file) else read.csv(data_file)
+}
+
+# Opções dos gráficos: formato ("png" ou "svg"), resolução e processos paralelos
+default_plot_options <- function(plot_opts = list()) {
+  modifyList(list(format = "png", dpi = 150, workers = 1), plot_opts)
+}
+
+save_plot <- function(plot, output_dir, name, plot_opts) {
+  if (identical(plot_opts$format, "svg")) {
+    ggsave(file.path(output_dir, paste0(name, ".svg")), plot = plot,
+           device = grDevices::svg, width = 8, height = 6)
+  } else {
+    ggsave(file.path(output_dir, paste0(name, ".png")), plot = plot,
+           width = 8, height = 6, dpi = plot_opts$dpi)
+  }
+}
+
+# Número de processos para o mclapply (fork não existe no Windows)
+plot_workers <- function(plot_opts) {
+  if (.Platform$OS.type == "windows") return(1L)
+  workers <- suppressWarnings(as.integer(plot_opts$workers))
+  if (length(workers) == 0 || is.na(workers) || workers <= 0) {
+    workers <- parallel::detectCores()
+  }
+  max(1L, workers)
+}
+
+# Histograma e boxplot de uma variável
+render_variable_plots <- function(data, var, output_dir, plot_opts) {
+  p1 <- ggplot(data, aes_string(x = var)) +
+    geom_histogram(bins = 30, fill = "steelblue", alpha = 0.7) +
+    labs(title = paste("Histograma -", var),
+         x = var,
+         y = "Frequência") +
+    theme_minimal()
+  save_plot(p1, output_dir, paste0("histogram_", var), plot_opts)
+
+  p2 <- ggplot(data, aes_string(y = var)) +
+    geom_boxplot(fill = "lightblue", alpha = 0.7) +
+    labs(title = paste("Boxplot -", var),
+         y = var) +
+    theme_minimal()
+  save_plot(p2, output_dir, paste0("boxplot_", var), plot_opts)
+  var
+}
+
 # Função principal de análise
-analyze_water_data <- function(data_file, output_dir) {
+# compute_stats = FALSE gera apenas os gráficos (estatísticas calculadas em Python);
+# variables limita os gráficos às variáveis selecionadas (NULL = todas)
+analyze_water_data <- function(data_file, output_dir, compute_stats = TRUE,
+                               variables = NULL, plot_opts = list()) {
+  plot_opts <- default_plot_options(plot_opts)
+
   # Ler dados
-  data <- read.csv(data_file)
+  data <- read_input(data_file)
   
   # Criar diretório de saída
   dir.create(output_dir, recursive = TRUE, showWarnings = FALSE)
@@ -77,6 +233,7 @@ analyze_water_data <- function(data_file, output_dir) {
   numeric_vars <- names(data)[sapply(data, is.numeric)]
   
   results <- list()
+  plot_vars <- character(0)
   
   # Análises para cada variável numérica
   for (var in numeric_vars) {
@@ -88,32 +245,28 @@ analyze_water_data <- function(data_file, output_dir) {
     if (length(var_data) == 0) next
     
     # Calcular estatísticas
-    results[[var]] <- list(
-      tendencia_central = calc_central_tendency(var_data),
-      dispersao = calc_dispersion(var_data),
-      separatrizes = calc_separatrizes(var_data)
-    )
-    
-    # Criar histograma
-    p1 <- ggplot(data, aes_string(x = var)) +
-      geom_histogram(bins = 30, fill = "steelblue", alpha = 0.7) +
-      labs(title = paste("Histograma -", var),
-           x = var,
-           y = "Frequência") +
-      theme_minimal()
+    if (compute_stats) {
+      results[[var]] <- list(
+        tendencia_central = calc_central_tendency(var_data),
+        dispersao = calc_dispersion(var_data),
+        separatrizes = calc_separatrizes(var_data)
+      )
+    }
     
-    ggsave(file.path(output_dir, paste0("histogram_", var, ".png")), 
-           plot = p1, width = 8, height = 6, dpi = 300)
-    
-    # Criar boxplot
-    p2 <- ggplot(data, aes_string(y = var)) +
-      geom_boxplot(fill = "lightblue", alpha = 0.7) +
-      labs(title = paste("Boxplot -", var),
-           y = var) +
-      theme_minimal()
-    
-    ggsave(file.path(output_dir, paste0("boxplot_", var, ".png")), 
-           plot = p2, width = 8, height = 6, dpi = 300)
+    if (is.null(variables) || var %in% unlist(variables)) {
+      plot_vars <- c(plot_vars, var)
+    }
+  }
+  
+  # Gráficos das variáveis em paralelo (um processo filho por variável)
+  rendered <- parallel::mclapply(
+    plot_vars,
+    function(var) render_variable_plots(data, var, output_dir, plot_opts),
+    mc.cores = plot_workers(plot_opts)
+  )
+  failed <- Filter(function(r) inherits(r, "try-error"), rendered)
+  if (length(failed) > 0) {
+    stop(paste("Falha ao gerar gráficos:", conditionMessage(attr(failed[[1]], "condition"))))
   }
   
   # Gráfico de barras para potabilidade
@@ -134,91 +287,173 @@ analyze_water_data <- function(data_file, output_dir) {
       theme_minimal() +
       theme(legend.position = "none")
     
-    ggsave(file.path(output_dir, "barplot_potability.png"), 
-           plot = p3, width = 8, height = 6, dpi = 300)
+    save_plot(p3, output_dir, "barplot_potability", plot_opts)
   }
   
   # Salvar resultados estatísticos
-  write_json(results, file.path(output_dir, "statistics.json"), 
-             pretty = TRUE, auto_unbox = TRUE)
+  if (compute_stats) {
+    write_json(results, file.path(output_dir, "statistics.json"), 
+               pretty = TRUE, auto_unbox = TRUE)
+  }
   
   cat("Análise concluída. Resultados salvos em:", output_dir, "\n")
 }
 
+# Modo worker: bibliotecas carregadas uma vez, jobs JSON (um por linha) no stdin
+# e respostas "@@RWORKER@@ {...}" no stdout
+send_response <- function(response) {
+  cat("@@RWORKER@@ ", toJSON(response, auto_unbox = TRUE), "\n", sep = "")
+  flush(stdout())
+}
+
+run_worker <- function() {
+  con <- file("stdin", open = "r")
+  send_response(list(id = 0, status = "ready"))
+  repeat {
+    line <- readLines(con, n = 1, warn = FALSE)
+    if (length(line) == 0) break
+    if (!nzchar(line)) next
+
+    job <- fromJSON(line)
+    if (identical(job$type, "quit")) break
+
+    response <- tryCatch({
+      if (identical(job$type, "ping")) {
+        list(id = job$id, status = "ok", message = "pong")
+      } else if (identical(job$type, "analyze")) {
+        analyze_water_data(job$data_file, job$output_dir, compute_stats = !isFALSE(job$statistics),
+                           variables = job$variables,
+                           plot_opts = if (is.null(job$plot_options)) list() else job$plot_options)
+        list(id = job$id, status = "ok")
+      } else {
+        list(id = job$id, status = "error", message = paste("Tipo de job desconhecido:", job$type))
+      }
+    }, error = function(e) {
+      list(id = job$id, status = "error", message = conditionMessage(e))
+    })
+    send_response(response)
+  }
+  close(con)
+}
+
 # Executar análise se chamado diretamente
 args <- commandArgs(trailingOnly = TRUE)
-if (length(args) >= 2) {
-  analyze_water_data(args[1], args[2])
+if (length(args) >= 1 && args[1] == "--worker") {
+  run_worker()
+} else if (length(args) >= 2) {
+  # --options={"variables": [...], "plot_options": {...}} (JSON)
+  options_arg <- grep("^--options=", args, value = TRUE)
+  options <- if (length(options_arg) > 0) fromJSON(sub("^--options=", "", options_arg[1])) else list()
+  analyze_water_data(args[1], args[2], compute_stats = !("--plots-only" %in% args),
+                     variables = options$variables,
+                     plot_opts = if (is.null(options$plot_options)) list() else options$plot_options)
 }
 '''
         
+        # Resultados em cache valem apenas para esta versão do script
+        self._script_hash = hashlib.sha256(analysis_script.encode('utf-8')).hexdigest()
+
+        # Só regrava o arquivo se o conteúdo mudou
         script_file = self.r_script_path / "water_analysis.R"
+        try:
+            current_hash = hashlib.sha256(script_file.read_text(encoding='utf-8').encode('utf-8')).hexdigest()
+        except (OSError, UnicodeDecodeError):
+            current_hash = None
+        if current_hash == self._script_hash:
+            return
+
         with open(script_file, 'w', encoding='utf-8') as f:
             f.write(analysis_script)
         
         logger.info(f"Script R criado em: {script_file}")
     
-    def analyze_data(self, data: pd.DataFrame, analysis_type: str = "complete") -> Dict[str, Any]:
+    def analyze_data(self, data: pd.DataFrame, analysis_type: str = "complete",
+                     variables: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Executa análise estatística nos dados usando R.
+        Executa análise estatística nos dados.
+        
+        As estatísticas são calculadas em Python (native_stats, mesmo formato
+        do script R) e o R é usado apenas para os gráficos; sem R, o resultado
+        traz as estatísticas e um aviso no lugar dos gráficos. Na análise
+        'descriptive' o R não é chamado.
         
         Args:
             data: DataFrame com os dados para análise
             analysis_type: Tipo de análise ('complete', 'descriptive', 'graphics')
+            variables: Variáveis com gráficos (None = todas as numéricas)
         
         Returns:
             Dicionário com resultados da análise
         """
         try:
+            # Mesmos dados e parâmetros já analisados: resultado vem do cache, sem chamar o R
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = self.result_cache.make_key(data, {
+                    'analysis_type': analysis_type,
+                    'variables': None if variables is None else sorted(variables),
+                    'plots': self._plot_options(),
+                    'script': self._script_hash
+                })
+                cached = self.result_cache.load(cache_key)
+                if cached is not None:
+                    logger.info(f"Resultado da análise R obtido do cache ({cache_key})")
+                    return cached
+
+            statistics = describe_columns(data)
+            if analysis_type == "descriptive":
+                return {"success": True, "statistics": statistics, "graphics": {}, "r_output": ""}
+
             # Verificar se R está disponível
             if not self.check_r_availability():
-                return {"error": "R não está disponível no sistema"}
+                return {
+                    "success": True,
+                    "statistics": statistics,
+                    "graphics": {},
+                    "r_output": "",
+                    "warning": "R não está disponível no sistema: gráficos não gerados"
+                }
             
             # Criar arquivo temporário para os dados
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as temp_data:
-                data.to_csv(temp_data.name, index=False)
-                data_file = temp_data.name
+            transfer_config = self.config.get('transfer') or {}
+            data_file = create_transfer_file(
+                data,
+                binary=transfer_config.get('format', 'binary') != 'csv',
+                tmp_dir=transfer_config.get('tmp_dir')
+            )
             
             # Criar diretório temporário para resultados
             with tempfile.TemporaryDirectory() as temp_output:
-                # Executar script R
-                script_path = self.r_script_path / "water_analysis.R"
-                
-                # Usar o caminho do R descoberto
-                rscript_cmd = self.rscript_path
-                cmd = [rscript_cmd, str(script_path), data_file, temp_output]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60, encoding='utf-8')
-                
-                if result.returncode != 0:
-                    logger.error(f"Erro na execução do R: {result.stderr}")
-                    return {"error": f"Erro na execução do R: {result.stderr}"}
-                
-                # Ler resultados estatísticos
-                stats_file = os.path.join(temp_output, "statistics.json")
-                if os.path.exists(stats_file):
-                    with open(stats_file, 'r') as f:
-                        statistics = json.load(f)
-                else:
-                    statistics = {}
+                try:
+                    r_output = self._run_analysis(data_file, temp_output, variables)
+                except RWorkerTimeout:
+                    logger.error("Timeout na execução do R")
+                    return {"error": "Timeout na execução do script R"}
+                except RWorkerError as e:
+                    logger.error(f"Erro na execução do R: {e}")
+                    return {"error": f"Erro na execução do R: {e}"}
+                finally:
+                    # Limpar arquivo temporário (já lido pelo R)
+                    os.unlink(data_file)
                 
+                with open(os.path.join(temp_output, "statistics.json"), 'w', encoding='utf-8') as f:
+                    json.dump(statistics, f, indent=2)
+
+                if cache_key is not None:
+                    try:
+                        self.result_cache.store(cache_key, temp_output, r_output)
+                    except OSError as e:
+                        logger.warning(f"Não foi possível gravar o resultado R no cache: {e}")
+
                 # Ler gráficos
-                graphics = {}
-                for file in os.listdir(temp_output):
-                    if file.endswith('.png'):
-                        file_path = os.path.join(temp_output, file)
-                        with open(file_path, 'rb') as img_file:
-                            img_data = base64.b64encode(img_file.read()).decode()
-                            graphics[file.replace('.png', '')] = img_data
-                
-                # Limpar arquivo temporário
-                os.unlink(data_file)
+                graphics, graphics_format = read_graphics(graphic_files(temp_output))
                 
                 return {
                     "success": True,
                     "statistics": statistics,
                     "graphics": graphics,
-                    "r_output": result.stdout
+                    "graphics_format": graphics_format,
+                    "r_output": r_output
                 }
                 
         except subprocess.TimeoutExpired:
@@ -229,50 +464,33 @@ if (length(args) >= 2) {
             return {"error": f"Erro na análise: {str(e)}"}
     
     def check_r_availability(self, force_recheck: bool = False) -> bool:
-        """Verifica se R está disponível no sistema."""
+        """
+        Verifica se R está disponível no sistema.
+        
+        O caminho e a versão do Rscript ficam salvos em r_analysis.discovery.cache_file
+        e valem enquanto o executável tiver o mesmo mtime, sem iniciar processos;
+        force_recheck procura de novo, testando os candidatos em paralelo.
+        """
         
         # Se já verificamos e encontramos, não verificar novamente (a menos que forçado)
         if self._r_availability_checked and self.rscript_path and not force_recheck:
             return True
         
-        # Lista de possíveis localizações do Rscript no Windows
-        possible_paths = [
-            'Rscript',  # Se estiver no PATH
-            r'C:\Program Files\R\R-4.4.2\bin\Rscript.exe',
-            r'C:\Program Files\R\R-4.4.1\bin\Rscript.exe', 
-            r'C:\Program Files\R\R-4.4.0\bin\Rscript.exe',
-            r'C:\Program Files\R\R-4.3.3\bin\Rscript.exe',
-            r'C:\Program Files\R\R-4.3.2\bin\Rscript.exe',
-            r'C:\Program Files\R\R-4.3.1\bin\Rscript.exe',
-            r'C:\Program Files\R\R-4.3.0\bin\Rscript.exe',
-            r'C:\Program Files (x86)\R\R-4.4.2\bin\Rscript.exe',
-            r'C:\Program Files (x86)\R\R-4.4.1\bin\Rscript.exe',
-            r'C:\Program Files (x86)\R\R-4.4.0\bin\Rscript.exe',
-        ]
-        
-        # Tentar encontrar R automaticamente
-        import glob
-        r_program_files = glob.glob(r'C:\Program Files\R\R-*\bin\Rscript.exe')
-        r_program_files_x86 = glob.glob(r'C:\Program Files (x86)\R\R-*\bin\Rscript.exe')
-        possible_paths.extend(r_program_files)
-        possible_paths.extend(r_program_files_x86)
-        
-        for rscript_path in possible_paths:
-            try:
-                result = subprocess.run([rscript_path, '--version'], 
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    # Salvar o caminho encontrado para uso futuro
-                    self.rscript_path = rscript_path
-                    self._r_availability_checked = True
-                    logger.info(f"R encontrado em: {rscript_path}")
-                    return True
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
-                continue
-        
+        discovery_config = self.config.get('discovery') or {}
+        cache_file = Path(__file__).parent.parent.parent / discovery_config.get(
+            'cache_file', 'src/r_analysis/.rscript.json')
+        found = discover_rscript(cache_file, timeout=discovery_config.get('probe_timeout_seconds', 10),
+                                 force=force_recheck)
         self._r_availability_checked = True
-        logger.error("R não encontrado em nenhuma localização padrão")
-        return False
+        if found is None:
+            logger.error("R não encontrado em nenhuma localização padrão")
+            return False
+        
+        if found['path'] != self.rscript_path:
+            logger.info(f"R encontrado em: {found['path']} ({found['version']})")
+        self.rscript_path = found['path']
+        self.r_version = found['version']
+        return True
     
     def install_required_packages(self) -> bool:
         """Instala pacotes R necessários."""
@@ -305,4 +523,5 @@ if (length(args) >= 2) {
     def _reset_r_detection(self):
         """Força nova detecção do R (útil para problemas de cache)."""
         self.rscript_path = None
+        self.r_version = None
         self._r_availability_checked = False 
\ No newline at end of file
@@ -0,0 +1,145 @@
+####################################
+##### Arquivo: r_discovery.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Localização do Rscript com resultado persistido em disco.
+
+O caminho encontrado e a versão do R ficam em um arquivo JSON junto com o
+mtime do executável; enquanto o executável existir com o mesmo mtime, o
+resultado é reaproveitado sem iniciar nenhum processo. Quando é preciso
+procurar de novo, só são testados os candidatos que existem no disco, todos
+ao mesmo tempo, e vence o primeiro da ordem de preferência.
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Instalações conhecidas, em ordem de preferência (depois do Rscript do PATH)
+KNOWN_RSCRIPT_PATHS = [
+    r'C:\Program Files\R\R-4.4.2\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.4.1\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.4.0\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.3.3\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.3.2\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.3.1\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.3.0\bin\Rscript.exe',
+    r'C:\Program Files (x86)\R\R-4.4.2\bin\Rscript.exe',
+    r'C:\Program Files (x86)\R\R-4.4.1\bin\Rscript.exe',
+    r'C:\Program Files (x86)\R\R-4.4.0\bin\Rscript.exe',
+    '/usr/bin/Rscript',
+    '/usr/local/bin/Rscript',
+    '/opt/homebrew/bin/Rscript',
+]
+RSCRIPT_GLOBS = [
+    r'C:\Program Files\R\R-*\bin\Rscript.exe',
+    r'C:\Program Files (x86)\R\R-*\bin\Rscript.exe',
+]
+
+
+def candidate_paths() -> List[str]:
+    """Executáveis Rscript existentes, sem repetição, em ordem de preferência."""
+    candidates = []
+    in_path = shutil.which('Rscript')
+    if in_path:
+        candidates.append(in_path)
+    candidates.extend(path for path in KNOWN_RSCRIPT_PATHS if os.path.isfile(path))
+    for pattern in RSCRIPT_GLOBS:
+        candidates.extend(sorted(glob.glob(pattern), reverse=True))
+
+    unique, seen = [], set()
+    for path in candidates:
+        key = os.path.normcase(os.path.realpath(path))
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def probe_rscript(path: str, timeout: float = 10.0) -> Optional[str]:
+    """Versão informada por ``Rscript --version``, ou None se o executável não funcionar."""
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=timeout)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    # Versões antigas do R escrevem a versão no stderr
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else ''
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_cached_rscript(cache_file) -> Optional[Dict[str, Any]]:
+    """Resultado salvo, se o executável ainda existir com o mesmo mtime."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = cached.get('path')
+    if not path or _mtime_ns(path) != cached.get('mtime_ns'):
+        return None
+    return cached
+
+
+def discover_rscript(cache_file, timeout: float = 10.0, force: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Localiza o Rscript, usando o arquivo de cache quando ainda for válido.
+
+    Args:
+        cache_file: Arquivo JSON com o último resultado
+        timeout: Tempo limite de cada ``Rscript --version``
+        force: Ignora o cache e procura de novo
+
+    Returns:
+        {'path', 'version', 'mtime_ns', 'checked'} ou None se o R não for encontrado
+    """
+    if not force:
+        cached = load_cached_rscript(cache_file)
+        if cached is not None:
+            return cached
+
+    candidates = candidate_paths()
+    if not candidates:
+        return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as executor:
+        versions = list(executor.map(lambda path: probe_rscript(path, timeout), candidates))
+
+    for path, version in zip(candidates, versions):
+        if version is None:
+            continue
+        found = {'path': path, 'version': version, 'mtime_ns': _mtime_ns(path), 'checked': time.time()}
+        logger.info(f"Rscript testado em {len(candidates)} locais em {time.perf_counter() - start:.1f}s")
+        try:
+            Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = Path(f"{cache_file}.tmp-{os.getpid()}")
+            tmp_file.write_text(json.dumps(found), encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar a localização do R: {e}")
+        return found
+    return None
@@ -0,0 +1,235 @@
+####################################
+##### Arquivo: r_worker.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Processo R de longa duração para as análises estatísticas.
+
+Iniciar o ``Rscript`` e carregar ggplot2/dplyr/jsonlite leva alguns segundos; o
+worker faz isso uma única vez e depois atende jobs pela entrada/saída padrão:
+
+- requisição: uma linha JSON ``{"id": 1, "type": "analyze", ...}`` no stdin;
+- resposta: uma linha ``@@RWORKER@@ {"id": 1, "status": "ok"|"error", ...}``
+  no stdout (as demais linhas do stdout são a saída do job);
+- ao iniciar, o worker responde ``{"id": 0, "status": "ready"}``.
+
+Se o processo morrer ele é reiniciado no job seguinte; jobs que passam do
+tempo limite derrubam o processo (o R não pode ser interrompido com segurança
+no meio de um job) e também levam a um reinício. Antes de um job, se o worker
+ficou ocioso por mais que ``health_check_interval``, é enviado um ``ping``.
+"""
+
+import atexit
+import json
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROTOCOL_PREFIX = '@@RWORKER@@ '
+
+
+class RWorkerError(RuntimeError):
+    """Falha do worker R (processo encerrado, erro no job ou protocolo inválido)."""
+
+
+class RWorkerTimeout(RWorkerError):
+    """Job ou inicialização excederam o tempo limite."""
+
+
+class RWorker:
+    """Cliente de um processo R persistente que executa um job por vez."""
+
+    def __init__(self, command: Sequence[str], startup_timeout: float = 30.0, job_timeout: float = 60.0,
+                 health_check_interval: float = 30.0):
+        self.command = list(command)
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.health_check_interval = health_check_interval
+        self.restarts = 0
+
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: Optional[queue.Queue] = None
+        self._stderr = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._last_ok = 0.0
+        self._started = False
+
+    # ------------------------------------------------------------------
+    # Processo
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: queue.Queue):
+        """Separa respostas do protocolo e saída comum; None sinaliza fim do processo."""
+        for line in process.stdout:
+            if line.startswith(PROTOCOL_PREFIX):
+                try:
+                    responses.put(json.loads(line[len(PROTOCOL_PREFIX):]))
+                    continue
+                except ValueError:
+                    pass
+            responses.put({'output': line.rstrip('\n')})
+        responses.put(None)
+
+    def _read_stderr(self, process: subprocess.Popen):
+        # Drenado continuamente para o pipe não encher e travar o R
+        for line in process.stderr:
+            self._stderr.append(line.rstrip('\n'))
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self):
+        logger.info(f"Iniciando worker R: {' '.join(self.command)}")
+        self._stderr.clear()
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, encoding='utf-8', bufsize=1
+            )
+        except OSError as e:
+            raise RWorkerError(f"Não foi possível iniciar o worker R: {e}")
+        # Fila por processo: leitores de um processo antigo não alimentam o novo
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(self._process, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+        start = time.perf_counter()
+        self._wait_for(0, self.startup_timeout)
+        self._last_ok = time.monotonic()
+        logger.info(f"Worker R pronto em {time.perf_counter() - start:.1f}s")
+
+    def _kill(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+        self._process = None
+
+    def _ensure_running(self):
+        """Inicia o worker (ou reinicia, se morreu ou não responde ao ping)."""
+        if self.is_alive() and time.monotonic() - self._last_ok > self.health_check_interval:
+            try:
+                self._request('ping', min(self.job_timeout, 10.0))
+            except RWorkerError as e:
+                logger.warning(f"Worker R não respondeu ao ping: {e}")
+                self._kill()
+
+        if not self.is_alive():
+            if self._started:
+                self.restarts += 1
+                logger.warning("Worker R encerrado; reiniciando")
+            self._started = True
+            self._start()
+
+    # ------------------------------------------------------------------
+    # Protocolo
+    # ------------------------------------------------------------------
+
+    def _wait_for(self, job_id: int, timeout: float) -> Tuple[Dict[str, Any], List[str]]:
+        """Aguarda a resposta do job, acumulando a saída comum até ela."""
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                message = self._responses.get(timeout=max(remaining, 0.0))
+            except queue.Empty:
+                self._kill()
+                raise RWorkerTimeout(f"Worker R não respondeu em {timeout:.0f}s")
+
+            if message is None:
+                stderr = '\n'.join(self._stderr)
+                self._kill()
+                raise RWorkerError(f"Worker R encerrou inesperadamente: {stderr}")
+            if 'output' in message:
+                output.append(message['output'])
+            elif message.get('id') == job_id:
+                return message, output
+
+    def _request(self, job_type: str, timeout: float, **params) -> Dict[str, Any]:
+        job_id = self._next_id
+        self._next_id += 1
+        try:
+            self._process.stdin.write(json.dumps({'id': job_id, 'type': job_type, **params}) + '\n')
+            self._process.stdin.flush()
+        except OSError as e:
+            self._kill()
+            raise RWorkerError(f"Falha ao enviar job ao worker R: {e}")
+
+        response, output = self._wait_for(job_id, timeout)
+        self._last_ok = time.monotonic()
+        if response.get('status') != 'ok':
+            raise RWorkerError(response.get('message') or 'Erro desconhecido no worker R')
+        return {**response, 'output': '\n'.join(output)}
+
+    def submit(self, job_type: str, timeout: Optional[float] = None, **params) -> Dict[str, Any]:
+        """
+        Executa um job no worker (iniciando-o se necessário) e retorna a resposta.
+
+        Raises:
+            RWorkerTimeout: se o job passar de `timeout` (padrão: job_timeout)
+            RWorkerError: se o job falhar ou o processo encerrar
+        """
+        with self._lock:
+            self._ensure_running()
+            return self._request(job_type, timeout or self.job_timeout, **params)
+
+    def ping(self) -> bool:
+        """Verifica (e, se preciso, reinicia) o worker; False se não conseguir."""
+        try:
+            self.submit('ping', timeout=min(self.job_timeout, 10.0))
+            return True
+        except RWorkerError as e:
+            logger.error(f"Worker R indisponível: {e}")
+            return False
+
+    def stop(self):
+        """Encerra o worker (pedido de saída e, se necessário, kill)."""
+        with self._lock:
+            if self.is_alive():
+                try:
+                    self._process.stdin.write(json.dumps({'id': 0, 'type': 'quit'}) + '\n')
+                    self._process.stdin.flush()
+                    self._process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+
+
+# Workers compartilhados pelo processo (ex.: reexecuções do Streamlit)
+_workers: Dict[Tuple[str, ...], RWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_r_worker(command: Sequence[str], **kwargs) -> RWorker:
+    """Retorna o worker singleton para o comando (criado na primeira chamada)."""
+    key = tuple(str(part) for part in command)
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            worker = _workers[key] = RWorker(key, **kwargs)
+        return worker
+
+
+@atexit.register
+def shutdown_workers():
+    """Encerra todos os workers ao sair do processo."""
+    with _workers_lock:
+        for worker in _workers.values():
+            worker.stop()
+        _workers.clear()
@@ -0,0 +1,151 @@
+####################################
+##### Arquivo: result_cache.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Cache em disco dos resultados das análises em R, endereçado pelo conteúdo.
+
+A chave é o hash dos dados (valores, colunas e tipos), dos parâmetros da
+análise e do script R; cada entrada guarda o statistics.json, os gráficos e a
+saída do R. O último acesso é marcado no mtime do meta.json e, quando o total
+passa de ``max_bytes``, as entradas menos usadas recentemente são removidas.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Formatos de gráfico gerados pelo R
+GRAPHIC_EXTENSIONS = ('.png', '.svg')
+
+
+def graphic_files(directory) -> List[Path]:
+    """Arquivos de gráfico (PNG/SVG) do diretório, em ordem de nome."""
+    return sorted(path for path in Path(directory).iterdir() if path.suffix in GRAPHIC_EXTENSIONS)
+
+
+def read_graphics(files) -> Tuple[Dict[str, str], str]:
+    """({nome sem extensão: conteúdo em base64}, formato) dos arquivos de gráfico."""
+    graphics = {}
+    graphics_format = 'png'
+    for path in files:
+        path = Path(path)
+        with open(path, 'rb') as img_file:
+            graphics[path.stem] = base64.b64encode(img_file.read()).decode()
+        graphics_format = path.suffix.lstrip('.')
+    return graphics, graphics_format
+
+
+def dataframe_digest(df: pd.DataFrame) -> str:
+    """SHA-256 dos valores, nomes e tipos das colunas do DataFrame."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class RResultCache:
+    """Cache LRU por tamanho dos resultados de RAnalyzer.analyze_data."""
+
+    def __init__(self, cache_dir, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def make_key(self, df: pd.DataFrame, params: Dict[str, Any]) -> str:
+        """Chave da entrada: conteúdo dos dados + parâmetros da análise (incluindo o script)."""
+        payload = json.dumps({'data': dataframe_digest(df), 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Resultado no formato de analyze_data, ou None se não houver entrada."""
+        entry_dir = self.cache_dir / key
+        meta_path = entry_dir / 'meta.json'
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(entry_dir / 'statistics.json', 'r', encoding='utf-8') as f:
+                statistics = json.load(f)
+            # Entradas antigas guardam só o nome (sempre PNG)
+            graphics, graphics_format = read_graphics(
+                entry_dir / (name if Path(name).suffix else f"{name}.png") for name in meta['graphics'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Entrada de cache R inválida ({key}): {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        # Marca o acesso para a ordem LRU
+        os.utime(meta_path)
+        return {
+            "success": True,
+            "statistics": statistics,
+            "graphics": graphics,
+            "graphics_format": graphics_format,
+            "r_output": meta.get('r_output', ''),
+            "cached": True
+        }
+
+    def store(self, key: str, output_dir, r_output: str = ''):
+        """Copia statistics.json e os gráficos gerados pelo R para a entrada e aplica o limite de tamanho."""
+        output_dir = Path(output_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry_dir = self.cache_dir / key
+        # Nome único por thread: os jobs em segundo plano podem gravar a mesma chave
+        tmp_dir = self.cache_dir / f"{key}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        stats_file = output_dir / 'statistics.json'
+        if stats_file.exists():
+            shutil.copyfile(stats_file, tmp_dir / 'statistics.json')
+        else:
+            (tmp_dir / 'statistics.json').write_text('{}', encoding='utf-8')
+
+        graphics = []
+        for graphic in graphic_files(output_dir):
+            shutil.copyfile(graphic, tmp_dir / graphic.name)
+            graphics.append(graphic.name)
+
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'graphics': graphics, 'r_output': r_output, 'created': time.time()}, f)
+
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+        self.evict()
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até o total caber em max_bytes."""
+        entries = []
+        total = 0
+        for entry_dir in self.cache_dir.iterdir():
+            meta_path = entry_dir / 'meta.json'
+            if not entry_dir.is_dir() or '.tmp-' in entry_dir.name or not meta_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            entries.append((meta_path.stat().st_mtime, size, entry_dir))
+            total += size
+
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            logger.info(f"Resultado R removido do cache: {entry_dir.name}")
@@ -9,20 +9,24 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import sys
 import os
 from pathlib import Path
 import numpy as np
 import base64
+import time
+import uuid
 from io import BytesIO
 
 # Adicionar o diretório src ao path para importações
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from src.api.controller import get_controller
+from src.processing import FeatureCache, WaterDataProcessor
 from src.utils.logging import setup_logging, get_logger
-from src.r_analysis import RAnalyzer
+from src.r_analysis import RAnalyzer, RJobQueueFull, get_job_manager
+from src.r_analysis.job_manager import JOB_QUEUED, JOB_RUNNING
 
 # Configurar logging
 setup_logging()
@@ -102,6 +106,19 @@ def get_recent_alerts():
         return []
 
 
+@st.cache_data
+def load_dataset(dataset_path: str, mtime_ns: int) -> pd.DataFrame:
+    """Lê o CSV uma vez por versão do arquivo (mtime_ns entra na chave do cache)."""
+    return pd.read_csv(dataset_path)
+
+
+@st.cache_data
+def get_dataset_summary(dataset_path: str, mtime_ns: int) -> dict:
+    """Estatísticas do CSV, lidas do cache de features em disco quando o arquivo não mudou."""
+    features = FeatureCache().get_or_build(dataset_path, WaterDataProcessor())
+    return features.raw_summary
+
+
 def main():
     st.title("💧 Sistema de Monitoramento de Qualidade da Água")
     st.markdown("**Monitoramento em tempo real da potabilidade da água usando IoT e Machine Learning**")
@@ -276,6 +293,9 @@ def show_detailed_analysis():
                 st.markdown(f"- Potável: {prob_potable:.1f}%")
                 st.markdown(f"- Não Potável: {prob_not_potable:.1f}%")
 
+                if evaluation.get('model_version'):
+                    st.caption(f"Versão do modelo: {evaluation['model_version']}")
+
             with col2:
                 # Nível de risco
                 risk_level = evaluation['risk_level']
@@ -499,7 +519,9 @@ def show_dataset():
             st.error("❌ Dataset não encontrado!")
             return
 
-        df = pd.read_csv(dataset_path)
+        mtime_ns = dataset_path.stat().st_mtime_ns
+        df = load_dataset(str(dataset_path), mtime_ns)
+        summary = get_dataset_summary(str(dataset_path), mtime_ns)
 
         # Informações básicas
         st.subheader("ℹ️ Informações Básicas")
@@ -507,14 +529,14 @@ def show_dataset():
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total de Registros", len(df))
+            st.metric("Total de Registros", summary['total_records'])
 
         with col2:
-            missing_values = df.isnull().sum().sum()
+            missing_values = summary['missing_values']
             st.metric("Valores Ausentes", missing_values)
 
         with col3:
-            potable_count = df['Potability'].sum()
+            potable_count = summary['potable_count']
             st.metric("Água Potável", potable_count)
 
         with col4:
@@ -559,15 +581,16 @@ def show_dataset():
 
         stats_data = []
         for col in feature_columns:
-            if col in df.columns:
+            stats = summary['feature_stats'].get(col)
+            if stats:
                 stats_data.append({
                     'Feature': col,
-                    'Média': f"{df[col].mean():.2f}",
-                    'Mediana': f"{df[col].median():.2f}",
-                    'Desvio Padrão': f"{df[col].std():.2f}",
-                    'Mínimo': f"{df[col].min():.2f}",
-                    'Máximo': f"{df[col].max():.2f}",
-                    'Valores Ausentes': df[col].isnull().sum()
+                    'Média': f"{stats['mean']:.2f}",
+                    'Mediana': f"{stats['median']:.2f}",
+                    'Desvio Padrão': f"{stats['std']:.2f}",
+                    'Mínimo': f"{stats['min']:.2f}",
+                    'Máximo': f"{stats['max']:.2f}",
+                    'Valores Ausentes': stats['missing']
                 })
 
         stats_df = pd.DataFrame(stats_data)
@@ -634,42 +657,34 @@ def show_dataset():
         # Performance do modelo
         st.subheader("🎯 Performance do Modelo")
 
-        # Verificar se existe modelo treinado
-        model_path = Path(__file__).parent.parent.parent / "src/model/water_quality_model.pkl"
-
-        if model_path.exists():
-            try:
-                import joblib
-                model_data = joblib.load(model_path)
-
-                if 'model' in model_data and hasattr(model_data['model'], 'feature_importances_'):
-                    # Importância das features
-                    feature_importance = model_data['model'].feature_importances_
-                    feature_names = feature_columns
-
-                    importance_df = pd.DataFrame({
-                        'Feature': feature_names,
-                        'Importância': feature_importance
-                    }).sort_values('Importância', ascending=True)
-
-                    fig_importance = px.bar(
-                        importance_df,
-                        x='Importância',
-                        y='Feature',
-                        orientation='h',
-                        title='Importância das Features no Modelo Random Forest',
-                        color='Importância',
-                        color_continuous_scale='viridis'
-                    )
-                    st.plotly_chart(fig_importance, use_container_width=True)
+        # Importância das features a partir do modelo já carregado pelo preditor
+        try:
+            feature_importance = get_controller().predictor.get_feature_importance()
+
+            if feature_importance:
+                importance_df = pd.DataFrame({
+                    'Feature': list(feature_importance.keys()),
+                    'Importância': list(feature_importance.values())
+                }).sort_values('Importância', ascending=True)
+
+                fig_importance = px.bar(
+                    importance_df,
+                    x='Importância',
+                    y='Feature',
+                    orientation='h',
+                    title='Importância das Features no Modelo Random Forest',
+                    color='Importância',
+                    color_continuous_scale='viridis'
+                )
+                st.plotly_chart(fig_importance, use_container_width=True)
 
-                else:
-                    st.warning("⚠️ Informações de importância não disponíveis no modelo")
+            else:
+                st.warning("⚠️ Informações de importância não disponíveis no modelo")
 
-            except Exception as e:
-                st.error(f"❌ Erro ao carregar modelo: {e}")
-        else:
+        except FileNotFoundError:
             st.warning("⚠️ Modelo não encontrado. Execute `python train_model.py` primeiro.")
+        except Exception as e:
+            st.error(f"❌ Erro ao carregar modelo: {e}")
 
         # Amostra dos dados
         st.subheader("🔍 Amostra dos Dados")
@@ -702,6 +717,49 @@ def show_dataset():
         logger.error(f"Erro no show_dataset: {e}")
 
 
+def r_graphic_image(results: dict, name: str):
+    """Gráfico do resultado da análise R pronto para st.image (bytes do PNG ou texto do SVG)."""
+    data = base64.b64decode(results["graphics"][name])
+    return data.decode("utf-8") if results.get("graphics_format") == "svg" else data
+
+
+def submit_r_job(job_key: str, analysis_df: pd.DataFrame, **params):
+    """Envia a análise R para a fila em segundo plano e guarda o id do job na sessão."""
+    session_id = st.session_state.setdefault("r_session_id", uuid.uuid4().hex)
+    try:
+        st.session_state[job_key] = get_job_manager().submit(analysis_df, session_id, **params)
+    except RJobQueueFull as e:
+        st.warning(f"⚠️ {e}")
+
+
+def poll_r_job(job_key: str):
+    """
+    Acompanha o job R da sessão: enquanto ele não termina, mostra o estado e recarrega
+    a página a cada poll_interval; retorna (job, resultado) quando concluído, ou None.
+    """
+    job_id = st.session_state.get(job_key)
+    if job_id is None:
+        return None
+
+    manager = get_job_manager()
+    job = manager.status(job_id)
+    if job is None:
+        del st.session_state[job_key]
+        st.warning("⚠️ A análise anterior expirou; execute novamente.")
+        return None
+
+    if job["status"] == JOB_QUEUED:
+        position = manager.queue_position(job_id)
+        st.info(f"⏳ Análise na fila{f' (posição {position})' if position else ''}...")
+    elif job["status"] == JOB_RUNNING:
+        st.info(f"⏳ Executando análises estatísticas em R... ({time.time() - job['started']:.0f}s)")
+    if job["status"] in (JOB_QUEUED, JOB_RUNNING):
+        time.sleep(manager.poll_interval)
+        st.rerun()
+
+    return job, manager.result(job_id)
+
+
 def show_r_analysis():
     """Exibe página de análise estatística em R."""
     st.header("📊 Análise Estatística em R")
@@ -729,6 +787,7 @@ def show_r_analysis():
         show_preloaded_data_analysis()
     else:
         show_realtime_data_analysis()
+        show_history_statistics()
 
 
 def show_preloaded_data_analysis():
@@ -760,7 +819,7 @@ Working Dir: {os.getcwd()}
         with col2:
             st.markdown("**Detecção do R:**")
             if r_available:
-                st.success(f"✅ R encontrado em: {r_analyzer.rscript_path}")
+                st.success(f"✅ R encontrado em: {r_analyzer.rscript_path} ({r_analyzer.r_version})")
             else:
                 st.error("❌ R não encontrado")
                 
@@ -770,13 +829,13 @@ Working Dir: {os.getcwd()}
                 r_analyzer = RAnalyzer()  # Nova instância
                 r_available = r_analyzer.check_r_availability(force_recheck=True)
                 if r_available:
-                    st.success(f"✅ R encontrado após nova detecção: {r_analyzer.rscript_path}")
+                    st.success(f"✅ R encontrado após nova detecção: {r_analyzer.rscript_path} ({r_analyzer.r_version})")
                     st.rerun()
                 else:
                     st.error("❌ R ainda não foi encontrado")
     
     if not r_available:
-        return
+        st.warning("⚠️ R não encontrado: as estatísticas são calculadas em Python, mas os gráficos não serão gerados.")
     
     # Carregar dataset
     try:
@@ -841,114 +900,175 @@ Working Dir: {os.getcwd()}
             analysis_df = df[selected_vars + ['Potability']].copy()
             analysis_df = analysis_df.rename(columns={'Potability': 'potability'})
             
-            with st.spinner("⏳ Executando análises estatísticas em R..."):
+            # Gráficos só das variáveis selecionadas e só se pedidos (sem gráficos o R não é chamado)
+            submit_r_job(
+                "r_job_preloaded",
+                analysis_df,
+                analysis_type=("complete" if "Gráficos (Histograma, Boxplot)" in analysis_types
+                               else "descriptive"),
+                variables=selected_vars
+            )
+        
+        # Análise roda em segundo plano: acompanha o job e exibe o resultado quando terminar
+        finished = poll_r_job("r_job_preloaded")
+        if finished is not None:
+            job, results = finished
+            try:
+                if "error" in results:
+                    st.error(f"❌ Erro na análise: {results['error']}")
+                    return
+                
+                st.success("✅ Análises concluídas com sucesso!")
+                if "warning" in results:
+                    st.warning(f"⚠️ {results['warning']}")
                 
-                try:
-                    # Executar análise R
-                    results = r_analyzer.analyze_data(analysis_df)
+                # Exibir resultados estatísticos
+                if "statistics" in results and results["statistics"]:
+                    st.subheader("📊 Resultados Estatísticos")
                     
-                    if "error" in results:
-                        st.error(f"❌ Erro na análise: {results['error']}")
-                        return
+                    for var, stats in results["statistics"].items():
+                        st.markdown(f"### 📈 {var.title()}")
+                        
+                        col1, col2, col3 = st.columns(3)
+                        
+                        # Tendência central
+                        if "tendencia_central" in stats:
+                            with col1:
+                                st.markdown("**Tendência Central**")
+                                tc = stats["tendencia_central"]
+                                st.metric("Média", f"{tc.get('media', 0):.4f}")
+                                st.metric("Mediana", f"{tc.get('mediana', 0):.4f}")
+                                st.metric("Moda", f"{tc.get('moda', 0):.4f}")
+                        
+                        # Dispersão
+                        if "dispersao" in stats:
+                            with col2:
+                                st.markdown("**Dispersão**")
+                                disp = stats["dispersao"]
+                                st.metric("Variância", f"{disp.get('variancia', 0):.4f}")
+                                st.metric("Desvio Padrão", f"{disp.get('desvio_padrao', 0):.4f}")
+                                st.metric("Amplitude", f"{disp.get('amplitude', 0):.4f}")
+                                st.metric("IQR", f"{disp.get('iqr', 0):.4f}")
+                        
+                        # Separatrizes
+                        if "separatrizes" in stats:
+                            with col3:
+                                st.markdown("**Separatrizes**")
+                                sep = stats["separatrizes"]
+                                
+                                if "quartis" in sep:
+                                    quartis = sep["quartis"]
+                                    # quartis vem como lista [Q1, Q2, Q3] do R
+                                    if isinstance(quartis, list) and len(quartis) >= 3:
+                                        st.metric("Q1", f"{quartis[0]:.4f}")
+                                        st.metric("Q2 (Mediana)", f"{quartis[1]:.4f}")
+                                        st.metric("Q3", f"{quartis[2]:.4f}")
+                                    elif isinstance(quartis, dict):
+                                        # Fallback para formato de dicionário
+                                        st.metric("Q1", f"{quartis.get('25%', 0):.4f}")
+                                        st.metric("Q2 (Mediana)", f"{quartis.get('50%', 0):.4f}")
+                                        st.metric("Q3", f"{quartis.get('75%', 0):.4f}")
+                        
+                        st.divider()
+                
+                # Exibir gráficos
+                if "graphics" in results and results["graphics"]:
+                    st.subheader("📊 Visualizações")
                     
-                    st.success("✅ Análises concluídas com sucesso!")
+                    # Organizar gráficos em colunas
+                    graphics = results["graphics"]
                     
-                    # Exibir resultados estatísticos
-                    if "statistics" in results and results["statistics"]:
-                        st.subheader("📊 Resultados Estatísticos")
+                    # Gráficos de barras para potabilidade
+                    if "barplot_potability" in graphics:
+                        st.markdown("### 📊 Distribuição de Potabilidade")
+                        st.image(r_graphic_image(results, "barplot_potability"), use_container_width=True)
+                        st.divider()
+                    
+                    # Histogramas e boxplots
+                    for var in selected_vars:
+                        hist_key = f"histogram_{var}"
+                        box_key = f"boxplot_{var}"
                         
-                        for var, stats in results["statistics"].items():
+                        if hist_key in graphics or box_key in graphics:
                             st.markdown(f"### 📈 {var.title()}")
                             
-                            col1, col2, col3 = st.columns(3)
+                            col1, col2 = st.columns(2)
                             
-                            # Tendência central
-                            if "tendencia_central" in stats:
+                            if hist_key in graphics:
                                 with col1:
-                                    st.markdown("**Tendência Central**")
-                                    tc = stats["tendencia_central"]
-                                    st.metric("Média", f"{tc.get('media', 0):.4f}")
-                                    st.metric("Mediana", f"{tc.get('mediana', 0):.4f}")
-                                    st.metric("Moda", f"{tc.get('moda', 0):.4f}")
+                                    st.markdown("**Histograma**")
+                                    st.image(r_graphic_image(results, hist_key), use_container_width=True)
                             
-                            # Dispersão
-                            if "dispersao" in stats:
+                            if box_key in graphics:
                                 with col2:
-                                    st.markdown("**Dispersão**")
-                                    disp = stats["dispersao"]
-                                    st.metric("Variância", f"{disp.get('variancia', 0):.4f}")
-                                    st.metric("Desvio Padrão", f"{disp.get('desvio_padrao', 0):.4f}")
-                                    st.metric("Amplitude", f"{disp.get('amplitude', 0):.4f}")
-                                    st.metric("IQR", f"{disp.get('iqr', 0):.4f}")
-                            
-                            # Separatrizes
-                            if "separatrizes" in stats:
-                                with col3:
-                                    st.markdown("**Separatrizes**")
-                                    sep = stats["separatrizes"]
-                                    
-                                    if "quartis" in sep:
-                                        quartis = sep["quartis"]
-                                        # quartis vem como lista [Q1, Q2, Q3] do R
-                                        if isinstance(quartis, list) and len(quartis) >= 3:
-                                            st.metric("Q1", f"{quartis[0]:.4f}")
-                                            st.metric("Q2 (Mediana)", f"{quartis[1]:.4f}")
-                                            st.metric("Q3", f"{quartis[2]:.4f}")
-                                        elif isinstance(quartis, dict):
-                                            # Fallback para formato de dicionário
-                                            st.metric("Q1", f"{quartis.get('25%', 0):.4f}")
-                                            st.metric("Q2 (Mediana)", f"{quartis.get('50%', 0):.4f}")
-                                            st.metric("Q3", f"{quartis.get('75%', 0):.4f}")
+                                    st.markdown("**Boxplot**")
+                                    st.image(r_graphic_image(results, box_key), use_container_width=True)
                             
                             st.divider()
-                    
-                    # Exibir gráficos
-                    if "graphics" in results and results["graphics"]:
-                        st.subheader("📊 Visualizações")
-                        
-                        # Organizar gráficos em colunas
-                        graphics = results["graphics"]
-                        
-                        # Gráficos de barras para potabilidade
-                        if "barplot_potability" in graphics:
-                            st.markdown("### 📊 Distribuição de Potabilidade")
-                            img_data = base64.b64decode(graphics["barplot_potability"])
-                            st.image(img_data, use_container_width=True)
-                            st.divider()
-                        
-                        # Histogramas e boxplots
-                        for var in selected_vars:
-                            hist_key = f"histogram_{var}"
-                            box_key = f"boxplot_{var}"
-                            
-                            if hist_key in graphics or box_key in graphics:
-                                st.markdown(f"### 📈 {var.title()}")
-                                
-                                col1, col2 = st.columns(2)
-                                
-                                if hist_key in graphics:
-                                    with col1:
-                                        st.markdown("**Histograma**")
-                                        img_data = base64.b64decode(graphics[hist_key])
-                                        st.image(img_data, use_container_width=True)
-                                
-                                if box_key in graphics:
-                                    with col2:
-                                        st.markdown("**Boxplot**")
-                                        img_data = base64.b64decode(graphics[box_key])
-                                        st.image(img_data, use_container_width=True)
-                                
-                                st.divider()
-                
-                except Exception as e:
-                    st.error(f"❌ Erro durante a análise: {str(e)}")
-                    logger.error(f"Erro na análise R: {str(e)}")
+            
+            except Exception as e:
+                st.error(f"❌ Erro durante a análise: {str(e)}")
+                logger.error(f"Erro na análise R: {str(e)}")
     
     except Exception as e:
         st.error(f"❌ Erro ao carregar dataset: {str(e)}")
         logger.error(f"Erro ao carregar dataset: {str(e)}")
 
 
+def show_history_statistics():
+    """Exibe estatísticas de todo o histórico de leituras a partir dos sketches por hora."""
+    st.divider()
+    st.subheader("🗄️ Histórico Completo")
+    st.caption("Estatísticas aproximadas (quantis por t-digest, moda por valores frequentes) mantidas a "
+               "cada leitura recebida, sem exportar a tabela de leituras.")
+    
+    controller = get_controller()
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Início", value=date.today() - timedelta(days=30), key="history_start")
+    with col2:
+        end_date = st.date_input("Fim", value=date.today(), key="history_end")
+    
+    statistics = controller.get_history_statistics(
+        datetime.combine(start_date, datetime.min.time()),
+        datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    )
+    
+    if not statistics:
+        st.info("📭 Nenhuma leitura resumida no período.")
+    else:
+        summary = pd.DataFrame({
+            var: {
+                "Leituras": stats["contagem"],
+                "Média": stats["tendencia_central"]["media"],
+                "Mediana": stats["tendencia_central"]["mediana"],
+                "Moda": stats["tendencia_central"]["moda"],
+                "Desvio Padrão": stats["dispersao"]["desvio_padrao"],
+                "Amplitude": stats["dispersao"]["amplitude"],
+                "IQR": stats["dispersao"]["iqr"],
+                "Q1": stats["separatrizes"]["quartis"][0],
+                "Q3": stats["separatrizes"]["quartis"][2]
+            }
+            for var, stats in statistics.items()
+        }).T
+        st.dataframe(summary, use_container_width=True)
+        
+        deciles = pd.DataFrame(
+            {var: stats["separatrizes"]["decis"] for var, stats in statistics.items()},
+            index=[f"D{i}" for i in range(1, 10)]
+        )
+        with st.expander("📐 Decis"):
+            st.dataframe(deciles, use_container_width=True)
+    
+    if st.button("🔄 Reconstruir a partir do banco de dados"):
+        try:
+            with st.spinner("⏳ Processando todas as leituras do banco..."):
+                total = controller.rebuild_reading_rollup()
+            st.success(f"✅ Resumo reconstruído com {total} leituras")
+        except Exception as e:
+            st.error(f"❌ Erro ao reconstruir o resumo (o histórico anterior foi mantido): {e}")
+
+
 def show_realtime_data_analysis():
     """Exibe análise dos dados coletados em tempo real."""
     st.subheader("⏰ Análise de Dados em Tempo Real")
@@ -978,7 +1098,7 @@ Working Dir: {os.getcwd()}
         with col2:
             st.markdown("**Detecção do R:**")
             if r_available:
-                st.success(f"✅ R encontrado em: {r_analyzer.rscript_path}")
+                st.success(f"✅ R encontrado em: {r_analyzer.rscript_path} ({r_analyzer.r_version})")
             else:
                 st.error("❌ R não encontrado")
                 
@@ -988,13 +1108,13 @@ Working Dir: {os.getcwd()}
                 r_analyzer = RAnalyzer()  # Nova instância
                 r_available = r_analyzer.check_r_availability(force_recheck=True)
                 if r_available:
-                    st.success(f"✅ R encontrado após nova detecção: {r_analyzer.rscript_path}")
+                    st.success(f"✅ R encontrado após nova detecção: {r_analyzer.rscript_path} ({r_analyzer.r_version})")
                     st.rerun()
                 else:
                     st.error("❌ R ainda não foi encontrado")
     
     if not r_available:
-        return
+        st.warning("⚠️ R não encontrado: as estatísticas são calculadas em Python, mas os gráficos não serão gerados.")
     
     # Carregar dados recentes
     try:
@@ -1125,143 +1245,150 @@ Working Dir: {os.getcwd()}
                 analysis_df = analysis_df[mask]
                 st.info(f"📊 Dados após remoção de outliers: {len(analysis_df)} registros")
             
-            with st.spinner("⏳ Executando análises estatísticas em R..."):
+            # Gráficos só das variáveis selecionadas e só se pedidos (sem gráficos o R não é chamado)
+            submit_r_job(
+                "r_job_realtime",
+                analysis_df,
+                analysis_type=("complete" if "Gráficos (Histograma, Boxplot)" in analysis_types
+                               else "descriptive"),
+                variables=selected_vars
+            )
+        
+        # Análise roda em segundo plano: acompanha o job e exibe o resultado quando terminar
+        finished = poll_r_job("r_job_realtime")
+        if finished is not None:
+            job, results = finished
+            try:
+                if "error" in results:
+                    st.error(f"❌ Erro na análise: {results['error']}")
+                    return
                 
-                try:
-                    # Executar análise R
-                    results = r_analyzer.analyze_data(analysis_df)
-                    
-                    if "error" in results:
-                        st.error(f"❌ Erro na análise: {results['error']}")
-                        return
+                st.success("✅ Análises concluídas com sucesso!")
+                if "warning" in results:
+                    st.warning(f"⚠️ {results['warning']}")
+                
+                # Sumário da análise
+                st.subheader("📋 Sumário da Análise")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Registros Analisados", job["rows"])
+                with col2:
+                    st.metric("Variáveis", len(selected_vars))
+                with col3:
+                    if 'timestamp' in df.columns:
+                        latest_reading = df['timestamp'].max()
+                        st.metric("Última Leitura", latest_reading.strftime("%d/%m/%Y %H:%M"))
+                    else:
+                        st.metric("Última Leitura", "N/A")
+                
+                # Exibir resultados estatísticos
+                if "statistics" in results and results["statistics"]:
+                    st.subheader("📊 Resultados Estatísticos")
                     
-                    st.success("✅ Análises concluídas com sucesso!")
+                    for var, stats in results["statistics"].items():
+                        st.markdown(f"### 📈 {var.title().replace('_', ' ')}")
+                        
+                        col1, col2, col3 = st.columns(3)
+                        
+                        # Tendência central
+                        if "tendencia_central" in stats:
+                            with col1:
+                                st.markdown("**Tendência Central**")
+                                tc = stats["tendencia_central"]
+                                st.metric("Média", f"{tc.get('media', 0):.4f}")
+                                st.metric("Mediana", f"{tc.get('mediana', 0):.4f}")
+                                if not pd.isna(tc.get('moda', 0)):
+                                    st.metric("Moda", f"{tc.get('moda', 0):.4f}")
+                        
+                        # Dispersão
+                        if "dispersao" in stats:
+                            with col2:
+                                st.markdown("**Dispersão**")
+                                disp = stats["dispersao"]
+                                st.metric("Variância", f"{disp.get('variancia', 0):.4f}")
+                                st.metric("Desvio Padrão", f"{disp.get('desvio_padrao', 0):.4f}")
+                                st.metric("Amplitude", f"{disp.get('amplitude', 0):.4f}")
+                                st.metric("IQR", f"{disp.get('iqr', 0):.4f}")
+                        
+                        # Separatrizes
+                        if "separatrizes" in stats:
+                            with col3:
+                                st.markdown("**Separatrizes**")
+                                sep = stats["separatrizes"]
+                                
+                                if "quartis" in sep:
+                                    quartis = sep["quartis"]
+                                    # quartis vem como lista [Q1, Q2, Q3] do R
+                                    if isinstance(quartis, list) and len(quartis) >= 3:
+                                        st.metric("Q1", f"{quartis[0]:.4f}")
+                                        st.metric("Q2 (Mediana)", f"{quartis[1]:.4f}")
+                                        st.metric("Q3", f"{quartis[2]:.4f}")
+                                    elif isinstance(quartis, dict):
+                                        # Fallback para formato de dicionário
+                                        st.metric("Q1", f"{quartis.get('25%', 0):.4f}")
+                                        st.metric("Q2 (Mediana)", f"{quartis.get('50%', 0):.4f}")
+                                        st.metric("Q3", f"{quartis.get('75%', 0):.4f}")
+                        
+                        st.divider()
+                
+                # Exibir gráficos
+                if "graphics" in results and results["graphics"]:
+                    st.subheader("📊 Visualizações")
                     
-                    # Sumário da análise
-                    st.subheader("📋 Sumário da Análise")
+                    graphics = results["graphics"]
                     
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Registros Analisados", len(analysis_df))
-                    with col2:
-                        st.metric("Variáveis", len(selected_vars))
-                    with col3:
-                        if 'timestamp' in df.columns:
-                            latest_reading = df['timestamp'].max()
-                            st.metric("Última Leitura", latest_reading.strftime("%d/%m/%Y %H:%M"))
-                        else:
-                            st.metric("Última Leitura", "N/A")
+                    # Gráfico de potabilidade (se disponível)
+                    if "barplot_potability" in graphics:
+                        st.markdown("### 📊 Distribuição de Potabilidade")
+                        st.image(r_graphic_image(results, "barplot_potability"), use_container_width=True)
+                        st.divider()
                     
-                    # Exibir resultados estatísticos
-                    if "statistics" in results and results["statistics"]:
-                        st.subheader("📊 Resultados Estatísticos")
+                    # Histogramas e boxplots para cada variável
+                    for var in selected_vars:
+                        hist_key = f"histogram_{var}"
+                        box_key = f"boxplot_{var}"
                         
-                        for var, stats in results["statistics"].items():
+                        if hist_key in graphics or box_key in graphics:
                             st.markdown(f"### 📈 {var.title().replace('_', ' ')}")
                             
-                            col1, col2, col3 = st.columns(3)
+                            col1, col2 = st.columns(2)
                             
-                            # Tendência central
-                            if "tendencia_central" in stats:
+                            if hist_key in graphics:
                                 with col1:
-                                    st.markdown("**Tendência Central**")
-                                    tc = stats["tendencia_central"]
-                                    st.metric("Média", f"{tc.get('media', 0):.4f}")
-                                    st.metric("Mediana", f"{tc.get('mediana', 0):.4f}")
-                                    if not pd.isna(tc.get('moda', 0)):
-                                        st.metric("Moda", f"{tc.get('moda', 0):.4f}")
+                                    st.markdown("**Histograma**")
+                                    st.image(r_graphic_image(results, hist_key), use_container_width=True)
                             
-                            # Dispersão
-                            if "dispersao" in stats:
+                            if box_key in graphics:
                                 with col2:
-                                    st.markdown("**Dispersão**")
-                                    disp = stats["dispersao"]
-                                    st.metric("Variância", f"{disp.get('variancia', 0):.4f}")
-                                    st.metric("Desvio Padrão", f"{disp.get('desvio_padrao', 0):.4f}")
-                                    st.metric("Amplitude", f"{disp.get('amplitude', 0):.4f}")
-                                    st.metric("IQR", f"{disp.get('iqr', 0):.4f}")
-                            
-                            # Separatrizes
-                            if "separatrizes" in stats:
-                                with col3:
-                                    st.markdown("**Separatrizes**")
-                                    sep = stats["separatrizes"]
-                                    
-                                    if "quartis" in sep:
-                                        quartis = sep["quartis"]
-                                        # quartis vem como lista [Q1, Q2, Q3] do R
-                                        if isinstance(quartis, list) and len(quartis) >= 3:
-                                            st.metric("Q1", f"{quartis[0]:.4f}")
-                                            st.metric("Q2 (Mediana)", f"{quartis[1]:.4f}")
-                                            st.metric("Q3", f"{quartis[2]:.4f}")
-                                        elif isinstance(quartis, dict):
-                                            # Fallback para formato de dicionário
-                                            st.metric("Q1", f"{quartis.get('25%', 0):.4f}")
-                                            st.metric("Q2 (Mediana)", f"{quartis.get('50%', 0):.4f}")
-                                            st.metric("Q3", f"{quartis.get('75%', 0):.4f}")
+                                    st.markdown("**Boxplot**")
+                                    st.image(r_graphic_image(results, box_key), use_container_width=True)
                             
                             st.divider()
-                    
-                    # Exibir gráficos
-                    if "graphics" in results and results["graphics"]:
-                        st.subheader("📊 Visualizações")
-                        
-                        graphics = results["graphics"]
-                        
-                        # Gráfico de potabilidade (se disponível)
-                        if "barplot_potability" in graphics:
-                            st.markdown("### 📊 Distribuição de Potabilidade")
-                            img_data = base64.b64decode(graphics["barplot_potability"])
-                            st.image(img_data, use_container_width=True)
-                            st.divider()
-                        
-                        # Histogramas e boxplots para cada variável
-                        for var in selected_vars:
-                            hist_key = f"histogram_{var}"
-                            box_key = f"boxplot_{var}"
-                            
-                            if hist_key in graphics or box_key in graphics:
-                                st.markdown(f"### 📈 {var.title().replace('_', ' ')}")
-                                
-                                col1, col2 = st.columns(2)
-                                
-                                if hist_key in graphics:
-                                    with col1:
-                                        st.markdown("**Histograma**")
-                                        img_data = base64.b64decode(graphics[hist_key])
-                                        st.image(img_data, use_container_width=True)
-                                
-                                if box_key in graphics:
-                                    with col2:
-                                        st.markdown("**Boxplot**")
-                                        img_data = base64.b64decode(graphics[box_key])
-                                        st.image(img_data, use_container_width=True)
-                                
-                                st.divider()
-                    
-                    # Insights e recomendações
-                    st.subheader("💡 Insights e Recomendações")
-                    
-                    insights = []
-                    
-                    if "statistics" in results:
-                        for var, stats in results["statistics"].items():
-                            if "dispersao" in stats:
-                                cv = stats["dispersao"]["desvio_padrao"] / abs(stats["tendencia_central"]["media"]) * 100
-                                if cv > 30:
-                                    insights.append(f"🔍 **{var}**: Alta variabilidade detectada (CV={cv:.1f}%) - verificar calibração do sensor")
-                                elif cv < 5:
-                                    insights.append(f"✅ **{var}**: Baixa variabilidade (CV={cv:.1f}%) - sensor estável")
-                    
-                    if insights:
-                        for insight in insights:
-                            st.markdown(insight)
-                    else:
-                        st.info("📊 Dados dentro dos padrões esperados.")
                 
-                except Exception as e:
-                    st.error(f"❌ Erro durante a análise: {str(e)}")
-                    logger.error(f"Erro na análise R: {str(e)}")
+                # Insights e recomendações
+                st.subheader("💡 Insights e Recomendações")
+                
+                insights = []
+                
+                if "statistics" in results:
+                    for var, stats in results["statistics"].items():
+                        if "dispersao" in stats:
+                            cv = stats["dispersao"]["desvio_padrao"] / abs(stats["tendencia_central"]["media"]) * 100
+                            if cv > 30:
+                                insights.append(f"🔍 **{var}**: Alta variabilidade detectada (CV={cv:.1f}%) - verificar calibração do sensor")
+                            elif cv < 5:
+                                insights.append(f"✅ **{var}**: Baixa variabilidade (CV={cv:.1f}%) - sensor estável")
+                
+                if insights:
+                    for insight in insights:
+                        st.markdown(insight)
+                else:
+                    st.info("📊 Dados dentro dos padrões esperados.")
+            
+            except Exception as e:
+                st.error(f"❌ Erro durante a análise: {str(e)}")
+                logger.error(f"Erro na análise R: {str(e)}")
             
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados: {str(e)}")
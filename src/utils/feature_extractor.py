@@ -0,0 +1,150 @@
+####################################
+##### Arquivo: feature_extractor.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Extração das features de leituras de sensor para o vetor do modelo.
+
+O extrator é montado uma vez por processor: guarda a ordem das features, o
+scaler e os valores padrão das features ausentes. Para cada conjunto de chaves
+de entrada (esquema) o mapeamento chave → coluna é resolvido uma única vez e
+reaproveitado; a leitura é escrita direto em um array de saída (``out=``) ou em
+um buffer preallocado por thread, e normalizada no próprio array.
+
+Depende apenas de NumPy e PyYAML, para poder ser usado pelo processor compacto.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Tipo das features em todo o pipeline (é o tipo que as árvores do sklearn usam
+# internamente; entregar float32 evita a cópia de conversão a cada predict)
+FEATURE_DTYPE = np.float32
+
+# Valor usado para features ausentes sem padrão configurado (comportamento original)
+FALLBACK_DEFAULT = 0.0
+
+# Limite de esquemas distintos guardados por extrator
+MAX_SCHEMAS = 64
+
+
+def load_feature_defaults(config_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Lê a seção ml.feature_defaults do config.yaml (vazia se ausente)."""
+    config_path = config_path or Path(__file__).parent.parent.parent / "config" / "config.yaml"
+    try:
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        return {}
+    return (config.get('ml') or {}).get('feature_defaults') or {}
+
+
+class SensorFeatureExtractor:
+    """
+    Converte leituras ({'ph': 7.0, ...}) ou blocos colunares em matrizes normalizadas.
+
+    Chaves aceitas por feature: o nome em minúsculas ou o nome exato da coluna
+    (nessa ordem). Features ausentes recebem o padrão de ``defaults`` — um
+    número em unidade original ou ``"mean"`` para a média do treino.
+    """
+
+    def __init__(self, feature_columns: Sequence[str], scaler_params: Optional[Dict[str, Any]] = None,
+                 defaults: Optional[Mapping[str, Any]] = None):
+        self.feature_columns = list(feature_columns)
+        self.scaler_params = scaler_params
+        self.n_features = len(self.feature_columns)
+
+        self.mean = self.std = None
+        if scaler_params:
+            self.mean = np.asarray(scaler_params['mean'], dtype=FEATURE_DTYPE).reshape(-1)
+            self.std = np.asarray(scaler_params['std'], dtype=FEATURE_DTYPE).reshape(-1)
+
+        defaults = {str(key).lower(): value for key, value in (defaults or {}).items()}
+        self.defaults = np.full(self.n_features, FALLBACK_DEFAULT, dtype=FEATURE_DTYPE)
+        for j, col in enumerate(self.feature_columns):
+            value = defaults.get(col.lower(), FALLBACK_DEFAULT)
+            if value == 'mean':
+                value = self.mean[j] if self.mean is not None else FALLBACK_DEFAULT
+            self.defaults[j] = float(value)
+
+        self._schemas: Dict[Tuple, Tuple] = {}
+        self._local = threading.local()
+
+    def _plan(self, keys: Tuple) -> Tuple:
+        """Mapeamento (coluna, chave) das features presentes no esquema, calculado uma vez."""
+        plan = self._schemas.get(keys)
+        if plan is None:
+            available = set(keys)
+            plan = []
+            missing = []
+            for j, col in enumerate(self.feature_columns):
+                if col.lower() in available:
+                    plan.append((j, col.lower()))
+                elif col in available:
+                    plan.append((j, col))
+                else:
+                    missing.append(col)
+            plan = tuple(plan)
+            if missing:
+                logger.debug(f"Esquema de leitura sem {missing}; usando valores padrão")
+            if len(self._schemas) >= MAX_SCHEMAS:
+                self._schemas.clear()
+            self._schemas[keys] = plan
+        return plan
+
+    def buffer(self) -> np.ndarray:
+        """Buffer 1×N da thread atual, reutilizado entre chamadas."""
+        buf = getattr(self._local, 'buffer', None)
+        if buf is None:
+            buf = self._local.buffer = np.empty((1, self.n_features), dtype=FEATURE_DTYPE)
+        return buf
+
+    def _normalize(self, out: np.ndarray) -> np.ndarray:
+        if self.mean is not None:
+            np.subtract(out, self.mean, out=out)
+            np.divide(out, self.std, out=out)
+        return out
+
+    def transform(self, reading: Mapping[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Leitura única → array 1×N float32 normalizado (escrito em ``out`` se fornecido)."""
+        if out is None:
+            out = np.empty((1, self.n_features), dtype=FEATURE_DTYPE)
+        row = out[0]
+        row[:] = self.defaults
+        for j, key in self._plan(tuple(reading)):
+            row[j] = float(reading[key])
+        return self._normalize(out)
+
+    def transform_batch(self, readings: Mapping[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Bloco colunar ({'ph': [...], ...}) → matriz N×features normalizada."""
+        if out is None:
+            n_rows = len(next(iter(readings.values()))) if len(readings) else 0
+            out = np.empty((n_rows, self.n_features), dtype=FEATURE_DTYPE)
+        out[:] = self.defaults
+        for j, key in self._plan(tuple(readings.keys())):
+            out[:, j] = np.asarray(readings[key], dtype=FEATURE_DTYPE)
+        return self._normalize(out)
+
+
+def extractor_for(processor) -> SensorFeatureExtractor:
+    """Extrator do processor, recriado quando o scaler ou as features mudam."""
+    # getattr: processors serializados antes do extrator não têm o atributo
+    extractor = getattr(processor, '_extractor', None)
+    if (extractor is None or extractor.scaler_params is not processor.scaler_params
+            or extractor.feature_columns != processor.feature_columns):
+        extractor = SensorFeatureExtractor(processor.feature_columns, processor.scaler_params,
+                                           load_feature_defaults())
+        processor._extractor = extractor
+    return extractor
@@ -0,0 +1,151 @@
+####################################
+##### Arquivo: thresholds.py
+##### Desenvolvedor: Juan F. Voltolini
+##### Instituição: FIAP
+##### Trabalho: Global Solution - 1º Semestre
+##### Grupo: Felipe Sabino da Silva, Juan Felipe Voltolini, Luiz Henrique Ribeiro de Oliveira, Marco Aurélio Eberhardt Assumpção e Paulo Henrique Senise
+####################################
+
+"""
+Tabela única de faixas dos parâmetros da água.
+
+Cada parâmetro é dividido em faixas por limites em ordem crescente; cada faixa
+tem atributos (status da análise, pontuação do simulador, criticidade e tipo de
+alerta). A tabela é compilada em arrays NumPy e a classificação de escalares ou
+arrays é feita com ``searchsorted``. Usada pelo preditor, pelo controller e pelo
+servidor simulador, para que todos classifiquem as leituras da mesma forma.
+
+Depende apenas de NumPy e PyYAML, para poder ser importada pelo simulador.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import yaml
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Faixas padrão, usadas quando o config.yaml não tem a seção "thresholds".
+# upper_inclusive[i] indica se um valor igual a breakpoints[i] pertence à faixa de cima.
+DEFAULT_THRESHOLDS = {
+    'ph': {
+        'breakpoints': [6.0, 6.5, 8.5, 9.0],
+        'upper_inclusive': [True, True, False, False],
+        'status': ['critico', 'atencao', 'normal', 'atencao', 'critico'],
+        'score': [-1, 1, 2, 1, -1],
+        'critical': [True, False, False, False, True],
+        'alert': ['acido', None, None, None, 'alcalino']
+    },
+    'turbidity': {
+        'breakpoints': [5.0, 25.0, 100.0],
+        'upper_inclusive': [True, True, True],
+        'status': ['normal', 'atencao', 'critico', 'critico'],
+        'score': [2, 1, 0, -2],
+        'critical': [False, False, False, True],
+        'alert': [None, None, 'elevada', 'elevada']
+    },
+    'chloramines': {
+        'breakpoints': [0.1, 0.2, 2.0, 4.0],
+        'upper_inclusive': [True, True, False, False],
+        'status': ['critico', 'atencao', 'normal', 'atencao', 'critico'],
+        'score': [-1, 1, 2, 1, -1],
+        'critical': [True, False, False, False, True],
+        'alert': ['insuficiente', None, None, None, 'excesso']
+    },
+    'conductivity': {
+        'breakpoints': [50.0, 1000.0, 2500.0],
+        'upper_inclusive': [True, True, True],
+        'score': [0, 1, 0, -1]
+    }
+}
+
+
+class ThresholdTable:
+    """
+    Tabela de faixas compilada em arrays NumPy.
+
+    Valores NaN caem na última faixa (o ``searchsorted`` ordena NaN no fim), o
+    que equivale às cadeias de if/elif originais, onde NaN ia para o ``else``.
+    """
+
+    def __init__(self, spec: Dict[str, Dict[str, Any]]):
+        self.spec = spec
+        self._breakpoints = {}
+        self._upper_inclusive = {}
+        self._fields = {}
+
+        for param, table in spec.items():
+            breakpoints = np.asarray(table['breakpoints'], dtype=np.float64)
+            if np.any(np.diff(breakpoints) <= 0):
+                raise ValueError(f"Limites de '{param}' devem ser estritamente crescentes")
+            upper_inclusive = np.asarray(table.get('upper_inclusive', [True] * len(breakpoints)), dtype=bool)
+            if upper_inclusive.shape != breakpoints.shape:
+                raise ValueError(f"upper_inclusive de '{param}' deve ter um valor por limite")
+
+            fields = {}
+            for field, values in table.items():
+                if field in ('breakpoints', 'upper_inclusive'):
+                    continue
+                if len(values) != len(breakpoints) + 1:
+                    raise ValueError(f"Campo '{field}' de '{param}' deve ter {len(breakpoints) + 1} faixas")
+                fields[field] = np.asarray(values, dtype=object if None in values else None)
+
+            self._breakpoints[param] = breakpoints
+            self._upper_inclusive[param] = upper_inclusive
+            self._fields[param] = fields
+
+    @property
+    def params(self):
+        return list(self._breakpoints)
+
+    def classify(self, param: str, values):
+        """Índice da faixa de cada valor (escalar retorna int, array retorna array)."""
+        breakpoints = self._breakpoints[param]
+        upper_inclusive = self._upper_inclusive[param]
+        x = np.asarray(values, dtype=np.float64)
+
+        # Faixa = limites abaixo do valor + limites iguais ao valor que pertencem à faixa de cima
+        below = np.searchsorted(breakpoints, x, side='left')
+        at_limit = np.searchsorted(breakpoints, x, side='right') > below
+        band = below + (at_limit & upper_inclusive[np.minimum(below, len(breakpoints) - 1)])
+
+        return int(band) if band.ndim == 0 else band
+
+    def lookup(self, param: str, values, field: str):
+        """Atributo ``field`` da faixa de cada valor."""
+        band = self.classify(param, values)
+        result = self._fields[param][field][band]
+        if isinstance(band, int) and isinstance(result, np.generic):
+            return result.item()
+        return result
+
+    def has_field(self, param: str, field: str) -> bool:
+        return field in self._fields.get(param, {})
+
+
+def load_thresholds(config_path: Optional[Path] = None) -> ThresholdTable:
+    """Carrega a tabela da seção "thresholds" do config.yaml (ou usa as faixas padrão)."""
+    config_path = config_path or Path(__file__).parent.parent.parent / "config" / "config.yaml"
+    spec = DEFAULT_THRESHOLDS
+    try:
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file) or {}
+        spec = {**DEFAULT_THRESHOLDS, **(config.get('thresholds') or {})}
+    except FileNotFoundError:
+        logger.warning(f"Configuração não encontrada em {config_path}; usando faixas padrão")
+    return ThresholdTable(spec)
+
+
+# Instância global para reutilização
+_thresholds_instance = None
+
+
+def get_thresholds() -> ThresholdTable:
+    """Retorna instância singleton da tabela de faixas."""
+    global _thresholds_instance
+    if _thresholds_instance is None:
+        _thresholds_instance = load_thresholds()
+    return _thresholds_instance
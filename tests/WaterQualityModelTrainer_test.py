@@ -29,7 +29,11 @@ def test_save_model(mocker, trainer):
 
     mocker.patch("src.model.train.joblib.dump")
     mocker.patch("pathlib.Path.mkdir")
+    mock_bundle = mocker.patch("src.model.train.save_forest_bundle")
+    mock_compact = mocker.patch("src.model.train.export_compact_model")
 
     trainer.save_model()
 
-    assert trainer.model_path == "test_model_path.pkl"
\ No newline at end of file
+    assert trainer.model_path == "test_model_path.pkl"
+    mock_bundle.assert_called_once()
+    mock_compact.assert_called_once()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import struct
+
+import numpy as np
+import pandas as pd
+
+from src.r_analysis.binary_frame import (
+    R_NA_INTEGER, R_NA_REAL_BITS, create_transfer_file, read_binary_frame, write_binary_frame
+)
+
+
+def test_round_trip_keeps_values_and_missing(tmp_path):
+    """Testa a ida e volta de colunas double, integer e logical com ausentes."""
+    df = pd.DataFrame({
+        'ph': [7.1, np.nan, 6.5],
+        'potability': [1, 0, 1],
+        'alert': [True, False, True],
+        'hardness': pd.array([120, None, 98], dtype='Int64')
+    })
+    path = write_binary_frame(df, tmp_path / 'data.bin')
+    result = read_binary_frame(path)
+
+    assert list(result.columns) == ['ph', 'potability', 'alert', 'hardness']
+    np.testing.assert_array_equal(result['ph'].to_numpy(), df['ph'].to_numpy())
+    assert result['potability'].tolist() == [1, 0, 1]
+    assert result['alert'].tolist() == [True, False, True]
+    assert result['hardness'].isna().tolist() == [False, True, False]
+
+
+def test_missing_values_use_r_na_encoding(tmp_path):
+    """Testa se os ausentes são gravados com os padrões de bits do NA do R."""
+    df = pd.DataFrame({'ph': [np.nan], 'hardness': pd.array([None], dtype='Int64')})
+    path = write_binary_frame(df, tmp_path / 'data.bin')
+
+    raw = path.read_bytes()
+    (header_len,) = struct.unpack('<i', raw[:4])
+    body = raw[4 + header_len:]
+    assert np.frombuffer(body[:8], dtype='<u8')[0] == R_NA_REAL_BITS
+    assert np.frombuffer(body[8:12], dtype='<i4')[0] == R_NA_INTEGER
+
+
+def test_text_columns_are_skipped(tmp_path):
+    """Testa se colunas de texto ficam fora do arquivo e se o formato CSV continua disponível."""
+    df = pd.DataFrame({'ph': [7.0, 6.8], 'source': ['a', 'b']})
+    path = create_transfer_file(df, tmp_dir=str(tmp_path))
+    assert path.endswith('.bin')
+    assert list(read_binary_frame(path).columns) == ['ph']
+
+    csv_path = create_transfer_file(df, binary=False, tmp_dir=str(tmp_path))
+    assert pd.read_csv(csv_path).columns.tolist() == ['ph', 'source']
@@ -0,0 +1,86 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.data_processor import WaterDataProcessor
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """CSV com NaNs nas features e rótulos em texto, como nas exportações dos sensores."""
+    rng = np.random.default_rng(0)
+    n = 2001
+    df = pd.DataFrame({
+        'ph': rng.normal(7, 1, n),
+        'Hardness': rng.normal(200, 30, n),
+        'Chloramines': rng.normal(-1, 3, n),
+        'Conductivity': rng.uniform(100, 900, n),
+        'Turbidity': rng.exponential(3, n),
+        'Potability': rng.choice(['Potável', 'Suspeita', 'Contaminada', None], n)
+    })
+    for col in ('ph', 'Chloramines', 'Turbidity'):
+        df.loc[rng.choice(n, 150, replace=False), col] = np.nan
+    path = tmp_path / "sensores.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_chunked_medians_are_exact(csv_path):
+    """Testa se a mediana em duas passadas coincide com a mediana do arquivo inteiro."""
+    processor = WaterDataProcessor()
+    medians = processor.compute_medians_chunked(str(csv_path), chunk_size=97)
+
+    reference = pd.read_csv(csv_path, dtype={c: np.float32 for c in processor.feature_columns})
+    reference['Potability'] = processor._map_potability(reference['Potability'])
+    reference = reference.dropna(subset=['Potability'])
+    for col in processor.feature_columns:
+        assert medians[col] == pytest.approx(float(np.median(reference[col].dropna().astype(np.float64))))
+
+
+def test_load_csv_chunked_matches_clean_data(csv_path):
+    """Testa se a leitura em blocos produz os mesmos registros que load_csv_data + clean_data."""
+    processor = WaterDataProcessor()
+    chunked = processor.load_csv_chunked(str(csv_path), chunk_size=97)
+    full = processor.clean_data(processor.load_csv_data(str(csv_path)))
+
+    assert list(chunked.columns) == list(full.columns)
+    assert chunked['ph'].dtype == np.float32
+    np.testing.assert_allclose(chunked.values, full.values, rtol=1e-6, atol=1e-4)
+
+
+def test_sensor_extractor_defaults_and_out(mocker):
+    """Testa o extrator de leituras: padrões configurados, buffer reutilizado e lote igual ao escalar."""
+    mocker.patch('src.utils.feature_extractor.load_feature_defaults', return_value={'Conductivity': 'mean'})
+    processor = WaterDataProcessor()
+    processor.scaler_params = {'mean': np.array([7.0, 4.0, 400.0, 4.0]), 'std': np.array([1.0, 2.0, 100.0, 1.0])}
+
+    buffer = processor.feature_buffer()
+    single = processor.process_sensor_reading({'ph': 8.0, 'Chloramines': 6.0, 'turbidity': 5.0}, out=buffer)
+    assert single is buffer
+    np.testing.assert_allclose(single, [[1.0, 1.0, 0.0, 1.0]])
+
+    out = np.zeros((4, 4))
+    batch = processor.process_sensor_batch({'ph': [8.0, 6.0], 'chloramines': [6.0, 2.0],
+                                            'turbidity': [5.0, 3.0]}, out=out[1:3])
+    np.testing.assert_allclose(out[1], single[0])
+    np.testing.assert_allclose(batch[1], [-1.0, -1.0, 0.0, -1.0])
+    assert not out[0].any() and not out[3].any()
+
+    # Extrator não vai para o pickle; processors antigos (sem o atributo) continuam funcionando
+    restored = pickle.loads(pickle.dumps(processor))
+    assert '_extractor' not in restored.__dict__
+    np.testing.assert_allclose(restored.process_sensor_reading({'ph': 8.0, 'Chloramines': 6.0, 'turbidity': 5.0}),
+                               single)
+
+
+def test_features_are_float32_end_to_end(csv_path):
+    """Testa se features, scaler e leituras processadas ficam em float32."""
+    processor = WaterDataProcessor()
+    X, y = processor.prepare_features(processor.clean_data(processor.load_csv_data(str(csv_path))))
+    X_train, X_test = processor.normalize_features(X[:1500], X[1500:])
+
+    assert X.dtype == X_train.dtype == X_test.dtype == np.float32
+    assert processor.scaler_params['mean'].dtype == np.float32
+    assert processor.process_sensor_reading({'ph': 7.0, 'turbidity': 1.0}).dtype == np.float32
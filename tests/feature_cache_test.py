@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from src.processing.data_processor import WaterDataProcessor
+from src.processing.feature_cache import FeatureCache
+
+
+def _write_csv(path, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ph': rng.normal(7, 1, 50),
+        'Chloramines': rng.normal(2, 1, 50),
+        'Conductivity': rng.uniform(100, 900, 50),
+        'Turbidity': rng.exponential(3, 50),
+        'Potability': rng.integers(0, 2, 50)
+    })
+    df.loc[3, 'ph'] = np.nan
+    df.to_csv(path, index=False)
+
+
+def test_cache_hit_is_memory_mapped_and_matches(tmp_path, mocker):
+    """Testa se a segunda chamada lê do cache (sem reprocessar o CSV) com os mesmos dados."""
+    csv_path = tmp_path / "dados.csv"
+    _write_csv(csv_path, 0)
+    processor = WaterDataProcessor()
+    cache = FeatureCache()
+
+    built = cache.get_or_build(csv_path, processor)
+    spy = mocker.spy(processor, 'clean_data')
+    cached = cache.get_or_build(csv_path, processor)
+
+    spy.assert_not_called()
+    assert isinstance(cached.X, np.memmap)
+    np.testing.assert_array_equal(cached.X, built.X)
+    assert cached.summary == built.summary
+    assert cached.raw_summary['feature_stats']['ph']['missing'] == 1
+
+
+def test_cache_invalidated_when_source_changes(tmp_path):
+    """Testa se alterar o CSV gera nova chave e remove a entrada antiga."""
+    csv_path = tmp_path / "dados.csv"
+    _write_csv(csv_path, 0)
+    processor = WaterDataProcessor()
+    cache = FeatureCache()
+
+    first = cache.get_or_build(csv_path, processor)
+    _write_csv(csv_path, 1)
+    second = cache.get_or_build(csv_path, processor)
+
+    assert first.key != second.key
+    entries = [p.name for p in (tmp_path / ".feature_cache").iterdir() if p.is_dir()]
+    assert entries == [second.key]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model.compact_model import export_compact_model, load_compact_model
+from src.model.forest_bundle import ForestBundle, save_forest_bundle
+from src.processing.data_processor import WaterDataProcessor
+
+
+@pytest.fixture
+def trained():
+    """Floresta pequena treinada com dados sintéticos."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + X[:, 3] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=42).fit(X, y)
+    processor = WaterDataProcessor()
+    processor.scaler_params = {'mean': X.mean(axis=0), 'std': X.std(axis=0)}
+    return model, processor, X
+
+
+def test_bundle_matches_sklearn(tmp_path, trained):
+    """Testa se o bundle mapeado reproduz as probabilidades do sklearn."""
+    model, processor, X = trained
+    bundle_dir = save_forest_bundle(model, processor, tmp_path / "model.bundle")
+
+    bundle = ForestBundle.load(bundle_dir, mmap_mode='r')
+
+    assert isinstance(bundle.threshold, np.memmap)
+    np.testing.assert_allclose(bundle.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_array_equal(bundle.predict(X), model.predict(X))
+
+
+def test_bundle_overwrite(tmp_path, trained):
+    """Testa se um novo bundle substitui o anterior sem deixar diretórios temporários."""
+    model, processor, _ = trained
+    save_forest_bundle(model, processor, tmp_path / "model.bundle")
+    save_forest_bundle(model, processor, tmp_path / "model.bundle")
+
+    assert [p.name for p in tmp_path.iterdir()] == ["model.bundle"]
+
+
+def test_compact_model_roundtrip(tmp_path, trained):
+    """Testa se o artefato .npz reproduz o modelo e preserva scaler e regra."""
+    model, processor, X = trained
+    rule = {'ph': (6.5, 8.5), 'turbidity': (None, 5.0)}
+    path = export_compact_model(model, processor, tmp_path / "model.npz", rule=rule)
+
+    forest, compact_processor, header = load_compact_model(path)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X))
+    assert compact_processor.feature_columns == processor.feature_columns
+    np.testing.assert_allclose(compact_processor.scaler_params['mean'], processor.scaler_params['mean'])
+    assert header['ideal_ranges'] == {'ph': [6.5, 8.5], 'turbidity': [None, 5.0]}
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model.lookup_grid import GridToleranceError, LookupGrid, build_lookup_grid, training_bounds
+from src.processing.data_processor import WaterDataProcessor
+
+
+BOUNDS = {'ph': (0, 14), 'chloramines': (0, 14), 'conductivity': (0, 800), 'turbidity': (0, 10)}
+
+
+def _fitted_model():
+    rng = np.random.default_rng(0)
+    X_raw = rng.uniform([0, 0, 0, 0], [14, 14, 800, 10], size=(400, 4))
+    y = (X_raw[:, 0] > 7).astype(int)
+    processor = WaterDataProcessor()
+    processor.scaler_params = {'mean': X_raw.mean(axis=0), 'std': X_raw.std(axis=0)}
+    X = (X_raw - processor.scaler_params['mean']) / processor.scaler_params['std']
+    model = RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0).fit(X, y)
+    return model, processor
+
+
+def test_build_and_query_grid(tmp_path):
+    """Testa se a grade reproduz o modelo nos nós e reporta o desvio máximo."""
+    model, processor = _fitted_model()
+
+    points = {'ph': 5, 'chloramines': 3, 'conductivity': 3, 'turbidity': 3}
+    header = build_lookup_grid(model, processor, tmp_path / "grid.npy", bounds=BOUNDS, points=points,
+                               check_samples=500)
+    grid = LookupGrid.load(tmp_path / "grid.npy")
+
+    node = (np.array([[3.5, 7.0, 400.0, 5.0]]) - processor.scaler_params['mean']) / processor.scaler_params['std']
+    assert grid.contains(node)[0]
+    np.testing.assert_allclose(grid.predict_proba(node), model.predict_proba(node), atol=1e-3)
+    assert 0.0 <= header['max_deviation_interpolated'] <= 1.0
+    assert grid.grid.dtype == np.float16
+
+
+def test_grid_over_tolerance_is_not_saved(tmp_path):
+    """Testa se a grade com desvio acima da tolerância falha sem gravar arquivo."""
+    model, processor = _fitted_model()
+    points = {'ph': 3, 'chloramines': 2, 'conductivity': 2, 'turbidity': 2}
+
+    with pytest.raises(GridToleranceError):
+        build_lookup_grid(model, processor, tmp_path / "grid.npy", bounds=BOUNDS, points=points,
+                          check_samples=500, max_deviation=0.01)
+    assert not (tmp_path / "grid.npy").exists()
+
+
+def test_tolerance_checks_the_inference_mode(tmp_path):
+    """Testa se a tolerância é conferida no modo de consulta escolhido (interpolado ou vizinho)."""
+    model, processor = _fitted_model()
+    points = {'ph': 5, 'chloramines': 3, 'conductivity': 3, 'turbidity': 3}
+
+    # Nesta grade a interpolação desvia ~0.69 e o vizinho mais próximo ~0.80
+    header = build_lookup_grid(model, processor, tmp_path / "grid.npy", bounds=BOUNDS, points=points,
+                               check_samples=500, interpolate=True, max_deviation=0.75)
+    assert header['max_deviation_interpolated'] <= 0.75 < header['max_deviation_nearest']
+
+    with pytest.raises(GridToleranceError):
+        build_lookup_grid(model, processor, tmp_path / "nearest.npy", bounds=BOUNDS, points=points,
+                          check_samples=500, interpolate=False, max_deviation=0.75)
+
+
+def test_training_bounds_cover_data_and_feature_defaults(tmp_path):
+    """Testa se as faixas vêm do dataset de treino, ampliadas pelos valores padrão numéricos."""
+    csv_path = tmp_path / "train.csv"
+    pd.DataFrame({
+        'ph': [5.5, 9.5, 7.0], 'Chloramines': [0.5, 4.5, 2.0], 'Conductivity': [150.0, 1990.0, 800.0],
+        'Turbidity': [0.2, 19.5, 5.0], 'Potability': [0, 1, 1]
+    }).to_csv(csv_path, index=False)
+
+    bounds = training_bounds(['ph', 'Chloramines', 'Conductivity', 'Turbidity'], csv_path,
+                             {'conductivity': 0.0, 'turbidity': 'mean'})
+
+    assert bounds['ph'] == (5.5, 9.5)
+    assert bounds['conductivity'] == (0.0, 1990.0)
+    assert bounds['turbidity'] == (0.2, 19.5)
+
+
+def test_predictor_checks_grid_model_version_and_scaler(tmp_path):
+    """Testa se a grade só é aceita para a mesma versão do modelo (ou mesmo scaler, se sem versão)."""
+    from src.model.predict import WaterQualityPredictor
+
+    model, processor = _fitted_model()
+    points = {'ph': 3, 'chloramines': 2, 'conductivity': 2, 'turbidity': 2}
+    build_lookup_grid(model, processor, tmp_path / "grid.npy", bounds=BOUNDS, points=points,
+                      check_samples=100, model_version='20250101000000')
+    grid = LookupGrid.load(tmp_path / "grid.npy")
+
+    predictor = WaterQualityPredictor()
+    predictor.processor = processor
+    predictor.model_version = '20250101000000'
+    assert predictor._grid_matches_model(grid)
+    predictor.model_version = '20250202000000'
+    assert not predictor._grid_matches_model(grid)
+
+    # Sem versão: mesma média com desvio diferente não é o mesmo scaler
+    grid.header['model_version'] = None
+    assert predictor._grid_matches_model(grid)
+    processor.scaler_params = {'mean': processor.scaler_params['mean'], 'std': processor.scaler_params['std'] * 2}
+    assert not predictor._grid_matches_model(grid)
+
+
+def test_reading_without_conductivity_uses_grid(tmp_path):
+    """Testa se a leitura da API (condutividade padrão 0.0, na borda da grade) cai dentro da grade."""
+    processor = WaterDataProcessor()
+    processor.scaler_params = {'mean': np.array([7.5, 2.5, 1039.16, 10.04], dtype=np.float32),
+                               'std': np.array([1.49, 1.45, 552.56, 5.70], dtype=np.float32)}
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(X, (X[:, 0] > 0).astype(int))
+    bounds = {'ph': (5.0, 10.0), 'chloramines': (0.0, 5.0), 'conductivity': (0.0, 2000.0), 'turbidity': (0.0, 20.0)}
+    points = {'ph': 3, 'chloramines': 3, 'conductivity': 3, 'turbidity': 3}
+    build_lookup_grid(model, processor, tmp_path / "grid.npy", bounds=bounds, points=points, check_samples=100)
+    grid = LookupGrid.load(tmp_path / "grid.npy")
+
+    X_api = processor.process_sensor_reading({'ph': 7.2, 'turbidity': 3.0, 'chloramines': 2.0})
+    assert grid.contains(X_api)[0]
+    X_out = processor.process_sensor_reading({'ph': 11.0, 'turbidity': 3.0, 'chloramines': 2.0})
+    assert not grid.contains(X_out)[0]
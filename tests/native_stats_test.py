@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.r_analysis.native_stats import describe_columns
+
+
+def test_matches_r_output():
+    """Testa se as estatísticas coincidem com as do water_analysis.R (valores calculados no R)."""
+    df = pd.DataFrame({
+        'ph': [1, 2, 2, 3, 4, 7, 9, np.nan],
+        'turbidity': [3, 3, 1, 1, 2, np.nan, np.nan, np.nan],
+        'potability': [0, 1, 0, 1, 0, 1, 0, 1]
+    })
+    stats = describe_columns(df)
+
+    assert list(stats) == ['ph', 'turbidity']
+    assert stats['ph'] == {
+        'tendencia_central': {'media': 4.0, 'mediana': 3.0, 'moda': 2.0},
+        'dispersao': {'variancia': 8.6667, 'desvio_padrao': 2.9439, 'amplitude': 8.0, 'iqr': 3.5},
+        'separatrizes': {
+            'quartis': [2.0, 3.0, 5.5],
+            'decis': [1.6, 2.0, 2.0, 2.4, 3.0, 3.6, 4.6, 6.4, 7.8]
+        }
+    }
+    # Empate no table(): vence o menor valor
+    assert stats['turbidity']['tendencia_central']['moda'] == 1.0
+
+
+def test_mode_groups_values_like_r_table():
+    """Testa se a moda agrupa valores iguais com 15 dígitos significativos, como o table() do R."""
+    df = pd.DataFrame({'x': [0.1 + 0.2, 0.3, 0.5, 0.7]})
+    assert describe_columns(df)['x']['tendencia_central']['moda'] == 0.3
+
+    single = describe_columns(pd.DataFrame({'x': [5.0]}))['x']
+    assert single['dispersao']['variancia'] == 'NA'
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import MagicMock
+
+from src.model.predict import WaterQualityPredictor
+from src.model.prediction_cache import PredictionCache
+
+
+def test_cache_lru_eviction():
+    """Testa se o cache descarta a entrada menos usada ao atingir o limite."""
+    cache = PredictionCache(max_size=2, resolution={'ph': 0.1})
+    cache.put((1,), {'a': 1})
+    cache.put((2,), {'a': 2})
+    cache.get((1,))
+    cache.put((3,), {'a': 3})
+
+    assert cache.get((2,)) is None
+    assert cache.get((1,)) == {'a': 1}
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_cache_quantizes_key():
+    """Testa se leituras próximas caem na mesma célula."""
+    cache = PredictionCache(resolution={'ph': 0.1, 'turbidity': 1.0}, aliases={'turbidity': 'Turbidity'})
+
+    assert cache.make_key({'ph': 7.01, 'turbidity': 10.2}) == cache.make_key({'ph': 6.99, 'Turbidity': 9.8})
+    assert cache.make_key({'ph': 7.01}) == (70, None)
+
+
+@pytest.fixture
+def cached_predictor():
+    """Preditor com cache habilitado e modelo mockado."""
+    predictor = WaterQualityPredictor()
+    predictor.cache = PredictionCache(resolution={'ph': 0.1, 'turbidity': 0.1, 'chloramines': 0.1})
+    predictor.processor = MagicMock(feature_columns=['ph', 'Chloramines', 'Turbidity'])
+    predictor.model = MagicMock()
+    predictor.model.classes_ = [0, 1]
+    predictor.model.predict_proba.return_value = [[0.8, 0.2]]
+    predictor.is_loaded = True
+    return predictor
+
+
+def test_predictor_uses_cache(cached_predictor):
+    """Testa se leituras repetidas não chamam o modelo novamente."""
+    first = cached_predictor.predict_from_sensor_data({'ph': 5.01, 'turbidity': 10.0, 'chloramines': 3.0})
+    second = cached_predictor.predict_from_sensor_data({'ph': 4.99, 'turbidity': 10.0, 'chloramines': 3.0})
+
+    assert first['potability_label'] == second['potability_label'] == 'NAO_POTAVEL'
+    assert second['sensor_data']['ph'] == 4.99
+    assert cached_predictor.model.predict_proba.call_count == 1
+    assert cached_predictor.get_cache_stats()['hit_rate'] == 0.5
+
+    cached_predictor._reset_cache()
+    assert cached_predictor.get_cache_stats()['size'] == 0
+
+
+def test_cache_skips_non_finite_values():
+    """Testa se NaN e inf não geram chave (a leitura não passa pelo cache)."""
+    cache = PredictionCache(resolution={'ph': 0.1, 'turbidity': 1.0})
+
+    assert cache.make_key({'ph': float('nan'), 'turbidity': 1.0}) is None
+    assert cache.make_key({'ph': 7.0, 'turbidity': float('inf')}) is None
+    assert cache.make_key({'ph': 7.0, 'turbidity': -1e400}) is None
+
+
+@pytest.mark.parametrize('ph', [float('nan'), float('inf')])
+def test_predictor_non_finite_reading_matches_uncached(cached_predictor, ph):
+    """Testa se uma leitura com valor não finito tem o mesmo resultado com e sem cache."""
+    reading = {'ph': ph, 'turbidity': 1.0, 'chloramines': 3.0}
+    cached = cached_predictor.predict_from_sensor_data(reading)
+
+    cache = cached_predictor.cache
+    cached_predictor.cache = None
+    uncached = cached_predictor.predict_from_sensor_data(reading)
+    cached_predictor.cache = cache
+
+    assert cached['potability_label'] == uncached['potability_label'] == 'NAO_POTAVEL'
+    assert cache.get_stats()['size'] == 0
@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model.forest_bundle import flatten_forest, node_depths
+from src.model.prune import prune_forest, truncate_tree
+
+
+def _model_and_validation():
+    X, y = make_classification(n_samples=1200, n_features=4, n_informative=3, n_redundant=0, random_state=0)
+    X = X.astype(np.float32)
+    model = RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0).fit(X[:900], y[:900])
+    return model, X[900:], y[900:]
+
+
+def test_pruned_forest_meets_tolerance_and_is_cheaper():
+    """Testa se a floresta podada respeita a tolerância e tem custo menor que a completa."""
+    model, X_val, y_val = _model_and_validation()
+    result = prune_forest(model, X_val, y_val, tolerance=0.01, depths=[4])
+    report, pruned = result['report'], result['model']
+
+    assert report['pruned_accuracy'] >= report['full_accuracy'] - 0.01
+    assert report['pruned_latency_cost'] < report['full_latency_cost']
+    assert len(pruned.estimators_) == report['pruned_n_trees'] < len(model.estimators_)
+    # A acurácia reportada é a do modelo sklearn gerado
+    assert np.mean(pruned.predict(X_val) == y_val) == report['pruned_accuracy']
+    assert {point['max_depth'] for point in report['curve']} == {None, 4}
+    # O modelo original não é alterado
+    assert len(model.estimators_) == 30
+
+
+def test_truncated_tree_matches_flattened_traversal():
+    """Testa se truncar a árvore equivale a parar a travessia na profundidade do corte."""
+    model, X_val, _ = _model_and_validation()
+    tree = truncate_tree(model.estimators_[0], 3)
+    assert node_depths(tree.tree_).max() == 3
+
+    arrays = flatten_forest(model)
+    nodes = np.zeros(len(X_val), dtype=np.int64)
+    for _ in range(3):
+        go_left = X_val[np.arange(len(X_val)), arrays['feature'][nodes]] <= arrays['threshold'][nodes]
+        nodes = np.where(go_left, arrays['children_left'][nodes], arrays['children_right'][nodes])
+    np.testing.assert_allclose(tree.predict_proba(X_val), arrays['value'][nodes])
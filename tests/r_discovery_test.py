@@ -0,0 +1,48 @@
+import os
+
+from src.r_analysis import r_discovery
+from src.r_analysis.r_discovery import discover_rscript
+
+
+def test_discovery_is_cached_until_executable_changes(tmp_path, monkeypatch):
+    """Testa se o resultado salvo evita novos testes e se a mudança do mtime força uma nova busca."""
+    broken = tmp_path / 'old' / 'Rscript'
+    working = tmp_path / 'new' / 'Rscript'
+    for path in (broken, working):
+        path.parent.mkdir()
+        path.write_text('')
+
+    probes = []
+
+    def fake_probe(path, timeout=10.0):
+        probes.append(path)
+        return 'Rscript (R) version 4.4.1' if path == str(working) else None
+
+    monkeypatch.setattr(r_discovery, 'candidate_paths', lambda: [str(broken), str(working)])
+    monkeypatch.setattr(r_discovery, 'probe_rscript', fake_probe)
+    cache_file = tmp_path / 'rscript.json'
+
+    found = discover_rscript(cache_file)
+    assert found['path'] == str(working) and found['version'].endswith('4.4.1')
+    assert sorted(probes) == sorted([str(broken), str(working)])
+
+    probes.clear()
+    assert discover_rscript(cache_file)['path'] == str(working)
+    assert probes == []
+
+    # Executável atualizado (mtime diferente): procura de novo
+    stat = working.stat()
+    os.utime(working, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    discover_rscript(cache_file)
+    assert len(probes) == 2
+
+
+def test_script_is_written_only_when_content_changes():
+    """Testa se um novo RAnalyzer não regrava o water_analysis.R inalterado."""
+    from src.r_analysis.r_analyzer import RAnalyzer
+
+    analyzer = RAnalyzer()
+    script = analyzer.r_script_path / "water_analysis.R"
+    mtime = script.stat().st_mtime_ns
+    RAnalyzer()
+    assert script.stat().st_mtime_ns == mtime
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+
+import pandas as pd
+
+from src.r_analysis.job_manager import JOB_DONE, JOB_FAILED, RJobManager, RJobQueueFull
+
+
+class _FakeAnalyzer:
+    """Registra a ordem das análises; a primeira fica bloqueada até `release`."""
+
+    def __init__(self):
+        self.order = []
+        self.release = threading.Event()
+
+    def analyze_data(self, data, analysis_type="complete", variables=None):
+        self.order.append(data.attrs['name'])
+        if len(self.order) == 1:
+            self.release.wait(5)
+        if data.attrs['name'] == 'erro':
+            raise RuntimeError('falha no R')
+        return {"success": True, "statistics": {"ph": {"media": float(data['ph'].mean())}}, "graphics": {}}
+
+
+def _frame(name):
+    df = pd.DataFrame({'ph': [7.0, 8.0]})
+    df.attrs['name'] = name
+    return df
+
+
+def _wait(manager, job_id):
+    deadline = time.monotonic() + 5
+    while manager.status(job_id)['status'] not in (JOB_DONE, JOB_FAILED) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return manager.status(job_id)
+
+
+def test_sessions_are_served_round_robin(tmp_path):
+    """Testa se uma sessão com vários jobs não passa na frente de outra sessão."""
+    analyzer = _FakeAnalyzer()
+    manager = RJobManager(tmp_path, max_workers=1, analyzer_factory=lambda: analyzer)
+
+    first = manager.submit(_frame('a1'), 'a')
+    while not analyzer.order:
+        time.sleep(0.01)
+    jobs = [manager.submit(_frame('a2'), 'a'), manager.submit(_frame('a3'), 'a'), manager.submit(_frame('b1'), 'b')]
+    assert manager.queue_position(jobs[1]) == 2
+    analyzer.release.set()
+
+    for job_id in [first] + jobs:
+        assert _wait(manager, job_id)['status'] == JOB_DONE
+    assert analyzer.order == ['a1', 'b1', 'a2', 'a3']
+    assert manager.result(first)['statistics']['ph']['media'] == 7.5
+    manager.shutdown(wait=True)
+
+
+def test_status_and_results_are_persisted(tmp_path):
+    """Testa erros, limite por sessão e se estado e resultado sobrevivem a um novo gerenciador."""
+    analyzer = _FakeAnalyzer()
+    manager = RJobManager(tmp_path, max_workers=1, max_pending_per_session=1, analyzer_factory=lambda: analyzer)
+
+    done = manager.submit(_frame('ok'), 's')
+    while not analyzer.order:
+        time.sleep(0.01)
+    failed = manager.submit(_frame('erro'), 's')
+    try:
+        manager.submit(_frame('extra'), 's')
+        assert False, "limite da sessão não aplicado"
+    except RJobQueueFull:
+        pass
+    analyzer.release.set()
+
+    assert _wait(manager, done)['status'] == JOB_DONE
+    status = _wait(manager, failed)
+    assert status['status'] == JOB_FAILED and 'falha no R' in status['error']
+    manager.shutdown(wait=True)
+
+    reopened = RJobManager(tmp_path, max_workers=1, analyzer_factory=_FakeAnalyzer)
+    assert reopened.status(done)['rows'] == 2
+    assert reopened.result(done)['success'] is True
+    assert 'error' in reopened.result(failed)
+    reopened.shutdown(wait=True)
+
+
+def test_recovery_survives_job_files_without_id(tmp_path):
+    """Testa se arquivos de estado sem id (ou inválidos) não interrompem a recuperação dos demais."""
+    old = time.time() - 48 * 3600
+    (tmp_path / 'expirado.json').write_text(json.dumps({'status': JOB_DONE, 'finished': old}))
+    (tmp_path / 'expirado.result.json').write_text('{}')
+    (tmp_path / 'lista.json').write_text('[]')
+    (tmp_path / 'interrompido.json').write_text(json.dumps({'status': 'running', 'finished': None}))
+
+    manager = RJobManager(tmp_path, max_workers=1, analyzer_factory=_FakeAnalyzer)
+
+    assert not (tmp_path / 'expirado.json').exists()
+    assert not (tmp_path / 'expirado.result.json').exists()
+    assert manager.status('interrompido')['status'] == JOB_FAILED
+    assert manager.status('interrompido')['id'] == 'interrompido'
+    manager.shutdown(wait=True)
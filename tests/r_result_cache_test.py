@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+
+from src.r_analysis.r_analyzer import RAnalyzer
+from src.r_analysis.result_cache import RResultCache
+
+
+def _fake_run(data_file, output_dir, variables=None):
+    """Simula o script R (só gráficos): grava um PNG no diretório de saída."""
+    with open(os.path.join(output_dir, 'histogram_ph.png'), 'wb') as f:
+        f.write(b'\x89PNG' + bytes(100))
+    return 'Análise concluída.'
+
+
+def test_repeated_analysis_is_served_from_cache(tmp_path, mocker):
+    """Testa se a mesma análise não chama o R de novo e se dados diferentes geram nova entrada."""
+    analyzer = RAnalyzer()
+    analyzer.result_cache = RResultCache(tmp_path)
+    mocker.patch.object(analyzer, 'check_r_availability', return_value=True)
+    run = mocker.patch.object(analyzer, '_run_analysis', side_effect=_fake_run)
+
+    df = pd.DataFrame({'ph': [7.0, 7.5, 6.8], 'potability': [1, 0, 1]})
+    first = analyzer.analyze_data(df)
+    second = analyzer.analyze_data(df.copy())
+
+    assert run.call_count == 1
+    assert second['cached'] and 'cached' not in first
+    assert second['statistics'] == first['statistics']
+    assert first['statistics']['ph']['tendencia_central']['media'] == 7.1
+    assert second['graphics'] == first['graphics']
+
+    analyzer.analyze_data(df.assign(ph=[7.0, 7.5, 6.9]))
+    assert run.call_count == 2
+
+
+def test_plots_only_for_selected_variables(tmp_path, mocker):
+    """Testa se só as variáveis selecionadas vão ao R, se SVG é lido e se 'descriptive' não chama o R."""
+    analyzer = RAnalyzer()
+    analyzer.result_cache = RResultCache(tmp_path)
+    mocker.patch.object(analyzer, 'check_r_availability', return_value=True)
+
+    def fake_svg_run(data_file, output_dir, variables=None):
+        for var in variables:
+            with open(os.path.join(output_dir, f'histogram_{var}.svg'), 'w') as f:
+                f.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        return ''
+
+    run = mocker.patch.object(analyzer, '_run_analysis', side_effect=fake_svg_run)
+    df = pd.DataFrame({'ph': [7.0, 7.5], 'turbidity': [1.0, 2.0], 'potability': [1, 0]})
+
+    result = analyzer.analyze_data(df, variables=['ph'])
+    assert run.call_args.args[2] == ['ph']
+    assert list(result['graphics']) == ['histogram_ph'] and result['graphics_format'] == 'svg'
+    assert set(result['statistics']) == {'ph', 'turbidity'}
+    assert analyzer.analyze_data(df, variables=['ph'])['graphics_format'] == 'svg'
+
+    analyzer.analyze_data(df, analysis_type='descriptive')
+    assert run.call_count == 1
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    """Testa se, acima do limite de tamanho, sai a entrada acessada há mais tempo."""
+    output = tmp_path / 'out'
+    output.mkdir()
+    (output / 'statistics.json').write_text('{}')
+    (output / 'plot.png').write_bytes(bytes(1000))
+
+    cache = RResultCache(tmp_path / 'cache', max_bytes=2500)
+    cache.store('a', output)
+    cache.store('b', output)
+    os.utime(tmp_path / 'cache' / 'a' / 'meta.json', (0, 0))
+    os.utime(tmp_path / 'cache' / 'b' / 'meta.json', (10, 10))
+    assert cache.load('a') is not None   # acesso torna 'a' a mais recente
+
+    cache.store('c', output)
+    assert cache.load('b') is None
+    assert cache.load('a') is not None and cache.load('c') is not None
@@ -0,0 +1,71 @@
+import sys
+import textwrap
+
+import pytest
+
+from src.r_analysis.r_worker import RWorker, RWorkerError, RWorkerTimeout
+
+# Worker falso em Python que segue o mesmo protocolo do script R
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys, time
+    PREFIX = "@@RWORKER@@ "
+    def send(response):
+        sys.stdout.write(PREFIX + json.dumps(response) + "\\n")
+        sys.stdout.flush()
+    send({"id": 0, "status": "ready", "pid": os.getpid()})
+    for line in sys.stdin:
+        job = json.loads(line)
+        if job["type"] == "quit":
+            break
+        if job["type"] == "crash":
+            os._exit(1)
+        if job["type"] == "sleep":
+            time.sleep(job["seconds"])
+        if job["type"] == "fail":
+            send({"id": job["id"], "status": "error", "message": "falhou"})
+            continue
+        print("saida do job")
+        sys.stdout.flush()
+        send({"id": job["id"], "status": "ok", "pid": os.getpid()})
+''')
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    worker = RWorker([sys.executable, str(script)], startup_timeout=10, job_timeout=5)
+    yield worker
+    worker.stop()
+
+
+def test_jobs_reuse_the_same_process(worker):
+    """Testa se jobs consecutivos usam o mesmo processo e devolvem a saída comum."""
+    first = worker.submit('analyze', data_file='a.csv')
+    second = worker.submit('analyze', data_file='b.csv')
+    assert first['pid'] == second['pid']
+    assert first['output'] == 'saida do job'
+    assert worker.ping()
+
+
+def test_restart_after_crash_and_timeout(worker):
+    """Testa se o worker é reiniciado após queda do processo e após job com timeout."""
+    pid = worker.submit('analyze')['pid']
+
+    with pytest.raises(RWorkerError):
+        worker.submit('crash')
+    restarted = worker.submit('analyze')['pid']
+    assert restarted != pid
+
+    with pytest.raises(RWorkerTimeout):
+        worker.submit('sleep', timeout=0.5, seconds=5)
+    assert worker.submit('analyze')['pid'] != restarted
+    assert worker.restarts == 2
+
+
+def test_job_error_keeps_worker_alive(worker):
+    """Testa se erro dentro do job vira exceção sem derrubar o processo."""
+    pid = worker.submit('analyze')['pid']
+    with pytest.raises(RWorkerError, match='falhou'):
+        worker.submit('fail')
+    assert worker.submit('analyze')['pid'] == pid
@@ -0,0 +1,134 @@
+import json
+import multiprocessing
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.reading_rollup import ReadingRollup
+
+
+def _readings(days=10):
+    timestamps = pd.date_range('2026-10-10', periods=days * 24 * 6, freq='10min')
+    rng = np.random.default_rng(2)
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'ph': rng.normal(7.0, 0.5, len(timestamps)).round(2),
+        'turbidity': rng.gamma(2.0, 1.0, len(timestamps)),
+        'chloramines': rng.normal(3.0, 1.0, len(timestamps))
+    })
+
+
+def test_window_statistics_match_the_readings(tmp_path):
+    """Testa se a janela junta só os buckets das suas horas e se as estatísticas batem com os dados."""
+    df = _readings()
+    rollup = ReadingRollup(tmp_path)
+    rollup.add_frame(df)
+    rollup.add(datetime(2026, 10, 19, 23, 50), {'ph': 7.1, 'turbidity': None})
+
+    start, end = datetime(2026, 10, 12, 6, 30), datetime(2026, 10, 14, 18)
+    window = df[(df['timestamp'] >= '2026-10-12 06:00') & (df['timestamp'] < end)]
+    stats = rollup.describe(start, end)['ph']
+
+    assert stats['contagem'] == len(window)
+    assert stats['tendencia_central']['media'] == round(window['ph'].mean(), 4)
+    assert stats['dispersao']['desvio_padrao'] == round(window['ph'].std(), 4)
+    assert abs(stats['tendencia_central']['mediana'] - window['ph'].median()) < 0.05
+    assert abs(stats['dispersao']['iqr'] - (window['ph'].quantile(0.75) - window['ph'].quantile(0.25))) < 0.1
+    assert len(stats['separatrizes']['decis']) == 9
+
+    everything = rollup.describe()
+    assert everything['ph']['contagem'] == len(df) + 1
+    assert everything['turbidity']['contagem'] == len(df)
+
+
+def test_flush_persists_and_compacts_old_days(tmp_path):
+    """Testa se os dias gravados são relidos e se os antigos viram um bucket diário."""
+    df = _readings()
+    rollup = ReadingRollup(tmp_path, hourly_retention_days=3)
+    rollup.add_frame(df)
+    rollup.flush(today=date(2026, 10, 19))
+
+    assert len(list(tmp_path.glob('*.json'))) == 10
+    reopened = ReadingRollup(tmp_path)
+    # Dia compactado entra inteiro; dia com horas respeita o horário
+    assert reopened.describe(datetime(2026, 10, 11, 12), datetime(2026, 10, 12))['ph']['contagem'] == 144
+    assert reopened.describe(datetime(2026, 10, 18, 12), datetime(2026, 10, 19))['ph']['contagem'] == 72
+    assert reopened.describe()['ph']['contagem'] == len(df)
+
+    reopened.clear()
+    assert reopened.describe() == {}
+
+
+def test_flush_compacts_stale_days_on_day_rollover(tmp_path):
+    """Testa se dias gravados por hora são compactados na virada do dia, sem leituras novas neles."""
+    rollup = ReadingRollup(tmp_path, hourly_retention_days=3)
+    rollup.add_frame(_readings(days=2))
+    rollup.flush(today=date(2026, 10, 12))
+    assert all('hours' in json.loads(path.read_text()) for path in tmp_path.glob('*.json'))
+
+    rollup.flush(today=date(2026, 10, 14))
+    assert 'day' in json.loads((tmp_path / '2026-10-10.json').read_text())
+    assert 'hours' in json.loads((tmp_path / '2026-10-11.json').read_text())
+
+    rollup.flush(today=date(2026, 10, 15))
+    assert 'day' in json.loads((tmp_path / '2026-10-11.json').read_text())
+    assert rollup.describe()['ph']['contagem'] == 2 * 24 * 6
+
+
+def test_flush_adds_to_what_other_processes_wrote(tmp_path):
+    """Testa se duas instâncias no mesmo diretório somam as leituras em vez de sobrescrever."""
+    api, ui = ReadingRollup(tmp_path), ReadingRollup(tmp_path)
+    api.add(datetime(2026, 10, 19, 10, 5), {'ph': 7.0})
+    ui.add(datetime(2026, 10, 19, 10, 20), {'ph': 7.4})
+    api.flush(today=date(2026, 10, 19))
+    ui.flush(today=date(2026, 10, 19))
+    api.add(datetime(2026, 10, 19, 11, 0), {'ph': 6.8})
+
+    # Leituras ainda pendentes também entram na consulta
+    assert api.describe()['ph']['contagem'] == 3
+    api.flush(today=date(2026, 10, 19))
+    assert ReadingRollup(tmp_path).describe()['ph']['contagem'] == 3
+
+
+def test_rebuild_replaces_history_only_on_success(tmp_path):
+    """Testa se a reconstrução troca o histórico no fim e o mantém se a leitura dos blocos falhar."""
+    directory = tmp_path / 'rollup'
+    rollup = ReadingRollup(directory)
+    rollup.add(datetime(2026, 10, 1, 8), {'ph': 9.0})
+    rollup.flush(today=date(2026, 10, 19))
+
+    def failing_frames():
+        yield _readings(days=1)
+        raise ConnectionError("banco indisponível")
+
+    with pytest.raises(ConnectionError):
+        rollup.rebuild(failing_frames())
+    assert rollup.describe()['ph']['contagem'] == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['rollup']
+
+    df = _readings(days=2)
+    assert rollup.rebuild([df.iloc[:100], df.iloc[100:]]) == len(df)
+    assert rollup.describe()['ph']['contagem'] == len(df)
+    assert not (directory / '2026-10-01.json').exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['rollup']
+
+
+def _add_readings(directory, n):
+    rollup = ReadingRollup(directory, flush_interval=0)
+    for i in range(n):
+        rollup.add(datetime(2026, 10, 19, 10, i % 60), {'ph': 7.0 + i / 1000})
+    rollup.flush(today=date(2026, 10, 19))
+
+
+def test_concurrent_processes_do_not_lose_readings(tmp_path):
+    """Testa se flushes simultâneos de processos diferentes no mesmo diretório somam todas as leituras."""
+    processes = [multiprocessing.Process(target=_add_readings, args=(tmp_path, 300)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    assert ReadingRollup(tmp_path).describe()['ph']['contagem'] == 600
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model.retrain import OnlineRetrainer, RecentWindow
+from src.processing.data_processor import WaterDataProcessor
+
+
+class FakeRepository:
+    """Repositório em memória que devolve as leituras em blocos, como o fetchmany."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def iter_lab_labelled_readings(self, since=None, chunk_size=5000):
+        rows = [row for row in self.rows if since is None or row[0] > since]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+
+def _publish_base_model(tmp_path):
+    processor = WaterDataProcessor()
+    processor.scaler_params = {'mean': np.array([7.0, 7.0, 400.0, 4.0]), 'std': np.array([1.5, 1.5, 80.0, 0.8])}
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, (X[:, 0] > 0).astype(int))
+    path = tmp_path / "model.pkl"
+    joblib.dump({'model': model, 'processor': processor, 'version': 'base'}, path)
+    return path
+
+
+def test_recent_window_keeps_latest_rows():
+    """Testa se a janela mantém só as leituras mais recentes."""
+    window = RecentWindow(capacity=5, n_features=2)
+    for i in range(3):
+        window.append(np.full((3, 2), i), np.full(3, i), last_timestamp=i)
+    assert len(window) == 5
+    assert window.total_seen == 9
+    assert window.y.tolist() == [1, 1, 2, 2, 2]
+
+
+def test_run_once_warm_starts_and_publishes(tmp_path, mocker):
+    """Testa o ciclo completo: leitura em blocos, warm start, publicação e marca d'água."""
+    start = datetime(2025, 1, 1)
+    rng = np.random.default_rng(1)
+    rows = [(start + timedelta(minutes=i), float(ph), 1.0, 1.0, int(ph > 7.0))
+            for i, ph in enumerate(rng.uniform(5.0, 9.0, size=400))]
+
+    trainer = mocker.MagicMock()
+    trainer.model_path = _publish_base_model(tmp_path)
+    trainer.model_version = 'new'
+
+    retrainer = OnlineRetrainer(repository=FakeRepository(rows), trainer=trainer)
+    retrainer.state_path = tmp_path / "state.json"
+    retrainer.config = {'chunk_size': 64, 'trees_per_update': 5, 'max_trees': 12,
+                        'base_sample_size': 100, 'tolerance': 1.0}
+
+    result = retrainer.run_once()
+
+    assert result['published']
+    assert result['n_estimators'] == 12
+    trainer.save_model.assert_called_once()
+    assert len(trainer.model.estimators_) == 12
+
+    # Segunda execução não encontra leituras novas após a marca d'água
+    assert retrainer.run_once()['reason'] == 'insufficient_data'
+
+
+def test_run_once_skips_single_class_labels(tmp_path, mocker):
+    """Testa se rótulos novos de uma só classe adiam o retreino sem mover a marca d'água."""
+    start = datetime(2025, 1, 1)
+    rows = [(start + timedelta(minutes=i), 8.0, 1.0, 1.0, 1) for i in range(100)]
+
+    trainer = mocker.MagicMock()
+    trainer.model_path = _publish_base_model(tmp_path)
+
+    retrainer = OnlineRetrainer(repository=FakeRepository(rows), trainer=trainer)
+    retrainer.state_path = tmp_path / "state.json"
+    retrainer.config = {'base_sample_size': 100}
+
+    result = retrainer.run_once()
+
+    assert not result['published']
+    assert result['reason'] == 'single_class'
+    trainer.save_model.assert_not_called()
+    assert not retrainer.state_path.exists()
+
+
+def test_readings_use_inference_feature_path(tmp_path, mocker):
+    """Testa se as leituras do banco viram as mesmas features que o preditor usa (padrão de condutividade)."""
+    trainer = mocker.MagicMock()
+    trainer.model_path = _publish_base_model(tmp_path)
+    retrainer = OnlineRetrainer(repository=FakeRepository([]), trainer=trainer)
+    _, processor = retrainer._load_current_model()
+
+    rows = [(datetime(2025, 1, 1), 7.2, 3.0, 6.5, 1), (datetime(2025, 1, 2), float('nan'), 3.0, 6.5, 0)]
+    X, y = retrainer._readings_to_features(rows, processor)
+
+    expected = processor.process_sensor_reading({'ph': 7.2, 'turbidity': 3.0, 'chloramines': 6.5})
+    np.testing.assert_array_equal(X, expected)
+    assert y.tolist() == [1]
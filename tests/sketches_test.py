@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.processing.sketches import FrequentValues, TDigest
+
+
+def _rank_error(sorted_values, estimate, q):
+    return abs(np.searchsorted(sorted_values, estimate) / len(sorted_values) - q)
+
+
+def test_tdigest_quantiles_and_merge():
+    """Testa a precisão dos quantis (erro de posição < 1%) e a junção de digests parciais."""
+    values = np.random.default_rng(0).lognormal(0, 1, 50_000)
+    sorted_values = np.sort(values)
+    probs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+    whole = TDigest()
+    for chunk in np.array_split(values, 100):
+        whole.update(chunk)
+    merged = TDigest().update(values[:20_000]).merge(TDigest().update(values[20_000:]))
+
+    for digest in (whole, merged):
+        assert digest.count == len(values)
+        assert len(digest.means) < 200
+        for q, estimate in zip(probs, digest.quantiles(probs)):
+            assert _rank_error(sorted_values, estimate, q) < 0.01
+        assert digest.quantile(0.0) == values.min() and digest.quantile(1.0) == values.max()
+
+    restored = TDigest.from_dict(whole.to_dict())
+    np.testing.assert_allclose(restored.quantiles(probs), whole.quantiles(probs))
+
+
+def test_frequent_values_keeps_mode():
+    """Testa se a moda sobrevive ao limite de contadores e à junção, com empate pelo menor valor."""
+    rng = np.random.default_rng(1)
+    noise = rng.uniform(0, 14, 5_000)
+    values = np.concatenate([noise, np.full(800, 7.2), np.full(300, 6.5)])
+    rng.shuffle(values)
+
+    sketch = FrequentValues(capacity=16, decimals=2)
+    for chunk in np.array_split(values, 50):
+        other = FrequentValues(capacity=16, decimals=2).update(chunk)
+        sketch.merge(other)
+    assert len(sketch.counts) <= 16
+    assert sketch.mode() == 7.2 and sketch.total == len(values)
+
+    assert FrequentValues().update([2.0, 1.0, 2.0, 1.0]).mode() == 1.0
+    assert np.isnan(FrequentValues().mode())
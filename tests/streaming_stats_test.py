@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.streaming_stats import StreamingStats
+
+
+def _frame(seed, n=200):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'a': rng.normal(7, 2, n), 'b': rng.exponential(3, n)})
+    df.loc[rng.choice(n, 10, replace=False), 'a'] = np.nan
+    return df
+
+
+def test_chunked_matches_pandas():
+    """Testa se o resumo por blocos coincide com as estatísticas do pandas."""
+    df = _frame(0)
+    stats = StreamingStats(['a', 'b']).update_chunks(df.iloc[i:i + 37] for i in range(0, len(df), 37))
+
+    for col in ('a', 'b'):
+        result = stats.column_stats(col)
+        assert result['mean'] == pytest.approx(df[col].mean())
+        assert result['std'] == pytest.approx(df[col].std())
+        assert result['min'] == df[col].min()
+        assert result['max'] == df[col].max()
+        assert result['missing'] == int(df[col].isna().sum())
+
+
+def test_merge_and_round_trip():
+    """Testa se resumos de partes diferentes combinados (via JSON) equivalem ao resumo do todo."""
+    first, second = _frame(1), _frame(2)
+    whole = StreamingStats(['a', 'b']).update(pd.concat([first, second]))
+
+    part = StreamingStats.from_dict(json.loads(json.dumps(StreamingStats(['a', 'b']).update(second).to_dict())))
+    merged = StreamingStats(['a', 'b']).update(first).merge(part)
+
+    np.testing.assert_allclose(merged.mean, whole.mean)
+    np.testing.assert_allclose(merged.variance(), whole.variance())
+    np.testing.assert_array_equal(merged.nulls, whole.nulls)
+
+
+def test_empty_column_is_nan():
+    """Testa se coluna sem valores gera NaN em vez de erro."""
+    stats = StreamingStats(['a']).update(np.full((5, 1), np.nan))
+    result = stats.column_stats('a')
+    assert np.isnan(result['mean']) and np.isnan(result['std'])
+    assert result['missing'] == 5
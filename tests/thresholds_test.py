@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.thresholds import DEFAULT_THRESHOLDS, ThresholdTable
+
+
+def _ph_status(ph):
+    """Cadeia original de _analyze_parameters para o pH."""
+    if 6.5 <= ph <= 8.5:
+        return 'normal'
+    elif 6.0 <= ph < 6.5 or 8.5 < ph <= 9.0:
+        return 'atencao'
+    return 'critico'
+
+
+def _turbidity_score(turbidity):
+    """Cadeia original de simular_predicao_ml para a turbidez."""
+    if turbidity < 5:
+        return 2
+    elif turbidity < 25:
+        return 1
+    elif turbidity < 100:
+        return 0
+    return -2
+
+
+@pytest.fixture
+def table():
+    return ThresholdTable(DEFAULT_THRESHOLDS)
+
+
+def test_scalar_matches_if_chains_including_boundaries(table):
+    """Testa os limites exatos, vizinhos e NaN contra as regras originais."""
+    for ph in [5.99, 6.0, 6.25, 6.5, 7.0, 8.5, 8.51, 9.0, 9.01, math.nan]:
+        assert table.lookup('ph', ph, 'status') == _ph_status(ph)
+    for turbidity in [0.0, 4.99, 5.0, 24.9, 25.0, 99.9, 100.0, 250.0, math.nan]:
+        assert table.lookup('turbidity', turbidity, 'score') == _turbidity_score(turbidity)
+
+
+def test_array_classification_matches_scalar(table):
+    """Testa se a classificação vetorizada coincide com a escalar."""
+    values = np.random.default_rng(0).uniform(0, 14, size=500)
+    values[:4] = [6.0, 6.5, 8.5, 9.0]
+    statuses = table.lookup('ph', values, 'status')
+    assert list(statuses) == [table.lookup('ph', v, 'status') for v in values]
+
+
+def test_invalid_table_is_rejected():
+    """Testa a validação de limites fora de ordem e campos com tamanho errado."""
+    with pytest.raises(ValueError):
+        ThresholdTable({'ph': {'breakpoints': [7.0, 6.0], 'status': ['a', 'b', 'c']}})
+    with pytest.raises(ValueError):
+        ThresholdTable({'ph': {'breakpoints': [6.0, 7.0], 'status': ['a', 'b']}})
@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model.tuning import budgeted_search, latency_cost, save_tuning_results
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    return X, y
+
+
+def test_latency_penalty_prefers_cheaper_forests():
+    """Testa se uma penalidade alta leva a florestas com menor custo de inferência."""
+    X, y = _data()
+    space = {'n_estimators': [5, 50], 'max_depth': [2, 8]}
+    rf = RandomForestClassifier(random_state=0)
+
+    plain = budgeted_search(rf, X, y, space, strategy='random', n_candidates=4, n_jobs=1, latency_penalty=0.0)
+    penalized = budgeted_search(rf, X, y, space, strategy='random', n_candidates=4, n_jobs=1, latency_penalty=10.0)
+
+    assert penalized['best_latency_cost'] <= plain['best_latency_cost']
+    assert penalized['best_params'] == {'n_estimators': 5, 'max_depth': 2}
+
+
+def test_halving_respects_budget_and_persists(tmp_path):
+    """Testa o halving com orçamento esgotado e o histórico em JSON."""
+    X, y = _data()
+    space = {'n_estimators': [5, 10], 'max_depth': [2, 4, 6]}
+    rf = RandomForestClassifier(random_state=0)
+
+    results = budgeted_search(rf, X, y, space, strategy='halving', n_candidates=6, n_jobs=1, time_budget=0.0)
+    assert results['budget_exhausted']
+    assert len(results['history']) == 1
+
+    fitted = rf.set_params(**results['best_params']).fit(X, y)
+    assert latency_cost(fitted) > 0
+
+    path = tmp_path / "tuning.json"
+    save_tuning_results(results, path)
+    save_tuning_results(results, path)
+    assert len(json.loads(path.read_text())) == 2
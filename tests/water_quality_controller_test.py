@@ -1,3 +1,7 @@
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import MagicMock
 from datetime import datetime
@@ -10,6 +14,7 @@ def mock_controller():
     controller = WaterQualityController()
     controller.repository = MagicMock()  # Mock do repositório
     controller.predictor = MagicMock()  # Mock do preditor
+    controller.rollup = MagicMock()  # Mock dos sketches do histórico
     return controller
 
 
@@ -35,6 +40,8 @@ def test_ingest_reading_success(mock_controller):
     assert result['success'] is True
     assert result['prediction']['potability_label'] == 'POTAVEL'
     assert 'timestamp' in result
+    mock_controller.rollup.add.assert_called_once()
+    assert mock_controller.rollup.add.call_args.args[1]['ph'] == 7.0
 
 
 def test_ingest_reading_failure(mock_controller):
@@ -87,4 +94,12 @@ def test_get_alerts_success(mock_controller):
 
     # Assert
     assert len(result) == 1
-    assert result[0]['severity'] == 'critica'
\ No newline at end of file
+    assert result[0]['severity'] == 'critica'
+
+def test_controller_import_does_not_load_sklearn_or_pandas():
+    """Testa se importar o controller (API) não carrega sklearn nem pandas (cold start)."""
+    code = ("import sys, src.api.controller, src.processing.reading_rollup; "
+            "print('sklearn' in sys.modules, 'pandas' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=Path(__file__).parent.parent, check=True)
+    assert result.stdout.split() == ['False', 'False']
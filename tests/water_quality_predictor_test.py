@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
+import numpy as np
+
 from src.model import WaterQualityPredictor
 
 
@@ -13,7 +15,7 @@ def predictor():
 def test_predict(mocker, predictor):
     """Testa a funcionalidade de predição usando o modelo carregado."""
     model_mock = MagicMock()
-    model_mock.predict.return_value = [1]
+    model_mock.classes_ = [0, 1]
     model_mock.predict_proba.return_value = [[0.3, 0.7]]
 
     predictor.model = model_mock
@@ -23,7 +25,7 @@ def test_predict(mocker, predictor):
     prediction = predictor.predict(features)
 
     assert prediction is True
-    model_mock.predict.assert_called_once()
+    model_mock.predict.assert_not_called()
     model_mock.predict_proba.assert_called_once()
 
 
@@ -32,7 +34,7 @@ def test_predict_from_sensor_data(mocker, predictor):
     predictor.processor = MagicMock()
     predictor.processor.process_sensor_reading.return_value = [[1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0]]
     predictor.model = MagicMock()
-    predictor.model.predict.return_value = [0]
+    predictor.model.classes_ = [0, 1]
     predictor.model.predict_proba.return_value = [[0.8, 0.2]]
     predictor.is_loaded = True
 
@@ -45,4 +47,128 @@ def test_predict_from_sensor_data(mocker, predictor):
 
     result = predictor.predict_from_sensor_data(sensor_data)
     assert result['is_potable'] is False
-    assert result['potability_label'] == "NAO_POTAVEL"
\ No newline at end of file
+    assert result['potability_label'] == "NAO_POTAVEL"
+    assert result['confidence'] == 0.8
+
+
+def test_predict_batch_with_probabilities(predictor):
+    """Testa se o lote devolve rótulos e probabilidades de uma única passada."""
+    predictor.model = MagicMock()
+    predictor.model.classes_ = [0, 1]
+    predictor.model.predict_proba.return_value = [[0.8, 0.2], [0.1, 0.9]]
+    predictor.is_loaded = True
+
+    predictions, probabilities = predictor.predict_batch([[0.0] * 4, [1.0] * 4], return_probabilities=True)
+
+    assert predictions == [False, True]
+    assert probabilities.shape == (2, 2)
+    predictor.model.predict_proba.assert_called_once()
+
+def test_predict_from_sensor_data_batch_matches_scalar(predictor):
+    """Testa se o lote vetorizado reproduz a predição escalar linha a linha."""
+    from sklearn.ensemble import RandomForestClassifier
+    from src.processing.data_processor import WaterDataProcessor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    predictor.model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, (X[:, 0] > 0).astype(int))
+    predictor.processor = WaterDataProcessor()
+    predictor.processor.scaler_params = {'mean': np.array([7.0, 2.0, 300.0, 4.0]), 'std': np.array([1.5, 1.5, 80.0, 1.0])}
+    predictor.is_loaded = True
+
+    readings = {
+        'ph': [7.0, 5.5, 8.6, 6.8, float('nan')],
+        'chloramines': [1.0, 3.2, 1.0, 0.1, 1.0],
+        'turbidity': [4.0, 12.0, 2.0, 3.0, 1.0],
+        'conductivity': [300.0, 450.0, 700.0, 200.0, 300.0]
+    }
+
+    batch = predictor.predict_from_sensor_data_batch(readings)
+    scalar = [
+        predictor.predict_from_sensor_data({key: col[i] for key, col in readings.items()})
+        for i in range(5)
+    ]
+
+    assert [r['potability_label'] for r in batch] == [r['potability_label'] for r in scalar]
+    assert [r['probabilities'] for r in batch] == [r['probabilities'] for r in scalar]
+    assert batch[0]['confidence'] == 1.0
+
+
+def test_predict_from_sensor_data_batch_matches_scalar_with_cache(predictor):
+    """Testa a equivalência lote/escalar com cache, incluindo linhas com NaN."""
+    from sklearn.ensemble import RandomForestClassifier
+    from src.model.prediction_cache import PredictionCache
+    from src.processing.data_processor import WaterDataProcessor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    predictor.model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, (X[:, 1] > 0).astype(int))
+    predictor.processor = WaterDataProcessor()
+    predictor.processor.scaler_params = {'mean': np.array([7.0, 2.0, 300.0, 4.0]), 'std': np.array([1.5, 1.5, 80.0, 1.0])}
+    predictor.is_loaded = True
+
+    readings = {
+        'ph': [7.03, 5.47, float('nan'), 6.81, 6.12, 5.9],
+        'chloramines': [1.04, 3.16, 2.025, float('nan'), 1.96, 2.04],
+        'turbidity': [4.2, 12.1, 2.04, 3.03, 1.02, float('nan')],
+        'conductivity': [301.0, 452.0, 698.0, 203.0, 297.0, 304.0]
+    }
+
+    predictor.cache = PredictionCache()
+    scalar = [
+        predictor.predict_from_sensor_data({key: col[i] for key, col in readings.items()})
+        for i in range(6)
+    ]
+    predictor.cache = PredictionCache()
+    batch = predictor.predict_from_sensor_data_batch(readings)
+
+    assert [r['potability_label'] for r in batch] == [r['potability_label'] for r in scalar]
+    assert [r['probabilities'] for r in batch] == [r['probabilities'] for r in scalar]
+
+
+def test_evaluate_water_quality_batch_matches_scalar(predictor):
+    """Testa se a avaliação em lote reproduz evaluate_water_quality linha a linha."""
+    rows = [
+        {'ph': 7.0, 'turbidity': 4.0, 'chloramines': 1.0},
+        {'ph': 6.2, 'turbidity': 12.0, 'chloramines': 3.0},
+        {'ph': 9.5, 'turbidity': 30.0, 'chloramines': 0.05},
+        {'ph': 8.5, 'turbidity': 25.0, 'chloramines': 0.1},
+    ]
+    predictions = [
+        {'is_potable': potable, 'potability_label': 'POTAVEL' if potable else 'NAO_POTAVEL',
+         'confidence': 0.9, 'probabilities': {}, 'model_version': 'v1', 'sensor_data': row}
+        for potable, row in zip([True, True, True, False], rows)
+    ]
+    predictor.predict_from_sensor_data = MagicMock(side_effect=predictions)
+    predictor.predict_from_sensor_data_batch = MagicMock(return_value=predictions)
+
+    scalar = [predictor.evaluate_water_quality(row) for row in rows]
+    batch = predictor.evaluate_water_quality_batch({
+        key: [row[key] for row in rows] for key in rows[0]
+    })
+
+    assert batch == scalar
+    assert [r['risk_level'] for r in batch] == ['muito_baixo', 'medio', 'alto', 'alto']
+
+
+def test_reload_if_changed_picks_up_new_artifact(predictor, tmp_path):
+    """Testa se o preditor recarrega o artefato compacto substituído no disco."""
+    from sklearn.ensemble import RandomForestClassifier
+    from src.model.compact_model import export_compact_model
+    from src.processing.data_processor import WaterDataProcessor
+
+    X = np.random.default_rng(0).normal(size=(100, 4))
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, (X[:, 0] > 0).astype(int))
+    processor = WaterDataProcessor()
+    path = tmp_path / "model.npz"
+
+    export_compact_model(model, processor, path, version='v1')
+    predictor.bundle_path = None
+    predictor.compact_model_path = path
+    predictor.load_model()
+    assert predictor.model_version == 'v1'
+    assert not predictor.reload_if_changed()
+
+    export_compact_model(model, processor, path, version='v2')
+    assert predictor.reload_if_changed()
+    assert predictor.model_version == 'v2'
@@ -13,6 +13,7 @@ para classificação de qualidade da água.
 
 Uso:
     python train_model.py
+    python train_model.py --tune   # busca de hiperparâmetros (config ml.tuning)
 """
 
 import sys